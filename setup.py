@@ -25,6 +25,7 @@ setuptools.setup(
     url="https://github.com/grupawp/tensorflow-deploy-utils",
     packages=setuptools.find_packages(),
     install_requires=requirements,
+    extras_require={"zstd": ["zstandard"]},
     license="ISC",
     keywords="tensorflow ai ml machine learning production serving kubernetes deploy tf tfd tfs",
     entry_points={
@@ -34,6 +35,7 @@ setuptools.setup(
             "tfd_delete_model=tensorflow_deploy_utils.scripts.delete_model:main",
             "tfd_delete_module=tensorflow_deploy_utils.scripts.delete_module:main",
             "tfd_deploy_model=tensorflow_deploy_utils.scripts.deploy_model:main",
+            "tfd_fingerprint=tensorflow_deploy_utils.scripts.fingerprint:main",
             "tfd_get_config=tensorflow_deploy_utils.scripts.get_config:main",
             "tfd_get_model=tensorflow_deploy_utils.scripts.get_model:main",
             "tfd_get_module=tensorflow_deploy_utils.scripts.get_module:main",
@@ -41,6 +43,7 @@ setuptools.setup(
             "tfd_list_modules=tensorflow_deploy_utils.scripts.list_modules:main",
             "tfd_reload_config=tensorflow_deploy_utils.scripts.reload_config:main",
             "tfd_set_label=tensorflow_deploy_utils.scripts.set_label:main",
+            "tfd_set_labels_bulk=tensorflow_deploy_utils.scripts.set_labels_bulk:main",
             "tfd_set_stable=tensorflow_deploy_utils.scripts.set_stable:main",
             "tfd_upload_model=tensorflow_deploy_utils.scripts.upload_model:main",
             "tfd_upload_module=tensorflow_deploy_utils.scripts.upload_module:main",
@@ -51,7 +54,7 @@ setuptools.setup(
         "License :: OSI Approved :: ISC License (ISCL)",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     project_urls={
         "Documentation": "https://github.com/grupawp/tensorflow-deploy-utils",
         "Source": "https://github.com/grupawp/tensorflow-deploy-utils",
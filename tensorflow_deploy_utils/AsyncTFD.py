@@ -0,0 +1,703 @@
+import asyncio
+import hashlib
+import os
+from pathlib import Path
+from time import time
+import uuid
+
+from .TFD import TFD
+from .archive import iter_multipart_archive, new_boundary
+from .cache import DEFAULT_CACHE_DIR
+from .download import DEFAULT_BUFFER_SIZE
+from .transport import RetryPolicy, no_retry, retry_allowed, retry_safe
+
+# NOTE: aiohttp is imported lazily (like tensorflow and pandas in TFD), so importing tensorflow_deploy_utils doesn't
+# load it for users of synchronous TFD cursor.
+
+
+class AsyncTFD:
+    def __init__(
+        self,
+        team: str,
+        project: str,
+        host: str,
+        name: str = "",
+        label: str = "",
+        port: int = 9500,
+        verbose: bool = False,
+        check_connection: bool = True,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keep_alive: bool = True,
+        validation: str = "fast",
+        validation_cache: bool = False,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        executor=None,
+        retry: RetryPolicy = None,
+        **kwargs,
+    ) -> None:
+        """
+        Class allow to create asynchronous cursor for communication with TensorFlow Deploy service. It has the same
+        methods as TFD cursor, but they are coroutines sharing one aiohttp connection pool, so many calls can run
+        concurrently from one event loop. CPU-bound work (validation, archiving and hashing) and file writes are run
+        in executor. Cursor should be used as asynchronous context manager (or closed with `await cursor.close()`).
+        Requests are retried according to retry policy, like requests of TFD cursor. Note: deadline and circuit
+        breaker of TFD cursor (deadline and circuit_breaker parameters) are not supported yet.
+        :param team: Your TEAM
+        :param project: Your PROJECT
+        :param host: TensorFlow Deploy service address
+        :param name: (optional) Model/module NAME
+        :param label: (optional) Model label (default: canary)
+        :param port: (optional) TensorFlow Deploy service port (default: 9500)
+        :param verbose: (optional) Verbosity (default: False)
+        :param check_connection: (optional) Check connection with TensorFlow Deploy when entering context manager?
+        (default: True)
+        :param limit: (optional) Maximum number of simultaneous connections (default: 100)
+        :param limit_per_host: (optional) Maximum number of simultaneous connections to one host, 0 - no limit
+        (default: 0)
+        :param keep_alive: (optional) Reuse connections between requests (HTTP keep-alive)? (default: True)
+        :param validation: (optional) Model/module validation level before upload, see: TFD (default: fast)
+        :param validation_cache: (optional) Remember successful validations on disk, see: TFD (default: False)
+        :param cache_dir: (optional) Directory for cache files (default: ~/.cache/tensorflow_deploy_utils)
+        :param executor: (optional) concurrent.futures.Executor for CPU-bound work (default: event loop executor)
+        :param retry: (optional) Retry policy of requests to TensorFlow Deploy, see: TFD (default: RetryPolicy() - 3
+        attempts)
+        :param kwargs: optional arguments used in some methods
+        """
+        # synchronous cursor checks params and makes all work which doesn't need network
+        self.tfd = TFD(
+            team,
+            project,
+            host,
+            name=name,
+            label=label,
+            port=port,
+            verbose=verbose,
+            check_connection=False,
+            validation=validation,
+            validation_cache=validation_cache,
+            cache_dir=cache_dir,
+            retry=retry,
+        )
+        self.team = self.tfd.team
+        self.project = self.tfd.project
+        self.name = self.tfd.name
+        self.label = self.tfd.label
+        self.host = host
+        self.port = port
+        self.loger = self.tfd.loger
+        self.check_connection = check_connection
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keep_alive = keep_alive
+        self.executor = executor
+        self.session = None
+
+    def _get_session(self):
+        """
+        Internal method. Return aiohttp session with connection pool shared by all cursor methods. Session is created
+        on first use, because it has to be created inside running event loop.
+        :return: aiohttp.ClientSession object
+        """
+        if self.session is None:
+            import aiohttp
+
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    force_close=not self.keep_alive,
+                )
+            )
+        return self.session
+
+    async def _request(self, method: str, request_url: str, timeout: int = None, **kwargs) -> tuple:
+        """
+        Internal method. Send request and read whole response body. Requests are retried after connection errors,
+        timeouts and retry statuses according to retry policy of cursor, like in TFDAdapter.
+        :param method: HTTP method
+        :param request_url: TensorFlow Deploy endpoint
+        :param timeout: (optional) Request timeout in seconds
+        :param kwargs: Arguments passed to aiohttp request
+        :return: Tuple with status code and response text
+        """
+        import aiohttp
+
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        policy = self.tfd.retry
+        # streamed bodies can be sent only once
+        can_retry = retry_allowed(policy, method) and isinstance(kwargs.get("data"), (type(None), bytes, str))
+        retry = 0
+        while True:
+            try:
+                async with self._get_session().request(method, request_url, **kwargs) as response:
+                    status, text = response.status, await response.text()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as error:
+                if not can_retry or retry + 1 >= policy.attempts:
+                    raise
+                reason = str(error) or type(error).__name__
+            else:
+                if status not in policy.retry_statuses or not can_retry or retry + 1 >= policy.attempts:
+                    return status, text
+                reason = f"status code {status}"
+            delay = policy.delay(retry)
+            self.loger.debug(f"{method} {request_url} failed ({reason}), retry #{retry + 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            retry += 1
+
+    async def _put_label(self, request_url: str, label: str) -> tuple:
+        """
+        Internal method. Set label with PUT request, retried only for labels other than 'stable', see: TFD._put_label.
+        :param request_url: TensorFlow Deploy endpoint of label
+        :param label: Label name
+        :return: Tuple with status code and response text
+        """
+        if label == "stable":
+            return await self._request("PUT", request_url)
+        with retry_safe():
+            return await self._request("PUT", request_url)
+
+    async def _run(self, function, *args):
+        """
+        Internal method. Run blocking function in executor.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def close(self) -> None:
+        """
+        Method close HTTP session and release all pooled connections. Cursor can't be used after that.
+        :return: None
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self.tfd.close()
+
+    async def __aenter__(self):
+        if self.check_connection:
+            await self._check_connection()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _check_connection(self):
+        import aiohttp
+
+        try:
+            _, text = await self._request("GET", f"http://{self.host}:{self.port}/ping")
+            self.loger.debug(f"Successful connection to TensorFlow Deploy: {text}")
+        except aiohttp.ClientConnectionError:
+            raise ConnectionError(
+                f"TensorFlow Deploy on http://{self.host}:{self.port} address is NOT available"
+            )
+
+    async def create_archive(self, src_path: str, dst_path: str, hash_on_write: bool = False) -> str:
+        """
+        Method create tar archive with TF model or module files in executor, see: TFD.create_archive.
+        :param src_path: Full path to your TF model or module
+        :param dst_path: Full path to your TF model or module
+        :param hash_on_write: (optional) Calculate hash from tar stream while it is written (default: False)
+        :return: String with calculated hash of archive
+        """
+        return await self._run(self.tfd.create_archive, src_path, dst_path, hash_on_write)
+
+    async def delete_label(self, label: str) -> str:
+        """
+        Method delete given label for given model, except label: 'stable'.
+        :param label: Label name
+        :return: Action result
+        """
+        request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/labels/{label}"
+
+        if not await self._run(self.tfd._action_confirmation, "remove", "label"):
+            return "Nothing to do"
+
+        status, text = await self._request("DELETE", request_url)
+        if status != 200:
+            return f"delete_label error: {text}"
+
+        return f"delete_label success: {text}"
+
+    async def delete_model(self, version: int = None, label: str = "") -> str:
+        """
+        Function delete specific model from TensorFlow Deploy. Only one param of two should be given.
+        :param version: Model version
+        :param label: Model label
+        :return: Action result
+        """
+
+        if (version and label) or not (version or label):
+            raise ValueError("One of two parameters must be given: version or label")
+        if label:
+            request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/labels/{label}/remove_version"
+        else:
+            request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/versions/{version}"
+
+        if not await self._run(self.tfd._action_confirmation, "remove", "model"):
+            return "Nothing to do"
+
+        status, text = await self._request("DELETE", request_url)
+        if status != 200:
+            return f"delete_model error: {text}"
+
+        return f"delete_model success: {text}"
+
+    async def delete_module(self, version: int) -> str:
+        """
+        Method delete specific module from TensorFlow Deploy.
+        :param version: Module version
+        :return: Action result
+        """
+
+        request_url = f"http://{self.host}:{self.port}/v1/modules/{self.team}/{self.project}/names/{self.name}/versions/{version}"
+
+        if not await self._run(self.tfd._action_confirmation, "remove", "module"):
+            return "Nothing to do"
+
+        status, text = await self._request("DELETE", request_url)
+        if status != 200:
+            return f"delete_module error: {text}"
+
+        return f"delete_module success: {text}"
+
+    async def deploy_model(self, src_path: str, label: str = "") -> str:
+        """
+        Method deploy given model to production, i.e., upload model and reload all related TFS instances.
+        :param src_path: Full path to model
+        :param label: Label for deploying model (if give it overwrite label parameter in cursor)
+        :return: Action result
+        """
+
+        upload_response = await self.upload_model(src_path, label)
+        if upload_response != "Upload success!":
+            return f"Deploy failed. Upload error: {upload_response}"
+
+        reload_response = await self.reload_config()
+
+        return f"Deploy results:\nupload: {upload_response}\nreload: {reload_response}"
+
+    async def generate_model_readme(self, dst_path: str, description: str, metrics: dict = {}) -> None:
+        """
+        This method generate README.md file describing model and write it into given path, see:
+        TFD.generate_model_readme.
+        :param dst_path: Path to model
+        :param description: Your additional model description
+        :param metrics: Model metrics (optional)
+        :return: None
+        """
+        await self._run(self.tfd.generate_model_readme, dst_path, description, metrics)
+
+    async def generate_module_readme(self, dst_path: str, description: str) -> None:
+        """
+        This method generate README.md file describing module and write it into given path.
+        :param dst_path: Path to module
+        :param description: Your additional module description
+        :return: None
+        """
+        await self._run(self.tfd.generate_module_readme, dst_path, description)
+
+    async def get_config(self) -> str:
+        """
+        This metod return string with model_config_file - current TFS configuration.
+        :return: String with model_config_file
+        """
+
+        request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/config"
+        status, text = await self._request("GET", request_url)
+        if status != 200:
+            return f"get_config error: {text}"
+        else:
+            return text
+
+    async def get_model(
+        self,
+        dst_path: str,
+        version: int = 0,
+        label: str = "",
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        expected_hash: str = "",
+    ) -> str:
+        """
+        Method download specific model to given path. Archive is streamed to disk in chunks and appears under
+        destination path only when download is complete, see: TFD.get_model.
+        :param dst_path: Directory where write model
+        :param version: Model version (priority over label, optional)
+        :param label: Model label (optional)
+        :param buffer_size: Size of downloaded chunks kept in memory in bytes (optional, default: 8 MiB)
+        :param expected_hash: Expected SHA256 hash of model archive, verified during download (optional)
+        :return: Action result
+        """
+        path = Path(dst_path)
+        if not path.is_dir():
+            return "ERROR: dst_path is not dir"
+        path = path.joinpath(f"model_{int(time())}.tar")
+
+        if version:
+            request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/versions/{version}"
+        elif label:
+            request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/labels/{label}"
+        else:
+            request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/labels/{self.label}"
+
+        error = await self._download_archive(request_url, path, buffer_size, expected_hash)
+        if error:
+            return error
+        return f"Model successfully written to {str(path)}"
+
+    async def get_module(
+        self,
+        dst_path: str,
+        version: int,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        expected_hash: str = "",
+    ) -> str:
+        """
+        Method download specyfic module to given path, see: get_model.
+        :param dst_path: Directory where write module
+        :param version: Module version
+        :param buffer_size: Size of downloaded chunks kept in memory in bytes (optional, default: 8 MiB)
+        :param expected_hash: Expected SHA256 hash of module archive, verified during download (optional)
+        :return: Action result
+        """
+
+        path = Path(dst_path)
+        if not path.is_dir():
+            return "ERROR: dst_path is not dir"
+        path = path.joinpath(f"module_{int(time())}.tar")
+
+        request_url = f"http://{self.host}:{self.port}/v1/modules/{self.team}/{self.project}/names/{self.name}/versions/{version}"
+
+        error = await self._download_archive(request_url, path, buffer_size, expected_hash)
+        if error:
+            return error
+        return f"Module successfully written to {str(path)}"
+
+    async def _download_archive(self, request_url: str, path: Path, buffer_size: int, expected_hash: str) -> str:
+        """
+        Internal method. Stream model/module archive from given URL to temporary file, which is renamed to given path
+        when whole body was received and verified. Chunks are hashed and written in executor.
+        :param request_url: TensorFlow Deploy download endpoint
+        :param path: Destination file path
+        :param buffer_size: Size of downloaded chunks kept in memory in bytes
+        :param expected_hash: Expected SHA256 hash of archive
+        :return: Empty string on success, otherwise error message
+        """
+
+        def write(fh, sha256_hash, chunk: bytes) -> None:
+            sha256_hash.update(chunk)
+            fh.write(chunk)
+
+        async with self._get_session().get(request_url) as response:
+            if response.status != 200:
+                return f"Connection error: {await response.text()}"
+
+            sha256_hash = hashlib.sha256()
+            written = 0
+            tmp_path = str(path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp"))
+            fh = await self._run(open, tmp_path, "xb")
+            try:
+                with fh:
+                    async for chunk in response.content.iter_chunked(buffer_size):
+                        await self._run(write, fh, sha256_hash, chunk)
+                        written += len(chunk)
+
+                expected_length = response.headers.get("Content-Length")
+                if (
+                    expected_length is not None
+                    and "Content-Encoding" not in response.headers
+                    and written != int(expected_length)
+                ):
+                    raise ValueError(f"incomplete body, received {written} of {expected_length} bytes")
+                archive_hash = sha256_hash.hexdigest()
+                if expected_hash and archive_hash != expected_hash.lower():
+                    raise ValueError(f"hash mismatch, expected {expected_hash}, got {archive_hash}")
+
+                os.replace(tmp_path, str(path))
+            except ValueError as error:
+                os.remove(tmp_path)
+                return f"Download error: {error}"
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+
+        self.loger.debug(f"archive hash: {archive_hash}")
+        return ""
+
+    def invalidate_validation_cache(self, path: str = "") -> None:
+        """
+        Method remove cached validation result of given model/module, see: TFD.invalidate_validation_cache.
+        :param path: (optional) Full path to model/module directory or tar archive
+        :return: None
+        """
+        self.tfd.invalidate_validation_cache(path)
+
+    async def list_models(
+        self,
+        team: str = "",
+        project: str = "",
+        name: str = "",
+        version: int = 0,
+        label: str = "",
+    ) -> str:
+        """
+        Method list models for given criteria and return them as pandas.DataFrame, see: TFD.list_models.
+        :param team: TEAM (optional)
+        :param project: PROJECT (optional)
+        :param name:  NAME (optional)
+        :param version: VERSION (optional)
+        :param label: LABEL (optional)
+        :return: pandas.DataFrame with search results
+        """
+        request_url = f"http://{self.host}:{self.port}/v1/models/list"
+        status, text = await self._request(
+            "GET",
+            request_url,
+            params={
+                "team": team,
+                "project": project,
+                "name": name,
+                "version": version,
+                "label": label,
+            },
+        )
+        if status != 200:
+            return f"list_models error: {text}"
+
+        return await self._run(self.tfd._list_to_dataframe, text, True)
+
+    async def list_modules(self, team: str = "", project: str = "", name: str = "", version: int = 0) -> str:
+        """
+        Method list modules for given criteria and return them as pandas.DataFrame, see: TFD.list_modules.
+        :param team: TEAM (optional)
+        :param project: PROJECT (optional)
+        :param name: NAME (optional)
+        :param version: VERSION (optional)
+        :return: pandas.DataFrame with search results
+        """
+        request_url = f"http://{self.host}:{self.port}/v1/modules/list"
+        status, text = await self._request(
+            "GET",
+            request_url,
+            params={"team": team, "project": project, "name": name, "version": version},
+        )
+        if status != 200:
+            return f"list_modules error: {text}"
+
+        return await self._run(self.tfd._list_to_dataframe, text)
+
+    async def reload_config(self, short_reload: bool = True) -> str:
+        """
+        Method allows you reload all TFS instances.
+        :param short_reload: bool (optional): True for simple reload, False for full reload
+        :return: Action result
+        """
+        return await self._reload_project(self.project, short_reload)
+
+    async def _reload_project(self, project: str, short_reload: bool) -> str:
+        """
+        Internal method. Reload all TFS instances of given project of cursor team.
+        :param project: PROJECT
+        :param short_reload: True for simple reload, False for full reload
+        :return: Action result
+        """
+        request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{project}/reload"
+        status, text = await self._request("POST", request_url, params={"SkipShortConfig": str(short_reload)})
+        if status != 200:
+            return f"reload_config error: {text}"
+        else:
+            return "reload_config success!"
+
+    async def revert_model(self) -> str:
+        """
+        Method revert previous model stable version. It can be used only ones, because remember just last stable
+        version.
+        :return: Action result
+        """
+        request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/revert"
+        status, text = await self._request("PUT", request_url)
+        if status != 200:
+            return f"revert_model error: {text}"
+        else:
+            return f"revert_model success!\n{text}"
+
+    async def set_label(self, version: int = None, label: str = "") -> str:
+        """
+        Method set given label to specific model.
+        :param version: Model version
+        :param label: Any model label, except: 'stable'
+        :return: Action result
+        """
+
+        if not version:
+            raise ValueError("You need to specify version as the first argument")
+
+        request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/versions/{version}/labels/{label or self.label}"
+        status, text = await self._put_label(request_url, label or self.label)
+        if status != 200:
+            return f"set_label error: {text}"
+
+        reload_response = await self.reload_config(short_reload=False)
+
+        return f"set_label success: {text}, reload: {reload_response}"
+
+    async def set_labels_bulk(self, assignments: list, workers: int = 8) -> str:
+        """
+        Method set labels to many models at once and make one full reload for every affected project, see:
+        TFD.set_labels_bulk.
+        :param assignments: List of (name, version, label) tuples, or (project, name, version, label) tuples
+        :param workers: (optional) Number of concurrent requests (default: 8)
+        :return: Action result with result of every assignment and every reload
+        """
+        import aiohttp
+
+        items = [self.tfd._prepare_label_assignment(assignment) for assignment in assignments]
+        if not items:
+            return "Nothing to do"
+        semaphore = asyncio.Semaphore(max(1, workers))
+
+        async def set_one(item: tuple) -> tuple:
+            project, name, version, label = item
+            request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{project}/names/{name}/versions/{version}/labels/{label}"
+            async with semaphore:
+                try:
+                    status, text = await self._put_label(request_url, label)
+                except aiohttp.ClientError as error:
+                    return False, f"error: {error}"
+            if status != 200:
+                return False, f"error: {text}"
+            return True, f"success: {text}"
+
+        results = await asyncio.gather(*(set_one(item) for item in items))
+
+        lines = ["set_labels_bulk results:"]
+        projects = []
+        for (project, name, version, label), (success, result) in zip(items, results):
+            lines.append(f"{project}/{name} version {version} label {label}: {result}")
+            if success and project not in projects:
+                projects.append(project)
+        for project in projects:
+            lines.append(f"reload {project}: {await self._reload_project(project, short_reload=False)}")
+
+        return "\n".join(lines)
+
+    async def set_stable(self, version: int = None, attempts: int = 3) -> str:
+        """
+        Method set label 'stable' to specific model, see: TFD.set_stable.
+        :param version: Model version
+        :param attempts: Number of attempts to set label 'stable' to specific model
+        :return: Action result
+        """
+
+        if not version:
+            raise ValueError("You need to specify model version")
+
+        request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/versions/{version}/labels/stable"
+
+        if not await self._run(self.tfd._action_confirmation, "set stable", "label for model", version):
+            return "Nothing to do"
+
+        import aiohttp
+
+        errors = []
+        for i in range(attempts):
+            if i:
+                await asyncio.sleep(self.tfd.retry.delay(i - 1))
+            try:
+                # attempts replace retries of requests, see: TFD.set_stable
+                with no_retry():
+                    status, text = await self._request("PUT", request_url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                errors.append(f"#{i} error: {error}")
+                continue
+            if status != 200:
+                errors.append(f"#{i} error: {text}")
+            else:
+                break
+        else:
+            return f"set_stable error! Errors from all attempts: {errors}"
+
+        reload_response = await self.reload_config(short_reload=False)
+        return f"set_stable success: {text}, reload status: {reload_response}"
+
+    async def upload_model(
+        self, src_path: str, label: str = "", timeout: int = 120, hash_pre_pass: bool = False
+    ) -> str:
+        """
+        Method upload directory/archive containing TF model to TensorFlow Deploy. Archive is always streamed in
+        chunked request body, like in TFD.upload_model with stream=True, so given tar archive is not removed.
+        :param src_path: Full path to model. It can also be already archived model
+        :param label: (Optional) Label for model
+        :param timeout: Upload timeout
+        :param hash_pre_pass: (Optional) Calculate archive hash in additional pass over files and send it before
+        archive, instead of sending it as the last form field (default: False)
+        :return: Action result
+        """
+        return await self._upload_stream(
+            f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/labels/{label or self.label}",
+            src_path,
+            timeout,
+            hash_pre_pass,
+        )
+
+    async def upload_module(self, src_path: str, timeout: int = 600, hash_pre_pass: bool = False) -> str:
+        """
+        Method upload directory/archive containing TF module to TensorFlow Deploy, see: upload_model.
+        :param src_path: Full path to module. It can also be already archived module
+        :param timeout: Upload timeout in seconds
+        :param hash_pre_pass: (Optional) Calculate archive hash before upload (default: False)
+        :return: Action result
+        """
+        return await self._upload_stream(
+            f"http://{self.host}:{self.port}/v1/modules/{self.team}/{self.project}/names/{self.name}",
+            src_path,
+            timeout,
+            hash_pre_pass,
+        )
+
+    async def _upload_stream(self, request_url: str, src_path: str, timeout: int, hash_pre_pass: bool) -> str:
+        """
+        Internal method. Validate model/module in executor and upload it in chunked multipart request. Archive chunks
+        are generated in executor, so event loop is not blocked by archiving and hashing.
+        :param request_url: TensorFlow Deploy upload endpoint
+        :param src_path: Full path to model/module directory or tar archive
+        :param timeout: Upload timeout in seconds
+        :param hash_pre_pass: Calculate hash before upload instead of sending it after archive
+        :return: Action result
+        """
+        prepared = await self._run(self.tfd._prepare_upload_stream, src_path, hash_pre_pass)
+        if isinstance(prepared, str):
+            return prepared
+        filename, get_chunks, archive_hash = prepared
+
+        boundary = new_boundary()
+        self.loger.debug("uploading archive")
+        status, text = await self._request(
+            "POST",
+            request_url,
+            timeout=timeout,
+            data=self._iter_in_executor(iter_multipart_archive(boundary, filename, get_chunks(), archive_hash)),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+        self.loger.debug(f"upload result: {text}")
+        if status != 200:
+            return f"Upload failed!\nServer response: {text}"
+        return "Upload success!"
+
+    async def _iter_in_executor(self, iterator):
+        """
+        Internal method. Asynchronous generator yielding items of blocking iterator, which are produced in executor.
+        """
+        done = object()
+        try:
+            while True:
+                item = await self._run(next, iterator, done)
+                if item is done:
+                    break
+                yield item
+        finally:
+            await self._run(iterator.close)
+
+    def __str__(self):
+        return f"Asynchronous TensorFlow Deploy cursor\nTEAM: {self.team}\nPROJECT: {self.project}\nNAME: {self.name}\nLABEL: {self.label}\nHost: {self.host}\nPort: {self.port}\nCheck connection: {self.check_connection}"
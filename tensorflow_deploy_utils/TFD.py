@@ -1,18 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import contextvars
 from datetime import datetime
+from functools import partial
 import hashlib
 import json
 import logging
 import os
-import pandas as pd
 from pathlib import Path
+import random
 import re
 import requests
-import shutil
 import sys
 import tarfile
-import tensorflow as tf
-import tensorflow_text  # required if you want to load TF model using sentence piece like universal sentence encoder
-from time import time
+from time import perf_counter, sleep, time
+
+from .archive import (
+    add_directory,
+    iter_file,
+    iter_multipart_archive,
+    iter_tar_stream,
+    new_boundary,
+    open_tar_stream,
+    safe_members,
+    tf_archive_view,
+)
+from .compression import (
+    ARCHIVE_SUFFIXES,
+    check_compression,
+    compress_chunks,
+    compressing_writer,
+    detect_compression,
+    is_archive_path,
+)
+from .cache import DEFAULT_CACHE_DIR, DEFAULT_MODEL_CACHE_SIZE, DigestCache, ModelCache, ValidationCache
+from .download import (
+    DEFAULT_BUFFER_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    download_parallel,
+    download_resumable,
+    extract_response,
+    write_response,
+)
+from .delta import build_manifest, manifest_blobs
+from .hashing import (
+    DEFAULT_BLOCK_SIZE,
+    HashingFileWrapper,
+    check_hash_mode,
+    file_digest,
+    file_digests,
+    fingerprint_directory,
+    stat_fingerprint,
+)
+from .reload import ReloadScheduler, release_shared_scheduler, shared_scheduler
+from .transport import (
+    CircuitBreaker,
+    DeadlineExceeded,
+    RetryPolicy,
+    TFDAdapter,
+    current_operation,
+    no_retry,
+    operation,
+    operation_scope,
+    remaining_time,
+    retry_safe,
+    shared_breaker,
+)
+from .validation import validate_saved_model_archive, validate_saved_model_dir
+
+# NOTE: tensorflow, tensorflow_text and pandas are heavy to import, hence they are imported lazily only in methods
+# which need them. Thanks to this, light commands (e.g. get_config or reload_config) start almost instantly.
+
+# team, project, name and label are parts of request URLs, so they are limited to safe characters
+check_str_param = re.compile("[a-zA-Z0-9_]{,32}", flags=re.IGNORECASE)
 
 
 class TFD:
@@ -26,6 +86,31 @@ class TFD:
         port: int = 9500,
         verbose: bool = False,
         check_connection: bool = True,
+        pool_connections: int = 1,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        validation: str = "fast",
+        validation_cache: bool = False,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        model_cache: bool = False,
+        model_cache_size: int = DEFAULT_MODEL_CACHE_SIZE,
+        model_cache_hardlink: bool = False,
+        digest_cache: bool = False,
+        hash_block_size: int = DEFAULT_BLOCK_SIZE,
+        hash_mode: str = "read",
+        hash_prefetch: bool = False,
+        reproducible_archives: bool = False,
+        reload_delay: float = 0,
+        reload_max_delay: float = None,
+        shared_reload: bool = False,
+        retry: RetryPolicy = None,
+        connect_timeout: float = 10,
+        read_timeout: float = 120,
+        deadline: float = None,
+        circuit_breaker: bool = False,
+        breaker_failures: int = 5,
+        breaker_reset_timeout: float = 30,
         **kwargs,
     ) -> None:
         """
@@ -38,6 +123,56 @@ class TFD:
         :param port: (optional) TensorFlow Deploy service port (default: 9500)
         :param verbose: (optional) Verbosity (default: False)
         :param check_connection: (optional) Check connection with TensorFlow Deploy? (default: True)
+        :param pool_connections: (optional) Number of per-host connection pools kept in the session (default: 1)
+        :param pool_maxsize: (optional) Maximum number of connections kept alive per host (default: 10)
+        :param pool_block: (optional) Block when all connections for a host are in use? (default: False)
+        :param keep_alive: (optional) Reuse connections between requests (HTTP keep-alive)? (default: True)
+        :param validation: (optional) Model/module validation level before upload: 'fast' - parse saved_model.pb and
+        check variables files, 'deep' - load whole model with TensorFlow (default: fast)
+        :param validation_cache: (optional) Remember successful validations on disk and skip validation of models
+        already validated, e.g. when the same model is uploaded to many TensorFlow Deploy instances (default: False)
+        :param cache_dir: (optional) Directory for cache files (default: ~/.cache/tensorflow_deploy_utils)
+        :param model_cache: (optional) Keep downloaded models/modules in local cache shared by all processes on the
+        node and reuse them in get_model/get_module instead of downloading them again (default: False)
+        :param model_cache_size: (optional) Maximum size of model cache in bytes (default: 10 GiB)
+        :param model_cache_hardlink: (optional) Write models/modules from model cache as hard links instead of copies,
+        which saves disk space and time, but models modified in place corrupt the cache (default: False)
+        :param digest_cache: (optional) Remember hashes of files on disk and don't read unchanged files again in
+        fingerprint (default: False)
+        :param hash_block_size: (optional) Size of block read from disk and passed to hash at once, when archives and
+        files are hashed (default: 1 MiB)
+        :param hash_mode: (optional) How files are read for hashing: 'read' - in blocks, 'readinto' - into reused
+        buffer without copying, 'mmap' - memory mapped (default: read)
+        :param hash_prefetch: (optional) Read next block of archive ahead while current one is hashed, on background
+        thread ('read' mode) or by kernel ('mmap' mode) (default: False)
+        :param reproducible_archives: (optional) Create reproducible archives from directories (in create_archive and
+        uploads): the same files give byte-identical archive with the same hash on every machine, so skip_existing
+        deduplicates rebuilt models (default: False)
+        :param reload_delay: (optional) Coalesce reloads requested by set_label, set_stable, set_labels_bulk and
+        deploy_model: make one reload (full one if any request was full) after reload_delay seconds without new
+        requests, or on flush_reload/close. Reload made after delay is not returned to any caller, so its failure is only
+        logged. 0 means immediate reload after every change (default: 0)
+        :param reload_max_delay: (optional) Maximum seconds between first coalesced reload request and reload
+        (default: no limit)
+        :param shared_reload: (optional) Share coalesced reloads with other cursors of the same host, team and
+        project in this process; they must use the same reload_delay and reload_max_delay (default: False)
+        :param retry: (optional) Retry policy of requests to TensorFlow Deploy, e.g. during its rolling restart; number
+        of retries made by last method is available in `last_retries` attribute (default: RetryPolicy() - 3 attempts
+        of idempotent requests with exponential backoff and jitter)
+        :param connect_timeout: (optional) Timeout of connecting to TensorFlow Deploy in seconds (default: 10)
+        :param read_timeout: (optional) Timeout of waiting for response data in seconds, except uploads which have own
+        timeout (default: 120)
+        :param deadline: (optional) Maximum time of every method call in seconds, including retries and nested calls;
+        it can be also set for chosen calls with `limits` (default: no limit)
+        :param circuit_breaker: (optional) Guard TensorFlow Deploy host with circuit breaker shared by all cursors of
+        the same host and port in this process: after breaker_failures consecutive failed requests, requests fail
+        fast with CircuitOpenError (requests ConnectionError) and after breaker_reset_timeout seconds host is probed
+        with ping before next request. Note: methods raise CircuitOpenError instead of returning error message
+        (default: False)
+        :param breaker_failures: (optional) Number of consecutive failures opening circuit breaker; cursors sharing
+        breaker must use the same value (default: 5)
+        :param breaker_reset_timeout: (optional) Seconds after which open circuit breaker probes host; cursors sharing
+        breaker must use the same value (default: 30)
         :param kwargs: optional arguments used in some methods
         """
         if verbose:
@@ -55,6 +190,35 @@ class TFD:
         self.verbose = verbose
         self.loger = loger
         self.check_connection = check_connection
+        self.validation = validation
+        self.validation_cache = ValidationCache(cache_dir) if validation_cache else None
+        self.model_cache = ModelCache(cache_dir, model_cache_size, model_cache_hardlink) if model_cache else None
+        self.digest_cache = DigestCache(cache_dir) if digest_cache else None
+        self.hash_block_size = hash_block_size
+        self.hash_mode = check_hash_mode(hash_mode)
+        self.hash_prefetch = hash_prefetch
+        self.reproducible_archives = reproducible_archives
+        self.reload_delay = reload_delay
+        self.reload_max_delay = reload_max_delay
+        self.shared_reload = shared_reload
+        self.reload_schedulers = {}
+        self.server_compressions = None
+        self.retry = retry or RetryPolicy()
+        self.last_retries = 0
+        self.deadline = deadline
+        self.breaker = (
+            shared_breaker((host, port), breaker_failures, breaker_reset_timeout) if circuit_breaker else None
+        )
+        self.session = self._create_session(
+            pool_connections,
+            pool_maxsize,
+            pool_block,
+            keep_alive,
+            self.retry,
+            (connect_timeout, read_timeout),
+            self.breaker,
+            self._check_connection,
+        )
 
         self.loger.debug(
             f"Initial params: TEAM {team}, PROJECT: {project}, NAME: {name}, LABEL: {label}, HOST: {host}, port: {port}, verbose: {verbose}"
@@ -72,8 +236,6 @@ class TFD:
         :return: None
         """
 
-        check_str_param = re.compile("[a-zA-Z0-9_]{,32}", flags=re.IGNORECASE)
-
         if not check_str_param.fullmatch(self.team):
             raise ValueError(f"Parameter TEAM has invalid format: {self.team}!")
         self.team = self.team.lower()
@@ -92,36 +254,103 @@ class TFD:
             raise ValueError(f"Parameter LABEL has invalid format: {self.label}!")
         self.label = self.label.lower()
 
+        if self.validation not in ("fast", "deep"):
+            raise ValueError(f"Parameter VALIDATION has invalid value: {self.validation}!")
+
+    @staticmethod
+    def _create_session(
+        pool_connections: int,
+        pool_maxsize: int,
+        pool_block: bool,
+        keep_alive: bool,
+        retry: RetryPolicy = None,
+        timeout: tuple = (None, None),
+        breaker: CircuitBreaker = None,
+        probe=None,
+    ) -> requests.Session:
+        """
+        Internal method. Create HTTP session with connection pool shared by all cursor methods, so consecutive
+        requests to TensorFlow Deploy reuse already opened TCP connections.
+        :param pool_connections: Number of per-host connection pools
+        :param pool_maxsize: Maximum number of connections kept per host
+        :param pool_block: Block when there is no free connection for given host
+        :param keep_alive: Reuse connections between requests
+        :param retry: (optional) Retry policy of requests (default: no retries)
+        :param timeout: (optional) Default (connect, read) timeout of requests (default: no timeout)
+        :param breaker: (optional) Circuit breaker of host (default: no breaker)
+        :param probe: (optional) Function probing host when circuit breaker is half-open (default: no probe)
+        :return: requests.Session object
+        """
+        session = requests.Session()
+        adapter = TFDAdapter(
+            retry_policy=retry,
+            timeout=timeout,
+            breaker=breaker,
+            probe=probe,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self) -> None:
+        """
+        Method make pending coalesced reloads, close HTTP session and release all pooled connections. Cursor can't be
+        used after that.
+        :return: None
+        """
+        if self.reload_schedulers:
+            self.flush_reload()
+            if self.shared_reload:
+                for project in self.reload_schedulers:
+                    release_shared_scheduler(self._shared_scheduler_key(project), self)
+        self.session.close()
+
+    @contextmanager
+    def limits(self, deadline: float = None, connect_timeout: float = None, read_timeout: float = None):
+        """
+        Context manager setting deadline and timeouts of method calls made inside it. Deadline is shared by all these
+        calls and can only shorten cursor deadline or deadline of enclosing limits.
+        Example: with tfd_cursor.limits(deadline=30): tfd_cursor.get_config()
+        :param deadline: (optional) Maximum time of all calls in seconds (default: no additional limit)
+        :param connect_timeout: (optional) Timeout of connecting in seconds (default: cursor connect_timeout)
+        :param read_timeout: (optional) Timeout of waiting for response data in seconds (default: cursor read_timeout)
+        :return: None
+        """
+        with operation_scope(deadline, connect_timeout, read_timeout):
+            yield
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _check_connection(self):
         try:
-            response = requests.get(f"http://{self.host}:{self.port}/ping")
+            response = self.session.get(f"http://{self.host}:{self.port}/ping")
             self.loger.debug(
                 f"Successful connection to TensorFlow Deploy: {response.text}"
             )
         except (
             requests.exceptions.ConnectionError,
-            requests.exceptions.ConnectTimeout,
+            requests.exceptions.Timeout,
         ):
             raise ConnectionError(
                 f"TensorFlow Deploy on http://{self.host}:{self.port} address is NOT available"
             )
 
-    @staticmethod
-    def _calculate_hash(path: str) -> str:
+    def _calculate_hash(self, path: str) -> str:
         """
-        Internal method. Calculate hash SHA256 for given file.
+        Internal method. Calculate hash SHA256 for given file, see: hash_block_size, hash_mode and hash_prefetch.
         :param path: Path to given file
         :return: String with calculated hash
         """
-        sha256_hash = hashlib.sha256()
-
-        with open(path, "rb") as f:
-            # Read and update hash string value in blocks of 4K
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-            archive_hash = sha256_hash.hexdigest()
-
-        return archive_hash
+        return file_digest(path, "sha256", self.hash_block_size, self.hash_mode, self.hash_prefetch)
 
     def _action_confirmation(self, action: str, what: str, version: int = 0) -> bool:
         """
@@ -142,86 +371,250 @@ class TFD:
         else:
             return False
 
-    def _validate_model_or_module(self, path: str) -> None:
+    def _validate_model_or_module(self, path: str, level: str = "") -> dict:
         """
         Internal method used for validation model/module before upload.
         :param path: Full path to your TF model or module
-        :return: None
+        :param level: (optional) Validation level: 'fast' or 'deep' (default: validation parameter of cursor)
+        :return: Dictionary with validation time in seconds for given level
         """
-        self.loger.debug("model validation")
-        try:
-            _ = tf.saved_model.load(path)
-        except Exception as error:
-            raise ValueError(f"TensorFlow model validation failed! Error: {error}")
+        level = level or self.validation
+        self.loger.debug(f"model validation, level: {level}")
+        start = perf_counter()
+        cache_key = ""
+        signatures = []
+        if self.validation_cache is not None:
+            try:
+                cache_key = f"dir:{stat_fingerprint(path)}"
+            except OSError as error:
+                raise ValueError(f"TensorFlow model validation failed! Error: {error}")
+            if self._get_cached_validation(cache_key, level):
+                return {"cache": perf_counter() - start}
+        if level == "deep":
+            import tensorflow as tf
+            import tensorflow_text  # required if you want to load TF model using sentence piece like universal sentence encoder
+
+            try:
+                _ = tf.saved_model.load(path)
+            except Exception as error:
+                raise ValueError(f"TensorFlow model validation failed! Error: {error}")
+        else:
+            try:
+                signatures = validate_saved_model_dir(path)
+            except OSError as error:
+                raise ValueError(f"TensorFlow model validation failed! Error: {error}")
+            self.loger.debug(f"model signatures: {signatures}")
         if "README.md" not in os.listdir(path):
             raise ValueError("Directory without README.md file!")
+        timings = {level: perf_counter() - start}
+        self._put_cached_validation(cache_key, level, signatures)
+        self.loger.info(f"model validation ({level}) took {timings[level]:.3f}s")
         self.loger.debug("model validation PASS")
+        return timings
 
-    def _validate_archived_model_or_module(self, path: str) -> None:
+    def _validate_archived_model_or_module(
+        self, path: str, level: str = "", archive_hash: str = ""
+    ) -> dict:
         """
-        Internal method used for validation model/module archive before upload.
+        Internal method used for validation model/module archive before upload. Archive is validated in place,
+        without extracting it on disk.
         :param path: Full path to your TF model or module archive
-        :return: None
+        :param level: (optional) Validation level: 'fast' or 'deep' (default: validation parameter of cursor)
+        :param archive_hash: (optional) Already calculated hash of archive, used as validation cache key
+        :return: Dictionary with validation time in seconds for given level
         """
-        self.loger.debug("validation model archive")
-        tmp_path = f"tmp_dir_{int(time())}"
-        self.loger.debug(f"temporary directory for model: {tmp_path}")
-        self._extract_archive(src_path=path, dst_path=tmp_path)
+        level = level or self.validation
+        self.loger.debug(f"validation model archive, level: {level}")
+        start = perf_counter()
+        cache_key = ""
+        if self.validation_cache is not None:
+            try:
+                cache_key = f"archive:{archive_hash or self._calculate_hash(path)}"
+            except OSError as error:
+                raise ValueError(f"Archive validation failed! Error: {error}")
+            if self._get_cached_validation(cache_key, level):
+                return {"cache": perf_counter() - start}
         try:
-            self._validate_model_or_module(tmp_path)
-        except ValueError as error:
-            shutil.rmtree(tmp_path, ignore_errors=True)
-            raise ValueError(error)
-        self.loger.debug("removing temporary directory")
-        shutil.rmtree(tmp_path, ignore_errors=True)
+            signatures = validate_saved_model_archive(path)
+        except (OSError, tarfile.TarError) as error:
+            raise ValueError(f"Archive validation failed! Error: {error}")
+        self.loger.debug(f"model signatures: {signatures}")
+        if level == "deep":
+            import tensorflow as tf
+            import tensorflow_text  # required if you want to load TF model using sentence piece like universal sentence encoder
+
+            self.loger.debug("loading model from archive view")
+            with tf_archive_view(path) as view_path:
+                try:
+                    _ = tf.saved_model.load(view_path)
+                except Exception as error:
+                    raise ValueError(f"TensorFlow model validation failed! Error: {error}")
+        timings = {level: perf_counter() - start}
+        self._put_cached_validation(cache_key, level, signatures)
+        self.loger.info(f"model archive validation ({level}) took {timings[level]:.3f}s")
         self.loger.debug("validation model in archive PASS")
+        return timings
+
+    def _get_cached_validation(self, key: str, level: str) -> bool:
+        """
+        Internal method. Check if model/module with given cache key was already validated on given level.
+        Problems with cache file are logged and treated as cache miss.
+        :param key: Validation cache key
+        :param level: Validation level
+        :return: True if validation can be skipped
+        """
+        try:
+            entry = self.validation_cache.get(key, level)
+        except OSError as error:
+            self.loger.debug(f"validation cache is not available: {error}")
+            return False
+        if entry is None:
+            return False
+        self.loger.info(f"model validation ({level}) skipped, model already validated")
+        return True
+
+    def _put_cached_validation(self, key: str, level: str, signatures: list) -> None:
+        """
+        Internal method. Remember successful validation in cache, if cache is enabled.
+        :param key: Validation cache key
+        :param level: Validation level
+        :param signatures: Signatures found during validation
+        :return: None
+        """
+        if not key:
+            return
+        try:
+            self.validation_cache.put(key, level, signatures)
+        except OSError as error:
+            self.loger.debug(f"validation cache is not available: {error}")
+
+    def invalidate_validation_cache(self, path: str = "") -> None:
+        """
+        Method remove cached validation result of given model/module directory or archive. If path is not given,
+        whole validation cache is cleared.
+        :param path: (optional) Full path to model/module directory or tar archive
+        :return: None
+        """
+        if self.validation_cache is None:
+            return
+        if not path:
+            self.validation_cache.invalidate()
+        elif Path(path).is_dir():
+            self.validation_cache.invalidate(f"dir:{stat_fingerprint(path)}")
+        else:
+            self.validation_cache.invalidate(f"archive:{self._calculate_hash(path)}")
+
+    def invalidate_model_cache(self) -> None:
+        """
+        Method remove all downloaded models/modules from local model cache.
+        :return: None
+        """
+        if self.model_cache is not None:
+            self.model_cache.invalidate()
 
     def _extract_archive(self, src_path: str, dst_path: str) -> None:
         """
-        Internal method used for validating models/modules. It extract archive to destination path.
+        Internal method used for validating models/modules. It extract archive to destination path. Members pointing
+        outside of destination path are rejected with ValueError, see: archive.safe_members.
         :param src_path: Full path to your TF model or module archive
         :param dst_path: Path where extract archive
         :return: None
         """
         self.loger.debug("extracting archive")
-        archive = tarfile.open(src_path, "r")
-        archive.extractall(dst_path)
-        archive.close()
+        try:
+            archive = tarfile.open(src_path, "r")
+        except tarfile.ReadError:
+            # tarfile detects only gzip, bz2 and xz compression
+            with open_tar_stream(src_path) as archive:
+                archive.extractall(dst_path, members=safe_members(archive))
+        else:
+            with archive:
+                archive.extractall(dst_path, members=safe_members(archive))
         self.loger.debug("extraction DONE")
 
-    def create_archive(self, src_path: str, dst_path: str) -> str:
+    def create_archive(
+        self,
+        src_path: str,
+        dst_path: str,
+        hash_on_write: bool = False,
+        compression: str = "",
+        level: int = None,
+        threads: int = 0,
+        reproducible: bool = None,
+    ) -> str:
         """
         Method create tar archive with TF model or module files compatible with TensorFlow Deploy.
         :param src_path: Full path to your TF model or module
         :param dst_path: Full path to your TF model or module
+        :param hash_on_write: (optional) Calculate hash from tar stream while it is written, instead of reading the
+        archive back from disk (default: False)
+        :param compression: (optional) Compress archive: 'gzip' (multi-member gzip compressed in blocks on many
+        threads) or 'zstd' (multi-threaded zstd, requires zstandard package). Compressed archives are detected
+        transparently when they are validated or extracted (default: no compression)
+        :param level: (optional) Compression level (default: 6 for gzip, 3 for zstd)
+        :param threads: (optional) Number of compressing threads, 0 - all cores (default: 0)
+        :param reproducible: (optional) Add files in sorted order with normalized modification time, owner and
+        permissions, so the same files give byte-identical archive (default: reproducible_archives of cursor)
         :return: String with calculated hash of archive
         """
 
-        def tar_filter(tarinfo):
-            """
-            Filter takes least nested direction.
-            """
-            tarinfo.name = (
-                "."
-                + tarinfo.name[
-                    len(os.path.splitdrive(str(src_path))[1].lstrip(os.path.sep)) :
-                ]
-            )
-            return tarinfo
-
         # fix for path like my/path/ (ended with slash) - it causes archives with hidden files, ei. started with dot
         sep = str(os.path.sep)
         src_path = src_path.rstrip(sep)
-        self.loger.debug("creating tar archive")
-        archive = tarfile.open(dst_path, "w")
+        if reproducible is None:
+            reproducible = self.reproducible_archives
+        # format and encoding are fixed, so archive doesn't depend on Python version or locale
+        tar_options = {"format": tarfile.PAX_FORMAT, "encoding": "utf-8"}
+        self.loger.debug(f"creating tar archive, reproducible: {reproducible}")
+        if check_compression(compression):
+            # compressed archive is always hashed while it is written
+            with open(dst_path, "wb") as fh:
+                hashing_fh = HashingFileWrapper(fh)
+                writer = compressing_writer(hashing_fh, compression, level, threads)
+                try:
+                    archive = tarfile.open(fileobj=writer, mode="w", **tar_options)
+                    add_directory(archive, src_path, reproducible)
+                    archive.close()
+                finally:
+                    writer.close()
+            archive_hash = hashing_fh.hexdigest()
+        elif hash_on_write:
+            with open(dst_path, "wb") as fh:
+                hashing_fh = HashingFileWrapper(fh)
+                archive = tarfile.open(fileobj=hashing_fh, mode="w", **tar_options)
+                add_directory(archive, src_path, reproducible)
+                archive.close()
+            archive_hash = hashing_fh.hexdigest()
+        else:
+            archive = tarfile.open(dst_path, "w", **tar_options)
 
-        archive.add(src_path, filter=tar_filter)
-        archive.close()
-        archive_hash = self._calculate_hash(dst_path)
+            add_directory(archive, src_path, reproducible)
+            archive.close()
+            archive_hash = self._calculate_hash(dst_path)
         self.loger.debug("archive created")
 
         return archive_hash
 
+    def fingerprint(self, src_path: str, workers: int = 0) -> str:
+        """
+        Method calculate fingerprint of TF model or module directory from contents of its files, which are hashed in
+        parallel and combined into Merkle-style root hash. It tells whether model changed without creating archive.
+        With digest_cache, only files with changed size, modification time or inode are read again.
+        :param src_path: Full path to your TF model or module
+        :param workers: (optional) Number of hashing threads, 0 - all cores (default: 0)
+        :return: String with fingerprint
+        """
+        start = perf_counter()
+        try:
+            fingerprint = fingerprint_directory(
+                src_path, workers, self.digest_cache, "sha256", self.hash_block_size, self.hash_mode
+            )
+        except OSError as error:
+            raise ValueError(f"Fingerprint failed! Error: {error}")
+        self.loger.debug(f"fingerprint of {src_path} took {perf_counter() - start:.3f}s")
+        return fingerprint
+
+    @operation
     def delete_label(self, label: str) -> str:
         """
         Method delete given label for given model, except label: 'stable'.
@@ -235,12 +628,13 @@ class TFD:
         if not remove_decision:
             return "Nothing to do"
 
-        response = requests.delete(request_url)
+        response = self.session.delete(request_url)
         if response.status_code != 200:
             return f"delete_label error: {response.text}"
 
         return f"delete_label success: {response.text}"
 
+    @operation
     def delete_model(self, version: int = None, label: str = "") -> str:
         """
         Function delete specific model from TensorFlow Deploy. Only one param of two should be given.
@@ -261,12 +655,13 @@ class TFD:
         if not remove_decision:
             return "Nothing to do"
 
-        response = requests.delete(request_url)
+        response = self.session.delete(request_url)
         if response.status_code != 200:
             return f"delete_model error: {response.text}"
 
         return f"delete_model success: {response.text}"
 
+    @operation
     def delete_module(self, version: int) -> str:
         """
         Method delete specific module from TensorFlow Deploy.
@@ -280,26 +675,53 @@ class TFD:
         if not remove_decision:
             return "Nothing to do"
 
-        response = requests.delete(request_url)
+        response = self.session.delete(request_url)
 
         if response.status_code != 200:
             return f"delete_module error: {response.text}"
 
         return f"delete_module success: {response.text}"
 
-    def deploy_model(self, src_path: str, label: str = "") -> str:
+    @operation
+    def deploy_model(
+        self,
+        src_path: str,
+        label: str = "",
+        stream: bool = False,
+        wait: bool = False,
+        wait_timeout: float = 300,
+        skip_existing: bool = False,
+        compression: str = "",
+        delta: bool = False,
+    ) -> str:
         """
         Method deploy given model to production, i.e., upload model and reload all related TFS instances.
         :param src_path: Full path to model
         :param label: Label for deploying model (if give it overwrite label parameter in cursor)
+        :param stream: (optional) Stream archive directly into request body, see: upload_model (default: False)
+        :param wait: (optional) Wait until every TFS instance serves uploaded model version, see: reload_config
+        (default: False)
+        :param wait_timeout: (optional) Maximum time of waiting in seconds, limited also by deadline of the call
+        (default: 300)
+        :param skip_existing: (optional) Don't upload model already uploaded with the same archive hash, just set
+        label to its version, see: upload_model (default: False)
+        :param compression: (optional) Compression of uploaded archive, see: upload_model (default: no compression)
+        :param delta: (optional) Upload only files which TensorFlow Deploy doesn't have yet, see: upload_model
+        (default: False)
         :return: Action result
         """
 
-        upload_response = self.upload_model(src_path, label)
-        if upload_response != "Upload success!":
+        # nested calls share deadline of this call, so upload and reload get only remaining time
+        upload_response = self.upload_model(
+            src_path, label, stream=stream, skip_existing=skip_existing, compression=compression, delta=delta
+        )
+        if not upload_response.startswith(("Upload success!", "Upload deduplicated!")):
             return f"Deploy failed. Upload error: {upload_response}"
 
-        reload_response = self.reload_config()
+        if wait:
+            reload_response = self.reload_config(wait=True, label=label, wait_timeout=wait_timeout)
+        else:
+            reload_response = self._request_reload(self.project, short_reload=True)
 
         return f"Deploy results:\nupload: {upload_response}\nreload: {reload_response}"
 
@@ -355,6 +777,7 @@ class TFD:
         with open(os.path.join(dst_path, "README.md"), "w") as fh:
             fh.write(readme)
 
+    @operation
     def get_config(self) -> str:
         """
         This metod return string with model_config_file - current TFS configuration.
@@ -362,24 +785,58 @@ class TFD:
         """
 
         request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/config"
-        response = requests.get(request_url)
+        response = self.session.get(request_url)
         if response.status_code != 200:
             return f"get_config error: {response.text}"
         else:
             return response.text
 
-    def get_model(self, dst_path: str, version: int = 0, label: str = "") -> str:
+    @operation
+    def get_model(
+        self,
+        dst_path: str,
+        version: int = 0,
+        label: str = "",
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        expected_hash: str = "",
+        resume: bool = False,
+        resume_attempts: int = 3,
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        extract_to: str = "",
+    ) -> str:
         """
-        Method download specific model to given path.
+        Method download specific model to given path. Archive is streamed to disk in chunks, so memory use is bounded
+        by buffer_size, and it appears under destination path only when download is complete.
         :param dst_path: Directory where write model
         :param version: Model version (priority over label, optional)
         :param label: Model label (optional)
+        :param buffer_size: Size of downloaded chunks kept in memory in bytes (optional, default: 8 MiB)
+        :param expected_hash: Expected SHA256 hash of model archive, verified during download (optional)
+        :param resume: Keep partially downloaded archive and continue it with HTTP Range requests after connection
+        errors, also in next call with the same parameters (optional, default: False)
+        :param resume_attempts: Number of download attempts in resume mode (optional, default: 3)
+        :param workers: Number of concurrent HTTP Range requests. With more than 1 worker, archive is split into
+        chunk_size ranges downloaded in parallel; resume is not used then (optional, default: 1)
+        :param chunk_size: Size of one range in parallel mode in bytes (optional, default: 64 MiB)
+        :param extract_to: Directory where model is extracted instead of writing archive to dst_path (not used
+        then). Archive is extracted from HTTP response in one stream and directory appears only when whole model
+        was received, so model is ready to load. Directory must not exist or be empty (optional)
         :return: Action result
+        Note: with model_cache enabled, model version is taken from cache without any request. Model label is
+        checked with conditional request and downloaded (in one stream) only if it points to other archive.
         """
-        path = Path(dst_path)
-        if not path.is_dir():
-            return "ERROR: dst_path is not dir"
-        path = path.joinpath(f"model_{int(time())}.tar")
+        if extract_to:
+            path = Path(extract_to)
+            if not path.parent.is_dir():
+                return "ERROR: parent of extract_to is not dir"
+            if path.exists() and (not path.is_dir() or any(path.iterdir())):
+                return "ERROR: extract_to is not empty dir"
+        else:
+            path = Path(dst_path)
+            if not path.is_dir():
+                return "ERROR: dst_path is not dir"
+            path = path.joinpath(f"model_{int(time())}.tar")
 
         if version:
             request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/versions/{version}"
@@ -388,35 +845,298 @@ class TFD:
         else:
             request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/labels/{self.label}"
 
-        response = requests.get(request_url)
-        if response.status_code != 200:
-            return f"Connection error: {response.text}"
-
-        path.write_bytes(response.content)
-        return f"Model successfully written to {str(path)}"
-
-    def get_module(self, dst_path: str, version: int) -> str:
+        error = self._download_archive(
+            request_url,
+            path,
+            buffer_size,
+            expected_hash,
+            resume,
+            resume_attempts,
+            workers,
+            chunk_size,
+            immutable=bool(version),
+            extract=bool(extract_to),
+        )
+        if error:
+            return error
+        if extract_to:
+            return f"Model successfully extracted to {str(path)}{self._retries_note()}"
+        return f"Model successfully written to {str(path)}{self._retries_note()}"
+
+    @operation
+    def get_module(
+        self,
+        dst_path: str,
+        version: int,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        expected_hash: str = "",
+        resume: bool = False,
+        resume_attempts: int = 3,
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        extract_to: str = "",
+    ) -> str:
         """
-        Method download specyfic module to given path.
+        Method download specyfic module to given path. Archive is streamed to disk in chunks, see: get_model.
         :param dst_path: Directory where write module
         :param version: Module version
+        :param buffer_size: Size of downloaded chunks kept in memory in bytes (optional, default: 8 MiB)
+        :param expected_hash: Expected SHA256 hash of module archive, verified during download (optional)
+        :param resume: Resume interrupted downloads with HTTP Range requests, see: get_model (optional, default: False)
+        :param resume_attempts: Number of download attempts in resume mode (optional, default: 3)
+        :param workers: Number of concurrent HTTP Range requests, see: get_model (optional, default: 1)
+        :param chunk_size: Size of one range in parallel mode in bytes (optional, default: 64 MiB)
+        :param extract_to: Directory where module is extracted instead of writing archive to dst_path, see: get_model
+        (optional)
         :return: Action result
         """
 
-        path = Path(dst_path)
-        if not path.is_dir():
-            return "ERROR: dst_path is not dir"
-        path = path.joinpath(f"module_{int(time())}.tar")
+        if extract_to:
+            path = Path(extract_to)
+            if not path.parent.is_dir():
+                return "ERROR: parent of extract_to is not dir"
+            if path.exists() and (not path.is_dir() or any(path.iterdir())):
+                return "ERROR: extract_to is not empty dir"
+        else:
+            path = Path(dst_path)
+            if not path.is_dir():
+                return "ERROR: dst_path is not dir"
+            path = path.joinpath(f"module_{int(time())}.tar")
 
         request_url = f"http://{self.host}:{self.port}/v1/modules/{self.team}/{self.project}/names/{self.name}/versions/{version}"
 
-        response = requests.get(request_url)
+        error = self._download_archive(
+            request_url,
+            path,
+            buffer_size,
+            expected_hash,
+            resume,
+            resume_attempts,
+            workers,
+            chunk_size,
+            immutable=True,
+            extract=bool(extract_to),
+        )
+        if error:
+            return error
+        if extract_to:
+            return f"Module successfully extracted to {str(path)}{self._retries_note()}"
+        return f"Module successfully written to {str(path)}{self._retries_note()}"
+
+    def _download_archive(
+        self,
+        request_url: str,
+        path: Path,
+        buffer_size: int,
+        expected_hash: str,
+        resume: bool,
+        resume_attempts: int,
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        immutable: bool = False,
+        extract: bool = False,
+    ) -> str:
+        """
+        Internal method. Download model/module archive from given URL to given path, through model cache if it is
+        enabled.
+        :param request_url: TensorFlow Deploy download endpoint
+        :param path: Destination file path
+        :param buffer_size: Size of downloaded chunks kept in memory in bytes
+        :param expected_hash: Expected SHA256 hash of archive
+        :param resume: Resume interrupted downloads with HTTP Range requests
+        :param resume_attempts: Number of download attempts in resume mode
+        :param workers: Number of concurrent HTTP Range requests
+        :param chunk_size: Size of one range in parallel mode in bytes
+        :param immutable: Does URL always point to the same archive (model/module version)?
+        :param extract: Extract archive to given path in single stream mode instead of writing it
+        :return: Empty string on success, otherwise error message
+        """
+        if extract:
+            # extraction is made in one stream, which can't be resumed
+            resume = False
+        try:
+            if extract:
+                archive_hash, _ = self._fetch_archive(
+                    request_url, path, buffer_size, expected_hash, False, resume_attempts, extract=True
+                )
+            elif self.model_cache is None:
+                archive_hash, _ = self._fetch_archive(
+                    request_url,
+                    path,
+                    buffer_size,
+                    expected_hash,
+                    resume,
+                    resume_attempts,
+                    workers,
+                    chunk_size,
+                )
+            else:
+                archive_hash = self._download_cached_archive(
+                    request_url,
+                    path,
+                    buffer_size,
+                    expected_hash,
+                    resume,
+                    resume_attempts,
+                    workers,
+                    chunk_size,
+                    immutable,
+                )
+        except requests.HTTPError as error:
+            return f"Connection error: {error.response.text}"
+        except ValueError as error:
+            return f"Download error: {error}"
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+        ) as error:
+            if not resume:
+                raise
+            return f"Download interrupted, call again to resume it: {error}"
+        self.loger.debug(f"archive hash: {archive_hash}")
+        return ""
+
+    def _fetch_archive(
+        self,
+        request_url: str,
+        path: Path,
+        buffer_size: int,
+        expected_hash: str,
+        resume: bool,
+        resume_attempts: int,
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        headers: dict = None,
+        extract: bool = False,
+    ) -> tuple:
+        """
+        Internal method. Download archive from given URL to given path in parallel, resumable or single stream mode.
+        :param request_url: TensorFlow Deploy download endpoint
+        :param path: Destination file path
+        :param buffer_size: Size of downloaded chunks kept in memory in bytes
+        :param expected_hash: Expected SHA256 hash of archive
+        :param resume: Resume interrupted downloads with HTTP Range requests
+        :param resume_attempts: Number of download attempts in resume mode
+        :param workers: Number of concurrent HTTP Range requests
+        :param chunk_size: Size of one range in parallel mode in bytes
+        :param headers: (optional) Headers of single stream request, e.g. conditional ones
+        :param extract: (optional) Extract archive to given directory in single stream mode
+        :return: Tuple with archive hash and single stream response (None in other modes). Archive hash is empty if
+        server responded 304 Not Modified.
+        """
+        if workers > 1:
+            return (
+                download_parallel(
+                    self.session,
+                    request_url,
+                    path,
+                    workers,
+                    chunk_size,
+                    buffer_size,
+                    expected_hash,
+                ),
+                None,
+            )
+        if resume:
+            return (
+                download_resumable(
+                    self.session,
+                    request_url,
+                    path,
+                    buffer_size,
+                    expected_hash,
+                    resume_attempts,
+                ),
+                None,
+            )
+        response = self.session.get(request_url, headers=headers, stream=True)
+        if response.status_code == 304 and headers:
+            response.close()
+            return "", response
         if response.status_code != 200:
-            return f"Connection error: {response.text}"
+            raise requests.HTTPError(
+                f"unexpected status code: {response.status_code}", response=response
+            )
+        if extract:
+            return extract_response(response, path, buffer_size, expected_hash), response
+        return write_response(response, path, buffer_size, expected_hash), response
 
-        path.write_bytes(response.content)
-        return f"Module successfully written to {str(path)}"
+    def _download_cached_archive(
+        self,
+        request_url: str,
+        path: Path,
+        buffer_size: int,
+        expected_hash: str,
+        resume: bool,
+        resume_attempts: int,
+        workers: int,
+        chunk_size: int,
+        immutable: bool,
+    ) -> str:
+        """
+        Internal method. Write archive from model cache to given path, downloading it to cache first if it's missing
+        or stale. Downloads of one URL are serialized by cross-process lock, so parallel jobs download archive once.
+        Archives of immutable URLs are reused without any request, other ones are checked with conditional request
+        (If-None-Match/If-Modified-Since), which is sent in single stream mode to get validators of new archive.
+        :param request_url: TensorFlow Deploy download endpoint
+        :param path: Destination file path
+        :param buffer_size: Size of downloaded chunks kept in memory in bytes
+        :param expected_hash: Expected SHA256 hash of archive
+        :param resume: Resume interrupted downloads with HTTP Range requests
+        :param resume_attempts: Number of download attempts in resume mode
+        :param workers: Number of concurrent HTTP Range requests
+        :param chunk_size: Size of one range in parallel mode in bytes
+        :param immutable: Does URL always point to the same archive (model/module version)?
+        :return: SHA256 hash of archive
+        """
+        key = self.model_cache.key(request_url)
+        with self.model_cache.lock(key):
+            entry = self.model_cache.get(key)
+            if entry and expected_hash and entry["hash"] != expected_hash.lower():
+                entry = None
+            if entry and immutable and self.model_cache.copy_to(entry["hash"], path):
+                self.loger.info("archive taken from model cache")
+                return entry["hash"]
+
+            headers = {}
+            if not immutable:
+                resume, workers = False, 1
+                if entry and entry["etag"]:
+                    headers["If-None-Match"] = entry["etag"]
+                if entry and entry["last_modified"]:
+                    headers["If-Modified-Since"] = entry["last_modified"]
+
+            download_path = self.model_cache.download_path(key)
+            archive_hash, response = self._fetch_archive(
+                request_url,
+                download_path,
+                buffer_size,
+                expected_hash,
+                resume,
+                resume_attempts,
+                workers,
+                chunk_size,
+                headers,
+            )
+            if not archive_hash:
+                if self.model_cache.copy_to(entry["hash"], path):
+                    self.loger.info("archive not modified, taken from model cache")
+                    return entry["hash"]
+                archive_hash, response = self._fetch_archive(
+                    request_url, download_path, buffer_size, expected_hash, False, resume_attempts
+                )
+            validators = {}
+            if response is not None and not immutable:
+                validators = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+            self.model_cache.put(key, download_path, archive_hash, **validators)
+            if not self.model_cache.copy_to(archive_hash, path):
+                raise ValueError("archive was evicted from model cache, increase model_cache_size")
+        return archive_hash
 
+    @operation
     def list_models(
         self,
         team: str = "",
@@ -437,7 +1157,7 @@ class TFD:
         :return: pandas.DataFrame with search results
         """
         request_url = f"http://{self.host}:{self.port}/v1/models/list"
-        response = requests.get(
+        response = self.session.get(
             request_url,
             params={
                 "team": team,
@@ -450,19 +1170,9 @@ class TFD:
         if response.status_code != 200:
             return f"list_models error: {response.text}"
 
-        df = pd.DataFrame(json.loads(response.text))
-        if df.empty:
-            return "Empty list - nothing to show"
-        df.created = pd.to_datetime(df.created, unit="s")
-        df.updated = pd.to_datetime(df.updated, unit="s")
-        try:
-            df.label = df.label.fillna("")
-        except AttributeError:
-            df["label"] = ""
-            pass
-
-        return df
+        return self._list_to_dataframe(response.text, labels=True)
 
+    @operation
     def list_modules(
         self, team: str = "", project: str = "", name: str = "", version: int = 0
     ) -> str:
@@ -476,37 +1186,279 @@ class TFD:
         :param version: VERSION (optional)
         :return: pandas.DataFrame with search results
         """
-
         request_url = f"http://{self.host}:{self.port}/v1/modules/list"
-        response = requests.get(
+        response = self.session.get(
             request_url,
             params={"team": team, "project": project, "name": name, "version": version},
         )
         if response.status_code != 200:
             return f"list_modules error: {response.text}"
 
-        df = pd.DataFrame(json.loads(response.text))
+        return self._list_to_dataframe(response.text)
+
+    @staticmethod
+    def _list_to_dataframe(text: str, labels: bool = False):
+        """
+        Internal method. Convert JSON list of models/modules returned by TensorFlow Deploy into pandas.DataFrame.
+        :param text: Response body
+        :param labels: Does list contain model labels?
+        :return: pandas.DataFrame or message about empty list
+        """
+        import pandas as pd
+
+        df = pd.DataFrame(json.loads(text))
         if df.empty:
             return "Empty list - nothing to show"
         df.created = pd.to_datetime(df.created, unit="s")
         df.updated = pd.to_datetime(df.updated, unit="s")
+        if labels:
+            try:
+                df.label = df.label.fillna("")
+            except AttributeError:
+                df["label"] = ""
 
         return df
 
-    def reload_config(self, short_reload: bool = True) -> str:
+    @operation
+    def reload_config(
+        self,
+        short_reload: bool = True,
+        wait: bool = False,
+        version: int = 0,
+        label: str = "",
+        wait_timeout: float = 300,
+    ) -> str:
         """
-        Method allows you reload all TFS instances.
+        Method allows you reload all TFS instances. With wait, method returns when every TFS instance reports given
+        model version (by default version with cursor label) as AVAILABLE, polling reload_status with exponential
+        backoff and jitter, and returns time after which every instance was ready.
         :param short_reload: bool (optional): True for simple reload, False for full reload
+        :param wait: (optional) Wait until model version is available on every TFS instance (default: False)
+        :param version: (optional) Model version to wait for (priority over label)
+        :param label: (optional) Label of model version to wait for (default: cursor label)
+        :param wait_timeout: (optional) Maximum time of waiting in seconds, limited also by deadline of the call
+        (default: 300)
+        :return: Action result
+        """
+        if wait and not version:
+            version = self._label_version(label or self.label)
+            if not version:
+                return f"reload_config error: model with label {label or self.label} not found"
+
+        if self.reload_delay:
+            # explicit reload includes pending coalesced reload
+            scheduler = self._reload_scheduler(self.project)
+            scheduler.request(short_reload)
+            result = scheduler.flush()
+        else:
+            result = self._reload_project(self.project, short_reload)
+        if not wait or result != "reload_config success!":
+            return result + self._retries_note()
+
+        timings, not_ready = self._wait_for_version(version, wait_timeout)
+        if not_ready:
+            return (
+                f"reload_config error: model version {version} not available within {wait_timeout}s on: {not_ready}"
+                f"{self._retries_note()}"
+            )
+        ready = "\n".join(f"{instance}: {timing:.2f}s" for instance, timing in timings.items())
+        return f"{result}{self._retries_note()}\nmodel version {version} available on:\n{ready}"
+
+    @operation
+    def reload_status(self) -> dict:
+        """
+        Method return status of cursor model on every TFS instance of project, i.e. states of model versions
+        (e.g. START, LOADING, AVAILABLE, UNLOADING, END) reported by TensorFlow Serving.
+        :return: Dictionary {instance: {version: state}} or error message
+        """
+        request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/status"
+        response = self.session.get(request_url)
+        if response.status_code != 200:
+            return f"reload_status error: {response.text}"
+
+        status = {}
+        for instance, model_status in json.loads(response.text).items():
+            status[instance] = {
+                int(version_status["version"]): version_status["state"]
+                for version_status in model_status.get("model_version_status", [])
+            }
+        return status
+
+    def _wait_for_version(
+        self,
+        version: int,
+        timeout: float,
+        initial_delay: float = 0.5,
+        max_delay: float = 10,
+    ) -> tuple:
+        """
+        Internal method. Poll reload_status with exponential backoff and jitter until given model version is
+        AVAILABLE on every TFS instance or timeout (or deadline of current operation) passes. Errors of status
+        requests are treated as not ready.
+        :param version: Model version
+        :param timeout: Maximum time of waiting in seconds
+        :param initial_delay: (optional) First delay between polls in seconds (default: 0.5)
+        :param max_delay: (optional) Maximum delay between polls in seconds (default: 10)
+        :return: Tuple with dictionary {instance: seconds until version was available} and list of instances not
+        ready in time
+        """
+        timeout = remaining_time(timeout)
+        start = perf_counter()
+        timings = {}
+        not_ready = ["all instances"]
+        delay = initial_delay
+        while True:
+            try:
+                status = self.reload_status()
+            except requests.exceptions.RequestException as error:
+                status = f"reload_status error: {error}"
+            elapsed = perf_counter() - start
+            if isinstance(status, dict) and status:
+                for instance, versions in status.items():
+                    if versions.get(version) == "AVAILABLE":
+                        timings.setdefault(instance, elapsed)
+                not_ready = [instance for instance in status if instance not in timings]
+                if not not_ready:
+                    return timings, []
+            else:
+                self.loger.debug(f"{status}")
+
+            remaining = timeout - (perf_counter() - start)
+            if remaining <= 0:
+                return timings, not_ready
+            # equal jitter: half of delay is fixed, half is random
+            sleep(min(remaining, delay / 2 + random.uniform(0, delay / 2)))
+            delay = min(delay * 2, max_delay)
+
+    def _label_version(self, label: str) -> int:
+        """
+        Internal method. Return version of cursor model with given label, or 0 if it's not found.
+        :param label: Model label
+        :return: Model version
+        """
+        models = self._list_model_records(label=label)
+        return max((int(model.get("version") or 0) for model in models), default=0)
+
+    # Deduplication contract (skip_existing) proposed for TensorFlow Deploy. Uploads send SHA256 of uploaded archive in
+    # `archive_hash` form field and TensorFlow Deploy stores it with model version:
+    #
+    #   GET /v1/models/list?team={team}&project={project}&name={name}
+    #       response 200: list of records (or dictionary of columns) of model versions, each with `version` and
+    #       `archive_hash` fields
+    #
+    # Servers which don't return archive_hash never match, so model is always uploaded. Archive hash identifies the
+    # same model only for the same archive bytes, see: reproducible_archives.
+    def _hash_version(self, archive_hash: str) -> int:
+        """
+        Internal method. Return newest version of cursor model uploaded with given archive hash, or 0 if it's not found
+        (also when TensorFlow Deploy doesn't return archive hashes in list of models).
+        :param archive_hash: SHA256 hash of archive
+        :return: Model version
+        """
+        models = self._list_model_records()
+        versions = [int(model.get("version") or 0) for model in models if model.get("archive_hash") == archive_hash]
+        return max(versions, default=0)
+
+    def _list_model_records(self, **params) -> list:
+        """
+        Internal method. Return list of cursor models as records, without converting it into pandas.DataFrame.
+        :param params: Additional search criteria, e.g. label
+        :return: List of dictionaries, empty on error
+        """
+        response = self.session.get(
+            f"http://{self.host}:{self.port}/v1/models/list",
+            params={"team": self.team, "project": self.project, "name": self.name, **params},
+        )
+        if response.status_code != 200:
+            return []
+        models = json.loads(response.text)
+        if isinstance(models, dict):
+            # dictionary of columns, as read by pandas.DataFrame
+            columns = {key: list(value.values()) if isinstance(value, dict) else value for key, value in models.items()}
+            return [dict(zip(columns, row)) for row in zip(*columns.values())]
+        return models
+
+    @operation
+    def flush_reload(self) -> str:
+        """
+        Method make pending coalesced reloads immediately, see: reload_delay parameter.
+        :return: Action result
+        """
+        results = [
+            f"reload {project}: {scheduler.flush()}"
+            for project, scheduler in self.reload_schedulers.items()
+        ]
+        return "\n".join(results) or "Nothing to reload"
+
+    def _request_reload(self, project: str, short_reload: bool) -> str:
+        """
+        Internal method. Reload given project immediately, or schedule coalesced reload if reload_delay is set.
+        :param project: PROJECT
+        :param short_reload: True for simple reload, False for full reload
         :return: Action result
         """
-        # TODO: Need to add the `reload_status` method and modify `reload_config`
-        request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/reload"
-        response = requests.post(request_url, params={"SkipShortConfig": short_reload})
+        if not self.reload_delay:
+            return self._reload_project(project, short_reload)
+        self._reload_scheduler(project).request(short_reload)
+        return "reload_config scheduled"
+
+    def _reload_scheduler(self, project: str) -> ReloadScheduler:
+        """
+        Internal method. Return reload scheduler of given project, shared with other cursors if shared_reload is set.
+        :param project: PROJECT
+        :return: ReloadScheduler object
+        """
+        if project not in self.reload_schedulers:
+            reload = partial(self._reload_project, project)
+            if self.shared_reload:
+                self.reload_schedulers[project] = shared_scheduler(
+                    self._shared_scheduler_key(project),
+                    reload,
+                    self.reload_delay,
+                    self.reload_max_delay,
+                )
+            else:
+                self.reload_schedulers[project] = ReloadScheduler(
+                    reload, self.reload_delay, self.reload_max_delay
+                )
+        return self.reload_schedulers[project]
+
+    def _shared_scheduler_key(self, project: str) -> tuple:
+        """
+        Internal method. Return key of reload scheduler of given project shared by cursors of the same instance.
+        :param project: PROJECT
+        :return: Scheduler key
+        """
+        return self.host, self.port, self.team, project
+
+    @staticmethod
+    def _retries_note() -> str:
+        """
+        Internal method. Return note about retries made so far by current operation, added to action results.
+        :return: Note, empty if there were no retries
+        """
+        operation = current_operation()
+        if operation is None or not operation.retries:
+            return ""
+        return f" (retries: {operation.retries})"
+
+    def _reload_project(self, project: str, short_reload: bool) -> str:
+        """
+        Internal method. Reload all TFS instances of given project of cursor team.
+        :param project: PROJECT
+        :param short_reload: True for simple reload, False for full reload
+        :return: Action result
+        """
+        request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{project}/reload"
+        # reload of config has the same effect when repeated, so it is retried like idempotent requests
+        with retry_safe():
+            response = self.session.post(request_url, params={"SkipShortConfig": short_reload})
         if response.status_code != 200:
             return f"reload_config error: {response.text}"
         else:
             return "reload_config success!"
 
+    @operation
     def revert_model(self) -> str:
         """
         Method revert previous model stable version. It can be used only ones, because remember just last stable
@@ -514,12 +1466,13 @@ class TFD:
         :return: Action result
         """
         request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/revert"
-        response = requests.put(request_url)
+        response = self.session.put(request_url)
         if response.status_code != 200:
-            return f"revert_model error: {response.text}"
+            return f"revert_model error: {response.text}{self._retries_note()}"
         else:
-            return f"revert_model success!\n{response.text}"
+            return f"revert_model success!{self._retries_note()}\n{response.text}"
 
+    @operation
     def set_label(self, version: int = None, label: str = "") -> str:
         """
         Method set given label to specific model.
@@ -535,14 +1488,89 @@ class TFD:
             request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/versions/{version}/labels/{label}"
         else:
             request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/versions/{version}/labels/{self.label}"
-        response = requests.put(request_url)
+        response = self._put_label(request_url, label or self.label)
         if response.status_code != 200:
-            return f"set_label error: {response.text}"
+            return f"set_label error: {response.text}{self._retries_note()}"
 
-        reload_response = self.reload_config(short_reload=False)
+        reload_response = self._request_reload(self.project, short_reload=False)
 
-        return f"set_label success: {response.text}, reload: {reload_response}"
+        return f"set_label success: {response.text}, reload: {reload_response}{self._retries_note()}"
+
+    @operation
+    def set_labels_bulk(self, assignments: list, workers: int = 8) -> str:
+        """
+        Method set labels to many models at once, e.g. when release is promoted. Labels are set concurrently over
+        pooled connections and then one full reload is made for every project with at least one changed label,
+        instead of reload after every label.
+        :param assignments: List of (name, version, label) tuples, or (project, name, version, label) tuples for
+        models from other projects of the team
+        :param workers: (optional) Number of concurrent requests (default: 8)
+        :return: Action result with result of every assignment and every reload
+        """
+        items = [self._prepare_label_assignment(assignment) for assignment in assignments]
+        if not items:
+            return "Nothing to do"
+
+        def set_one(item: tuple) -> tuple:
+            project, name, version, label = item
+            request_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{project}/names/{name}/versions/{version}/labels/{label}"
+            try:
+                response = self._put_label(request_url, label)
+            except requests.exceptions.RequestException as error:
+                return False, f"error: {error}"
+            if response.status_code != 200:
+                return False, f"error: {response.text}"
+            return True, f"success: {response.text}"
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as executor:
+            # labels are set in context of current operation, so their retries are counted in it
+            futures = [executor.submit(contextvars.copy_context().run, set_one, item) for item in items]
+            results = [future.result() for future in futures]
+
+        lines = [f"set_labels_bulk results{self._retries_note()}:"]
+        projects = []
+        for (project, name, version, label), (success, result) in zip(items, results):
+            lines.append(f"{project}/{name} version {version} label {label}: {result}")
+            if success and project not in projects:
+                projects.append(project)
+        for project in projects:
+            lines.append(f"reload {project}: {self._request_reload(project, short_reload=False)}")
+
+        return "\n".join(lines)
+
+    def _put_label(self, request_url: str, label: str) -> requests.Response:
+        """
+        Internal method. Set label with PUT request. Label 'stable' can be moved meanwhile by concurrent set_stable,
+        so only requests setting other labels are retried (replaying them is harmless).
+        :param request_url: TensorFlow Deploy endpoint of label
+        :param label: Label name
+        :return: Response
+        """
+        if label == "stable":
+            return self.session.put(request_url)
+        with retry_safe():
+            return self.session.put(request_url)
 
+    def _prepare_label_assignment(self, assignment) -> tuple:
+        """
+        Internal method. Check label assignment and complete it with cursor project.
+        :param assignment: (name, version, label) or (project, name, version, label) tuple
+        :return: (project, name, version, label) tuple
+        """
+        if len(assignment) == 3:
+            assignment = (self.project, *assignment)
+        if len(assignment) != 4:
+            raise ValueError(f"Label assignment must be (name, version, label) tuple, got: {assignment}")
+        project, name, version, label = assignment
+        project = project or self.project
+        if not (name and version and label):
+            raise ValueError(f"You need to specify name, version and label, got: {assignment}")
+        for param, value in (("PROJECT", project), ("NAME", name), ("LABEL", label)):
+            if not isinstance(value, str) or not check_str_param.fullmatch(value):
+                raise ValueError(f"Parameter {param} has invalid format: {value}!")
+        return project.lower(), name.lower(), int(version), label.lower()
+
+    @operation
     def set_stable(self, version: int = None, attempts: int = 3) -> str:
         """
         Method set label 'stable' to specific model. Robustness of this function is critical, hence parameter
@@ -566,43 +1594,103 @@ class TFD:
 
         errors = []
         for i in range(attempts):
-            response = requests.put(request_url)
+            if i:
+                sleep(max(0, remaining_time(self.retry.delay(i - 1))))
+            try:
+                # attempts replace retries of session, which would send request attempts^2 times
+                with no_retry():
+                    response = self.session.put(request_url)
+            except DeadlineExceeded:
+                raise
+            except requests.exceptions.RequestException as error:
+                errors.append(f"#{i} error: {error}")
+                continue
             if response.status_code != 200:
                 errors.append(f"#{i} error: {response.text}")
             else:
                 break
         else:
-            return f"set_stable error! Errors from all attempts: {errors}"
+            return f"set_stable error! Errors from all attempts: {errors}{self._retries_note()}"
 
-        reload_response = self.reload_config(short_reload=False)
-        return f"set_stable success: {response.text}, reload status: {reload_response}"
+        reload_response = self._request_reload(self.project, short_reload=False)
+        return f"set_stable success: {response.text}, reload status: {reload_response}{self._retries_note()}"
 
-    def upload_model(self, src_path: str, label: str = "", timeout: int = 120) -> str:
+    @operation
+    def upload_model(
+        self,
+        src_path: str,
+        label: str = "",
+        timeout: int = 120,
+        stream: bool = False,
+        hash_pre_pass: bool = False,
+        skip_existing: bool = False,
+        compression: str = "",
+        delta: bool = False,
+    ) -> str:
         """
         Method upload directory/archive containing TF model to TensorFlow Deploy.
         :param src_path: Full path to model. It can also be already archived model
         :param label: (Optional) Label for model
         :param timeout: Upload timeout
+        :param stream: (Optional) Generate archive on the fly and stream it in chunked request body, without temporary
+        archive on disk and without loading archive into memory (default: False)
+        :param hash_pre_pass: (Optional) In stream mode, calculate archive hash in additional pass over files and send
+        it before archive, instead of sending it as the last form field (default: False)
+        :param skip_existing: (Optional) Don't upload archive if model version with the same archive hash already
+        exists, just set label to this version. In stream mode it implies hash_pre_pass. Directories are deduplicated
+        only with reproducible_archives, otherwise their archives differ on every run (default: False)
+        :param compression: (Optional) Compression of archive created from directory: 'gzip' or 'zstd', see:
+        create_archive. If TensorFlow Deploy doesn't accept it, plain tar is uploaded (default: no compression)
+        :param delta: (Optional) Upload model directory as manifest of its files and only files (blobs) which
+        TensorFlow Deploy doesn't have yet for the model, e.g. variables of retrained model without unchanged assets.
+        If TensorFlow Deploy doesn't support delta uploads or delta upload fails, archive is uploaded (default: False)
         :return: Action result
         """
         path = Path(src_path)
         if not label:
             label = self.label
         self.loger.debug(f"src_path: {src_path}")
+        if delta and path.is_dir():
+            result = self._upload_delta(src_path, label, timeout)
+            if result:
+                return result
+        compression = self._negotiate_compression(compression)
+        if skip_existing and path.is_dir() and not self.reproducible_archives:
+            self.loger.warning(
+                "skip_existing without reproducible_archives: archive of directory has different hash on every run, "
+                "so it is unlikely to be deduplicated"
+            )
+        deduplicate = partial(self._deduplicate_upload, label=label) if skip_existing else None
+        if stream:
+            return self._upload_stream(
+                f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/labels/{label}",
+                src_path,
+                timeout,
+                hash_pre_pass or skip_existing,
+                deduplicate,
+                compression,
+            )
         if path.is_dir():
             self.loger.debug("src_path is a directory")
             self._validate_model_or_module(src_path)
-            dst_path = Path(f"tmp_upload_{int(time())}.tar")
-            archive_hash = self.create_archive(src_path=src_path, dst_path=dst_path)
+            dst_path = Path(f"tmp_upload_{int(time())}{ARCHIVE_SUFFIXES[compression]}")
+            archive_hash = self.create_archive(
+                src_path=src_path, dst_path=dst_path, hash_on_write=True, compression=compression
+            )
             self.loger.debug(f"archive path: {dst_path}")
             self.loger.debug(f"archive hash: {archive_hash}")
+            if deduplicate is not None:
+                result = deduplicate(archive_hash)
+                if result:
+                    dst_path.unlink()
+                    return result
             f = open(dst_path, "rb")
             multipart_form_data = {
                 "archive_data": (dst_path.name, f),
                 "archive_hash": archive_hash,
             }
             self.loger.debug("uploading archive")
-            response = requests.post(
+            response = self.session.post(
                 f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/labels/{label}",
                 files=multipart_form_data,
                 timeout=timeout,
@@ -614,23 +1702,31 @@ class TFD:
                 return f"Upload failed!\nServer response: {response.text}"
 
             return "Upload success!"
-        elif path.suffix != ".tar":
+        elif not is_archive_path(path):
             self.loger.debug("src_path in not a tar archive")
             return "Unexpected file extension. src_path must be a tar archive"
         else:
             self.loger.debug("src_path is tar archive")
-            self._validate_archived_model_or_module(str(path))
             path.open()
             self.loger.debug("calculating hash")
             archive_hash = self._calculate_hash(str(path))
+            self._validate_archived_model_or_module(str(path), archive_hash=archive_hash)
             self.loger.debug(f"archive hash: {archive_hash}")
+            error = self._check_archive_compression(str(path))
+            if error:
+                return error
+            if deduplicate is not None:
+                result = deduplicate(archive_hash)
+                if result:
+                    os.remove(str(path))
+                    return result
             f = open(str(path), "rb")
             multipart_form_data = {
                 "archive_data": (path.name, f),
                 "archive_hash": archive_hash,
             }
             self.loger.debug("uploading archive")
-            response = requests.post(
+            response = self.session.post(
                 f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/labels/{label}",
                 files=multipart_form_data,
                 timeout=timeout,
@@ -642,28 +1738,52 @@ class TFD:
                 return f"Upload failed!\nServer response: {response.text}"
             return "Upload success!"
 
-    def upload_module(self, src_path: str, timeout: int = 600):
+    @operation
+    def upload_module(
+        self,
+        src_path: str,
+        timeout: int = 600,
+        stream: bool = False,
+        hash_pre_pass: bool = False,
+        compression: str = "",
+    ):
         """
         Method upload directory/archive containing TF module to TensorFlow Deploy.
         :param src_path: Full path to module. It can also be already archived module
         :param timeout: Upload timeout in seconds
+        :param stream: (Optional) Generate archive on the fly and stream it in chunked request body, see: upload_model
+        (default: False)
+        :param hash_pre_pass: (Optional) In stream mode, calculate archive hash before upload (default: False)
+        :param compression: (Optional) Compression of archive created from directory, see: upload_model (default: no
+        compression)
         :return: Action result
         """
 
         path = Path(src_path)
         self.loger.debug(f"src_path: {src_path}")
+        compression = self._negotiate_compression(compression)
+        if stream:
+            return self._upload_stream(
+                f"http://{self.host}:{self.port}/v1/modules/{self.team}/{self.project}/names/{self.name}",
+                src_path,
+                timeout,
+                hash_pre_pass,
+                compression=compression,
+            )
         if path.is_dir():
             self.loger.debug("src_path is a directory")
             self._validate_model_or_module(src_path)
-            dst_path = Path(f"tmp_upload_{int(time())}.tar")
-            archive_hash = self.create_archive(src_path=src_path, dst_path=dst_path)
+            dst_path = Path(f"tmp_upload_{int(time())}{ARCHIVE_SUFFIXES[compression]}")
+            archive_hash = self.create_archive(
+                src_path=src_path, dst_path=dst_path, hash_on_write=True, compression=compression
+            )
             f = open(dst_path, "rb")
             multipart_form_data = {
                 "archive_data": (dst_path.name, f),
                 "archive_hash": archive_hash,
             }
             self.loger.debug("uploading archive")
-            response = requests.post(
+            response = self.session.post(
                 f"http://{self.host}:{self.port}/v1/modules/{self.team}/{self.project}/names/{self.name}",
                 files=multipart_form_data,
                 timeout=timeout,
@@ -674,22 +1794,25 @@ class TFD:
             if response.status_code != 200:
                 return f"Upload failed!\nServer response: {response.text}"
             return "Upload success!"
-        elif path.suffix != ".tar":
+        elif not is_archive_path(path):
             self.loger.debug("src_path in not a tar archive")
             return "Unexpected file extension. src_path must be a tar archive"
         else:
             self.loger.debug("src_path is tar archive")
-            self._validate_archived_model_or_module(str(path))
             path.open()
             self.loger.debug("calculating hash")
             archive_hash = self._calculate_hash(str(path))
+            self._validate_archived_model_or_module(str(path), archive_hash=archive_hash)
+            error = self._check_archive_compression(str(path))
+            if error:
+                return error
             f = open(str(path), "rb")
             multipart_form_data = {
                 "archive_data": (path.name, f),
                 "archive_hash": archive_hash,
             }
             self.loger.debug("uploading archive")
-            response = requests.post(
+            response = self.session.post(
                 f"http://{self.host}:{self.port}/v1/modules/{self.team}/{self.project}/names/{self.name}",
                 files=multipart_form_data,
                 timeout=timeout,
@@ -701,5 +1824,208 @@ class TFD:
                 return f"Upload failed!\nServer response: {response.text}"
             return "Upload success!"
 
+    def _upload_stream(
+        self,
+        request_url: str,
+        src_path: str,
+        timeout: int,
+        hash_pre_pass: bool,
+        deduplicate=None,
+        compression: str = "",
+    ) -> str:
+        """
+        Internal method. Upload model/module directory or archive in chunked multipart request. Directory is archived
+        on the fly, so no temporary archive is written on disk. Given tar archive is read in chunks and is not removed.
+        :param request_url: TensorFlow Deploy upload endpoint
+        :param src_path: Full path to model/module directory or tar archive
+        :param timeout: Upload timeout in seconds
+        :param hash_pre_pass: Calculate hash before upload instead of sending it after archive
+        :param deduplicate: (optional) Function called with archive hash before upload, returning action result if
+        upload isn't needed or empty string, see: _deduplicate_upload (default: None)
+        :param compression: (optional) Compression of archive generated from directory (default: no compression)
+        :return: Action result
+        """
+        prepared = self._prepare_upload_stream(src_path, hash_pre_pass, compression)
+        if isinstance(prepared, str):
+            return prepared
+        filename, get_chunks, archive_hash = prepared
+        if deduplicate is not None:
+            result = deduplicate(archive_hash)
+            if result:
+                return result
+
+        boundary = new_boundary()
+        self.loger.debug("uploading archive")
+        response = self.session.post(
+            request_url,
+            data=iter_multipart_archive(boundary, filename, get_chunks(), archive_hash),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+            timeout=timeout,
+        )
+        self.loger.debug(f"upload result: {response.text}")
+        if response.status_code != 200:
+            return f"Upload failed!\nServer response: {response.text}"
+        return "Upload success!"
+
+    def _upload_delta(self, src_path: str, label: str, timeout: int) -> str:
+        """
+        Internal method. Upload model directory as manifest and blobs missing in TensorFlow Deploy, see: delta module.
+        Directory is validated only if TensorFlow Deploy supports delta uploads.
+        :param src_path: Full path to model directory
+        :param label: Label of uploaded model
+        :param timeout: Timeout of every request in seconds
+        :return: Action result, or empty string if model should be uploaded as archive
+        """
+        base_url = f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}"
+        try:
+            digests = file_digests(
+                src_path, cache=self.digest_cache, block_size=self.hash_block_size, mode=self.hash_mode
+            )
+            manifest = build_manifest(src_path, digests)
+            blobs = manifest_blobs(manifest)
+            # query has no side effects, so it can be retried like GET
+            with retry_safe():
+                response = self.session.post(
+                    f"{base_url}/blobs/missing", json={"blobs": sorted(blobs)}, timeout=timeout
+                )
+            if response.status_code != 200:
+                self.loger.warning("TensorFlow Deploy doesn't support delta uploads, uploading archive")
+                self.loger.debug(f"delta negotiation response: {response.text}")
+                return ""
+            missing = json.loads(response.text)["missing"]
+        except DeadlineExceeded:
+            # archive upload would exceed deadline as well
+            raise
+        except (requests.exceptions.RequestException, OSError, ValueError, KeyError, TypeError) as error:
+            self.loger.warning(f"delta upload failed, uploading archive. Error: {error}")
+            return ""
+
+        self._validate_model_or_module(src_path)
+        paths = {digest: os.path.join(src_path, relative_path) for relative_path, digest in digests.items()}
+        sent = 0
+        try:
+            for attempt in range(2):
+                for digest in missing:
+                    self.loger.debug(f"uploading blob {digest} ({paths[digest]})")
+                    with open(paths[digest], "rb") as fh:
+                        response = self.session.put(f"{base_url}/blobs/{digest}", data=fh, timeout=timeout)
+                    if response.status_code != 200:
+                        raise ValueError(f"blob upload failed: {response.text}")
+                    sent += blobs[digest]
+                response = self.session.post(f"{base_url}/labels/{label}/manifest", json=manifest, timeout=timeout)
+                if response.status_code != 409 or attempt:
+                    break
+                # blobs removed from TensorFlow Deploy meanwhile, e.g. by garbage collection
+                missing = json.loads(response.text)["missing"]
+            if response.status_code != 200:
+                raise ValueError(f"manifest upload failed: {response.text}")
+        except DeadlineExceeded:
+            raise
+        except (requests.exceptions.RequestException, OSError, ValueError, KeyError, TypeError) as error:
+            self.loger.warning(f"delta upload failed, uploading archive. Error: {error}")
+            return ""
+        self.loger.debug(f"upload result: {response.text}")
+        return f"Upload success! (delta: {sent} of {sum(blobs.values())} bytes sent)"
+
+    def _negotiate_compression(self, compression: str) -> str:
+        """
+        Internal method. Check if TensorFlow Deploy accepts archives with given compression. Accepted compressions are
+        read once per cursor from /v1/archives/compressions endpoint (JSON list, e.g. ["gzip", "zstd"]); servers
+        without this endpoint accept only plain tar archives.
+        :param compression: Requested compression
+        :return: Requested compression if it is accepted, otherwise empty string (plain tar)
+        """
+        compression = check_compression(compression)
+        if not compression:
+            return ""
+        if self.server_compressions is None:
+            accepted = []
+            try:
+                response = self.session.get(f"http://{self.host}:{self.port}/v1/archives/compressions")
+                if response.status_code == 200:
+                    accepted = json.loads(response.text)
+            except (requests.exceptions.RequestException, ValueError) as error:
+                self.loger.debug(f"compressions negotiation failed: {error}")
+            self.server_compressions = [name for name in accepted if isinstance(name, str)]
+        if compression in self.server_compressions:
+            return compression
+        self.loger.warning(f"TensorFlow Deploy doesn't accept {compression} archives, uploading plain tar archive")
+        return ""
+
+    def _check_archive_compression(self, path: str) -> str:
+        """
+        Internal method. Check if TensorFlow Deploy accepts compression of given archive.
+        :param path: Full path to archive
+        :return: Error message, empty if archive can be uploaded
+        """
+        with open(path, "rb") as fh:
+            compression = detect_compression(fh.read(4))
+        if compression and self._negotiate_compression(compression) != compression:
+            return f"Upload failed! TensorFlow Deploy doesn't accept {compression} archives"
+        return ""
+
+    def _deduplicate_upload(self, archive_hash: str, label: str) -> str:
+        """
+        Internal method. Find version of cursor model with given archive hash and set label to it, instead of uploading
+        the same archive again.
+        :param archive_hash: SHA256 hash of archive
+        :param label: Label for model
+        :return: Action result, or empty string if there is no such version and archive has to be uploaded
+        """
+        version = self._hash_version(archive_hash)
+        if not version:
+            return ""
+        self.loger.info(f"archive already uploaded as version {version}, skipping upload")
+        response = self._put_label(
+            f"http://{self.host}:{self.port}/v1/models/{self.team}/{self.project}/names/{self.name}/versions/{version}/labels/{label}",
+            label,
+        )
+        if response.status_code != 200:
+            return f"Upload deduplicated, but label not set!\nServer response: {response.text}"
+        return f"Upload deduplicated! Identical archive already stored as version {version}, label {label} set"
+
+    def _prepare_upload_stream(self, src_path: str, hash_pre_pass: bool, compression: str = ""):
+        """
+        Internal method. Validate model/module directory or archive before streamed upload.
+        :param src_path: Full path to model/module directory or tar archive
+        :param hash_pre_pass: Calculate hash of archive in additional pass
+        :param compression: (optional) Compression of archive generated from directory (default: no compression)
+        :return: Tuple with archive filename, function returning generator of archive chunks and archive hash (empty
+        without hash_pre_pass), or error message
+        """
+        path = Path(src_path)
+        if path.is_dir():
+            self.loger.debug("src_path is a directory, streaming archive")
+            self._validate_model_or_module(src_path)
+            filename = f"{path.name or 'upload'}{ARCHIVE_SUFFIXES[compression]}"
+
+            def get_chunks():
+                return compress_chunks(
+                    iter_tar_stream(src_path, reproducible=self.reproducible_archives), compression
+                )
+
+        elif not is_archive_path(path):
+            self.loger.debug("src_path in not a tar archive")
+            return "Unexpected file extension. src_path must be a tar archive"
+        else:
+            self.loger.debug("src_path is tar archive, streaming file")
+            self._validate_archived_model_or_module(src_path)
+            error = self._check_archive_compression(src_path)
+            if error:
+                return error
+            filename = path.name
+            get_chunks = partial(iter_file, src_path)
+
+        archive_hash = ""
+        if hash_pre_pass:
+            self.loger.debug("calculating hash")
+            sha256_hash = hashlib.sha256()
+            for chunk in get_chunks():
+                sha256_hash.update(chunk)
+            archive_hash = sha256_hash.hexdigest()
+            self.loger.debug(f"archive hash: {archive_hash}")
+
+        return filename, get_chunks, archive_hash
+
     def __str__(self):
         return f"TensorFlow Deploy cursor\nTEAM: {self.team}\nPROJECT: {self.project}\nNAME: {self.name}\nLABEL: {self.label}\nHost: {self.host}\nPort: {self.port}\nVerbose: {self.verbose}\nCheck connection: {self.check_connection}"
@@ -1,5 +1,7 @@
 from .version import VERSION
 from .TFD import TFD
+from .AsyncTFD import AsyncTFD
+from .transport import CircuitOpenError, RetryPolicy
 from .scripts import *
 
 
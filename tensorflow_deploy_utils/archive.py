@@ -0,0 +1,451 @@
+from contextlib import contextmanager
+import hashlib
+import os
+import posixpath
+import queue
+import tarfile
+import tempfile
+import threading
+import uuid
+
+from .compression import decompressing_reader, detect_compression
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# archives with more data are exposed to TensorFlow from temporary directory instead of memory
+DEFAULT_VIEW_MEMORY = 1024 * 1024 * 1024
+# every archive member of reproducible archive has the same modification time
+REPRODUCIBLE_MTIME = 0
+
+
+def relative_tar_filter(src_path: str):
+    """
+    Function return tarfile filter, which makes names of archive members relative to given source path,
+    i.e. `/path/to/model/saved_model.pb` is stored as `./saved_model.pb`.
+    :param src_path: Full path to your TF model or module
+    :return: Filter function accepted by TarFile.add
+    """
+
+    def tar_filter(tarinfo):
+        """
+        Filter takes least nested direction.
+        """
+        tarinfo.name = (
+            "."
+            + tarinfo.name[
+                len(os.path.splitdrive(str(src_path))[1].lstrip(os.path.sep)) :
+            ]
+        )
+        return tarinfo
+
+    return tar_filter
+
+
+def iter_tree(src_path: str):
+    """
+    Generator yields paths of directory and its contents with archive member names (`.`, `./saved_model.pb`, ...) in
+    order of reproducible archive: entries of every directory sorted by name, directories visited top-down.
+    :param src_path: Full path to your TF model or module, without trailing separator
+    :return: Generator of tuples with path and archive member name
+    """
+    yield src_path, "."
+    for root, dirs, files in os.walk(src_path):
+        dirs.sort()
+        relative_root = os.path.relpath(root, src_path)
+        for name in sorted(dirs + files):
+            relative_path = name if relative_root == "." else os.path.join(relative_root, name)
+            yield os.path.join(root, name), "./" + relative_path.replace(os.path.sep, "/")
+
+
+def normalized_mode(mode: int, is_dir: bool = False, is_symlink: bool = False) -> int:
+    """
+    Function return permissions of member of reproducible archive: 0755 for directories and executable files, 0777
+    for symbolic links and 0644 for other files.
+    :param mode: File mode (e.g. st_mode)
+    :param is_dir: (optional) Is it directory? (default: False)
+    :param is_symlink: (optional) Is it symbolic link? (default: False)
+    :return: Normalized permissions
+    """
+    if is_dir:
+        return 0o755
+    if is_symlink:
+        return 0o777
+    return 0o755 if mode & 0o111 else 0o644
+
+
+def normalize_tarinfo(tarinfo: tarfile.TarInfo) -> tarfile.TarInfo:
+    """
+    Function clear metadata of archive member which depends on machine or time of build.
+    :param tarinfo: Archive member
+    :return: The same, modified archive member
+    """
+    tarinfo.mtime = REPRODUCIBLE_MTIME
+    tarinfo.uid = tarinfo.gid = 0
+    tarinfo.uname = tarinfo.gname = ""
+    tarinfo.devmajor = tarinfo.devminor = 0
+    # no atime, ctime or other extended headers, PAX headers are written only for long or non-ASCII names
+    tarinfo.pax_headers = {}
+    tarinfo.mode = normalized_mode(tarinfo.mode, tarinfo.isdir(), tarinfo.issym())
+    return tarinfo
+
+
+def add_directory(archive: tarfile.TarFile, src_path: str, reproducible: bool = False) -> None:
+    """
+    Function add directory to tar archive with names relative to it (see: relative_tar_filter). In reproducible mode
+    members are added in sorted order with normalized metadata (modification time, owner and permissions) and hard
+    links are stored as regular files, so the same files give byte-identical archive on every machine.
+    :param archive: Tar archive opened for writing, it should use PAX format and UTF-8 encoding
+    :param src_path: Full path to your TF model or module, without trailing separator
+    :param reproducible: (optional) Create reproducible archive (default: False)
+    :return: None
+    """
+    if not reproducible:
+        archive.add(src_path, filter=relative_tar_filter(src_path))
+        return
+
+    for path, arcname in iter_tree(src_path):
+        tarinfo = archive.gettarinfo(path, arcname)
+        if tarinfo is None:
+            # sockets, devices etc. are skipped like by TarFile.add
+            continue
+        if tarinfo.islnk():
+            # hard links depend on file system, not on content
+            tarinfo.type = tarfile.REGTYPE
+            tarinfo.linkname = ""
+            tarinfo.size = os.stat(path).st_size
+        normalize_tarinfo(tarinfo)
+        if tarinfo.isreg():
+            with open(path, "rb") as fh:
+                archive.addfile(tarinfo, fh)
+        else:
+            archive.addfile(tarinfo)
+
+
+class _QueueWriter:
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event) -> None:
+        """
+        Internal file-like object which passes written data to bounded queue consumed by other thread.
+        :param chunks: Queue for written chunks
+        :param cancelled: Event set by consumer when it stops reading
+        """
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.position = 0
+
+    def write(self, data: bytes) -> int:
+        while True:
+            if self.cancelled.is_set():
+                raise InterruptedError("tar stream consumer stopped")
+            try:
+                self.chunks.put(bytes(data), timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+
+def iter_tar_stream(
+    src_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    queue_size: int = 8,
+    reproducible: bool = False,
+):
+    """
+    Generator yields tar archive of given directory chunk by chunk, without writing anything on disk. Archive is the
+    same as created by TFD.create_archive. Memory use is bounded by about queue_size * chunk_size bytes.
+    :param src_path: Full path to your TF model or module
+    :param chunk_size: (optional) Size of chunks read from files (default: 1 MiB)
+    :param queue_size: (optional) Maximum number of chunks buffered between tar writer and consumer (default: 8)
+    :param reproducible: (optional) Generate reproducible archive, see: add_directory (default: False)
+    :return: Generator of bytes
+    """
+    src_path = src_path.rstrip(str(os.path.sep))
+    chunks = queue.Queue(maxsize=queue_size)
+    cancelled = threading.Event()
+    done = object()
+    errors = []
+
+    def produce():
+        try:
+            archive = tarfile.open(
+                fileobj=_QueueWriter(chunks, cancelled),
+                mode="w",
+                copybufsize=chunk_size,
+                format=tarfile.PAX_FORMAT,
+                encoding="utf-8",
+            )
+            add_directory(archive, src_path, reproducible)
+            archive.close()
+        except Exception as error:
+            errors.append(error)
+        finally:
+            while not cancelled.is_set():
+                try:
+                    chunks.put(done, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    producer = threading.Thread(target=produce, name="tar-stream", daemon=True)
+    producer.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is done:
+                break
+            yield chunk
+    finally:
+        cancelled.set()
+        producer.join()
+    if errors:
+        raise errors[0]
+
+
+def iter_file(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Generator yields content of given file chunk by chunk.
+    :param path: Path to file
+    :param chunk_size: (optional) Size of chunks (default: 1 MiB)
+    :return: Generator of bytes
+    """
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            yield chunk
+
+
+def iter_multipart_archive(
+    boundary: str, filename: str, chunks, archive_hash: str = ""
+):
+    """
+    Generator yields multipart/form-data body with `archive_data` and `archive_hash` fields expected by TensorFlow
+    Deploy upload endpoints. If hash is not given, it is calculated from archive chunks on the fly and sent as the
+    last form field, so archive is read only once.
+    :param boundary: Multipart boundary
+    :param filename: Archive filename sent in `archive_data` field
+    :param chunks: Iterable of archive chunks
+    :param archive_hash: (optional) Precalculated SHA256 hash of archive
+    :return: Generator of bytes
+    """
+
+    def hash_field(value: str) -> bytes:
+        return (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="archive_hash"\r\n\r\n'
+            f"{value}\r\n"
+        ).encode()
+
+    if archive_hash:
+        yield hash_field(archive_hash)
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="archive_data"; filename="{filename}"\r\n'
+        f"Content-Type: application/x-tar\r\n\r\n"
+    ).encode()
+    sha256_hash = hashlib.sha256()
+    for chunk in chunks:
+        if not archive_hash:
+            sha256_hash.update(chunk)
+        yield chunk
+    yield b"\r\n"
+    if not archive_hash:
+        yield hash_field(sha256_hash.hexdigest())
+    yield f"--{boundary}--\r\n".encode()
+
+
+def new_boundary() -> str:
+    return uuid.uuid4().hex
+
+
+def member_name(member: tarfile.TarInfo) -> str:
+    """
+    Function return normalized name of archive member relative to archive root, e.g. `./variables/` gives
+    `variables`. Empty string is returned for the root itself and for members pointing outside of archive root.
+    :param member: Archive member
+    :return: Normalized member name
+    """
+    name = posixpath.normpath(member.name.lstrip("/"))
+    if name == "." or name == ".." or name.startswith("../"):
+        return ""
+    return name
+
+
+class _ChunksReader:
+    def __init__(self, chunks) -> None:
+        """
+        Internal file-like object which allows to read iterable of chunks (e.g. HTTP response body) as stream.
+        :param chunks: Iterable of bytes
+        """
+        self.chunks = iter(chunks)
+        self.chunk = b""
+        self.offset = 0
+
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        while size != 0:
+            if self.offset >= len(self.chunk):
+                self.chunk = next(self.chunks, None)
+                self.offset = 0
+                if self.chunk is None:
+                    self.chunk = b""
+                    break
+                continue
+            end = len(self.chunk) if size < 0 else min(len(self.chunk), self.offset + size)
+            parts.append(self.chunk[self.offset : end])
+            if size > 0:
+                size -= end - self.offset
+            self.offset = end
+        return b"".join(parts)
+
+
+def extract_tar_stream(chunks, dst_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """
+    Function extract tar archive given as iterable of chunks to destination directory in one pass, without writing
+    archive on disk. Only directories and regular files are extracted. Members with absolute paths are extracted
+    relative to destination directory, members pointing outside of it (`..`) and other member types (links, devices)
+    are rejected with ValueError.
+    :param chunks: Iterable of archive chunks
+    :param dst_path: Existing destination directory
+    :param chunk_size: (optional) Size of chunks written to files (default: 1 MiB)
+    :return: None
+    """
+    dst_root = os.path.realpath(dst_path)
+    reader = _ChunksReader(chunks)
+    with tarfile.open(fileobj=decompressing_reader(reader), mode="r|") as archive:
+        for member in archive:
+            name = member_name(member)
+            if not name:
+                if posixpath.normpath(member.name.lstrip("/")) != ".":
+                    raise ValueError(f"archive member outside of destination: {member.name}")
+                continue
+            target = os.path.realpath(os.path.join(dst_root, *name.split("/")))
+            if os.path.commonpath([dst_root, target]) != dst_root:
+                raise ValueError(f"archive member outside of destination: {member.name}")
+            if member.isdir():
+                os.makedirs(target, exist_ok=True)
+            elif member.isfile():
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                src = archive.extractfile(member)
+                with open(target, "wb") as dst:
+                    for chunk in iter(lambda: src.read(chunk_size), b""):
+                        dst.write(chunk)
+            else:
+                raise ValueError(f"unsupported archive member type: {member.name}")
+    # Read end of archive (zero blocks and padding), so the whole body is consumed
+    while reader.read(chunk_size):
+        pass
+
+
+def safe_members(archive: tarfile.TarFile):
+    """
+    Function iterate members of tar archive, which can be safely extracted with TarFile.extractall: directories,
+    regular files and links pointing inside of archive. Names of members are normalized (absolute paths are made
+    relative), members pointing outside of archive root (`..`) and other member types (devices, fifos) are rejected
+    with ValueError, like in extract_tar_stream.
+    Example: archive.extractall(dst_path, members=safe_members(archive))
+    :param archive: Opened tar archive
+    :return: Iterator of archive members
+    """
+    for member in archive:
+        name = member_name(member)
+        if not name:
+            if posixpath.normpath(member.name.lstrip("/")) != ".":
+                raise ValueError(f"archive member outside of destination: {member.name}")
+            continue
+        if member.issym():
+            target = member.linkname
+            if not posixpath.isabs(target):
+                target = posixpath.normpath(posixpath.join(posixpath.dirname(name), target))
+            if posixpath.isabs(target) or target == ".." or target.startswith("../"):
+                raise ValueError(f"archive link outside of destination: {member.name} -> {member.linkname}")
+        elif member.islnk():
+            target = posixpath.normpath(member.linkname.lstrip("/"))
+            if target == ".." or target.startswith("../"):
+                raise ValueError(f"archive link outside of destination: {member.name} -> {member.linkname}")
+            member.linkname = target
+        elif not (member.isdir() or member.isfile()):
+            raise ValueError(f"unsupported archive member type: {member.name}")
+        member.name = name
+        yield member
+
+
+@contextmanager
+def open_tar_stream(path: str):
+    """
+    Context manager which opens tar archive for reading in stream mode (members in order, one pass), detecting its
+    compression (gzip, zstd) by content.
+    :param path: Full path to archive
+    :return: tarfile.TarFile object
+    """
+    with open(path, "rb") as fh, tarfile.open(fileobj=decompressing_reader(fh), mode="r|") as archive:
+        yield archive
+
+
+def _plain_tar_size(path: str) -> int:
+    """
+    Internal function. Return total size of files in uncompressed tar archive, read from member headers only. For
+    compressed archives 0 is returned, as their size is known only after decompressing them.
+    """
+    with open(path, "rb") as fh:
+        if detect_compression(fh.read(4)):
+            return 0
+    with tarfile.open(path, "r") as archive:
+        return sum(member.size for member in archive.getmembers() if member.isfile())
+
+
+def _copy_to_ram(tf, path: str, root: str, chunk_size: int, max_memory: int) -> bool:
+    """
+    Internal function. Copy files of archive to TensorFlow in-memory file system, unless they take more than
+    max_memory bytes.
+    :return: False if archive is too big
+    """
+    total = 0
+    with open_tar_stream(path) as archive:
+        for member in archive:
+            name = member_name(member)
+            if not name:
+                continue
+            target = f"{root}/{name}"
+            if member.isdir():
+                tf.io.gfile.makedirs(target)
+            elif member.isfile():
+                total += member.size
+                if total > max_memory:
+                    return False
+                tf.io.gfile.makedirs(posixpath.dirname(target))
+                src = archive.extractfile(member)
+                with tf.io.gfile.GFile(target, "wb") as dst:
+                    for chunk in iter(lambda: src.read(chunk_size), b""):
+                        dst.write(chunk)
+    return True
+
+
+@contextmanager
+def tf_archive_view(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, max_memory: int = DEFAULT_VIEW_MEMORY):
+    """
+    Context manager which exposes files of tar archive to TensorFlow, so model can be loaded with
+    tf.saved_model.load. Files are copied to TensorFlow `ram://` file system, which takes as much memory as all files
+    of archive, so archives with more than max_memory bytes of files are extracted to temporary directory instead
+    (compressed archives can be read twice, as their size is known only after reading them). Archive is only read
+    and view is removed on exit.
+    :param path: Full path to your TF model or module archive
+    :param chunk_size: (optional) Size of chunks copied from archive (default: 1 MiB)
+    :param max_memory: (optional) Maximum size of files kept in memory in bytes (default: 1 GiB)
+    :return: Path to archive view readable by TensorFlow
+    """
+    import tensorflow as tf
+
+    if _plain_tar_size(path) <= max_memory:
+        root = f"ram://tfd_{uuid.uuid4().hex}"
+        tf.io.gfile.makedirs(root)
+        try:
+            if _copy_to_ram(tf, path, root, chunk_size, max_memory):
+                yield root
+                return
+        finally:
+            tf.io.gfile.rmtree(root)
+    with tempfile.TemporaryDirectory(prefix="tfd_view_") as tmp_dir:
+        extract_tar_stream(iter_file(path, chunk_size), tmp_dir, chunk_size)
+        yield tmp_dir
@@ -0,0 +1,42 @@
+import argparse
+import os
+from statistics import median
+import tempfile
+
+from tensorflow_deploy_utils.TFD import TFD
+from tensorflow_deploy_utils.benchmarks.common import create_synthetic_model, timeit
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Benchmark compare create_archive with hash calculated by reading "
+                                                 "archive back from disk and with hash calculated while writing")
+    parser.add_argument("--size_mb", type=int, default=2048, help="Size of synthetic model in MiB")
+    parser.add_argument("--tmp_dir", type=str, default=None, help="Directory for synthetic model and archives")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs of every variant, median is shown")
+    args = parser.parse_args()
+
+    tfd_cursor = TFD(team="benchmark", project="benchmark", host="localhost", check_connection=False)
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir) as tmp_dir:
+        src_path = create_synthetic_model(os.path.join(tmp_dir, "model"), args.size_mb)
+        timings = {False: [], True: []}
+        hashes = set()
+        for i in range(args.repeat):
+            # order of variants alternates, so none of them always runs with page cache warmed by the other one
+            for hash_on_write in (False, True) if i % 2 == 0 else (True, False):
+                dst_path = os.path.join(tmp_dir, f"model_{hash_on_write}.tar")
+                elapsed, archive_hash = timeit(tfd_cursor.create_archive, src_path, dst_path, hash_on_write)
+                timings[hash_on_write].append(elapsed)
+                hashes.add(archive_hash)
+                os.remove(dst_path)
+
+    assert len(hashes) == 1, "Hashes differ!"
+    for hash_on_write, elapsed in timings.items():
+        mode = "hash while writing" if hash_on_write else "hash after writing"
+        elapsed = median(elapsed)
+        print(f"{mode}: {elapsed:.2f}s ({args.size_mb / elapsed:.1f} MiB/s, median of {args.repeat} runs)")
+
+
+if __name__ == "__main__":
+
+    main()
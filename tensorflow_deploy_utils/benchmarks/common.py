@@ -0,0 +1,102 @@
+import http.server
+import os
+from pathlib import Path
+import threading
+from time import perf_counter, sleep
+
+
+def create_synthetic_model(dst_path: str, size_mb: int, shards: int = 4, redundancy: float = 0.0) -> str:
+    """
+    Function create directory which looks like TF SavedModel (saved_model.pb, variables shards, assets and README.md)
+    filled with random data of given total size. It's used only for benchmarks, the model can't be loaded by TF.
+    :param dst_path: Directory where model is created
+    :param size_mb: Total size of variables shards in MiB
+    :param shards: (optional) Number of variables shards (default: 4)
+    :param redundancy: (optional) Fraction of zero bytes in variables shards, which makes them compressible like
+    sparse or quantized weights (default: 0 - incompressible)
+    :return: Path to created model directory
+    """
+    path = Path(dst_path)
+    path.joinpath("variables").mkdir(parents=True, exist_ok=True)
+    path.joinpath("assets").mkdir(exist_ok=True)
+    path.joinpath("saved_model.pb").write_bytes(os.urandom(64 * 1024))
+    path.joinpath("variables", "variables.index").write_bytes(os.urandom(4 * 1024))
+    path.joinpath("assets", "vocab.txt").write_bytes(os.urandom(256 * 1024))
+    path.joinpath("README.md").write_text("# Synthetic model for benchmarks\n")
+
+    random_size = int(1024 * 1024 * (1 - redundancy))
+    zeros = bytes(1024 * 1024 - random_size)
+    shard_mb = max(size_mb // shards, 1)
+    for i in range(shards):
+        with open(path.joinpath("variables", f"variables.data-{i:05d}-of-{shards:05d}"), "wb") as fh:
+            for _ in range(shard_mb):
+                # every block is different, so compression can't reuse earlier blocks
+                fh.write(os.urandom(random_size) + zeros)
+
+    return str(path)
+
+
+def timeit(function, *args, **kwargs) -> tuple:
+    """
+    Function call given function and measure its wall time.
+    :return: Tuple with elapsed time in seconds and function result
+    """
+    start = perf_counter()
+    result = function(*args, **kwargs)
+    return perf_counter() - start, result
+
+
+class _RangeHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        size = os.path.getsize(self.server.path)
+        start, end = 0, size - 1
+        range_header = self.headers.get("Range")
+        if range_header:
+            start, end = range_header[len("bytes="):].split("-")
+            start, end = int(start), min(int(end or size - 1), size - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        block = 256 * 1024
+        delay = block / self.server.rate_limit if self.server.rate_limit else 0
+        with open(self.server.path, "rb") as fh:
+            fh.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = fh.read(min(block, remaining))
+                self.wfile.write(data)
+                remaining -= len(data)
+                if delay:
+                    sleep(delay)
+
+
+class RangeServer(http.server.ThreadingHTTPServer):
+    def __init__(self, path: str, rate_limit: int = 0) -> None:
+        """
+        Local HTTP server serving given file for every GET request, with support for Range requests. It's used as
+        range-capable stand-in for TensorFlow Deploy in benchmarks.
+        :param path: Path to served file
+        :param rate_limit: (optional) Limit of bytes per second for one connection, 0 means no limit (default: 0)
+        """
+        super().__init__(("127.0.0.1", 0), _RangeHandler)
+        self.daemon_threads = True
+        self.path = path
+        self.rate_limit = rate_limit
+        self.port = self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,49 @@
+import argparse
+import os
+import tempfile
+
+from tensorflow_deploy_utils.TFD import TFD
+from tensorflow_deploy_utils.benchmarks.common import create_synthetic_model, timeit
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Benchmark compare compression ratio and throughput of create_archive "
+                                                 "with gzip and zstd compression on many threads")
+    parser.add_argument("--size_mb", type=int, default=1024, help="Size of synthetic model in MiB")
+    parser.add_argument("--redundancy", type=float, default=0.5, help="Fraction of zero bytes in synthetic model")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 0], help="Numbers of compressing threads "
+                                                                              "(0 - all cores)")
+    parser.add_argument("--gzip_levels", type=int, nargs="+", default=[1, 6], help="Compared gzip levels")
+    parser.add_argument("--zstd_levels", type=int, nargs="+", default=[1, 3, 9], help="Compared zstd levels (skipped "
+                                                                                     "without zstandard package)")
+    parser.add_argument("--tmp_dir", type=str, default=None, help="Directory for synthetic model and archives")
+    args = parser.parse_args()
+
+    variants = [("", None)] + [("gzip", level) for level in args.gzip_levels]
+    try:
+        import zstandard  # noqa: F401
+
+        variants += [("zstd", level) for level in args.zstd_levels]
+    except ImportError:
+        print("zstandard package not installed, skipping zstd")
+
+    tfd_cursor = TFD(team="benchmark", project="benchmark", host="localhost", check_connection=False)
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir) as tmp_dir:
+        src_path = create_synthetic_model(os.path.join(tmp_dir, "model"), args.size_mb, redundancy=args.redundancy)
+        plain_size = None
+        for compression, level in variants:
+            for threads in args.threads if compression else [1]:
+                dst_path = os.path.join(tmp_dir, f"model.tar.{compression or 'plain'}")
+                elapsed, _ = timeit(tfd_cursor.create_archive, src_path, dst_path, True, compression=compression,
+                                    level=level, threads=threads)
+                size = os.path.getsize(dst_path)
+                plain_size = plain_size or size
+                os.remove(dst_path)
+                print(f"{compression or 'none'} level: {level}, threads: {threads or os.cpu_count()}, "
+                      f"time: {elapsed:.2f}s ({args.size_mb / elapsed:.1f} MiB/s), ratio: {plain_size / size:.2f}")
+
+
+if __name__ == "__main__":
+
+    main()
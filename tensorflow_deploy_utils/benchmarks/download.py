@@ -0,0 +1,46 @@
+import argparse
+import os
+import tempfile
+
+from tensorflow_deploy_utils.TFD import TFD
+from tensorflow_deploy_utils.benchmarks.common import RangeServer, timeit
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Benchmark compare throughput of single stream and parallel ranged "
+                                                 "get_model downloads from local range-capable server")
+    parser.add_argument("--size_mb", type=int, default=512, help="Size of downloaded archive in MiB")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8], help="Numbers of parallel workers")
+    parser.add_argument("--chunk_mb", type=int, default=16, help="Size of one range in MiB")
+    parser.add_argument("--rate_limit_mb", type=int, default=100, help="Limit of MiB/s for one connection, which "
+                                                                       "simulates per-stream cap of real network "
+                                                                       "(0 - no limit)")
+    parser.add_argument("--tmp_dir", type=str, default=None, help="Directory for served and downloaded archives")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir) as tmp_dir:
+        archive_path = os.path.join(tmp_dir, "model.tar")
+        block = os.urandom(1024 * 1024)
+        with open(archive_path, "wb") as fh:
+            for _ in range(args.size_mb):
+                fh.write(block)
+        dst_path = os.path.join(tmp_dir, "downloads")
+        os.mkdir(dst_path)
+
+        with RangeServer(archive_path, rate_limit=args.rate_limit_mb * 1024 * 1024) as server:
+            for workers in [1] + args.workers:
+                tfd_cursor = TFD(team="benchmark", project="benchmark", name="benchmark", host="127.0.0.1",
+                                 port=server.port, check_connection=False, pool_maxsize=max(workers, 10))
+                elapsed, result = timeit(tfd_cursor.get_model, dst_path, version=1, workers=workers,
+                                         chunk_size=args.chunk_mb * 1024 * 1024)
+                tfd_cursor.close()
+                for name in os.listdir(dst_path):
+                    os.remove(os.path.join(dst_path, name))
+                print(f"workers: {workers}, time: {elapsed:.2f}s, throughput: {args.size_mb / elapsed:.1f} MiB/s "
+                      f"({result.split(' to ')[0]})")
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import os
+from pathlib import Path
+import tempfile
+from time import time_ns
+
+from tensorflow_deploy_utils.TFD import TFD
+from tensorflow_deploy_utils.benchmarks.common import create_synthetic_model, timeit
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Benchmark compare hash of model archive with directory fingerprint "
+                                                 "calculated on one and many threads, and with warm digest cache")
+    parser.add_argument("--size_mb", type=int, default=2048, help="Size of synthetic model in MiB")
+    parser.add_argument("--shards", type=int, default=8, help="Number of variables shards")
+    parser.add_argument("--tmp_dir", type=str, default=None, help="Directory for synthetic model, archive and cache")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir) as tmp_dir:
+        tfd_cursor = TFD(team="benchmark", project="benchmark", host="localhost", check_connection=False,
+                         digest_cache=True, cache_dir=os.path.join(tmp_dir, "cache"))
+        src_path = create_synthetic_model(os.path.join(tmp_dir, "model"), args.size_mb, args.shards)
+        # digests of just modified files are not cached, pretend the model was written a minute ago
+        mtime = time_ns() - 60 * 10**9
+        for file_path in Path(src_path).rglob("*"):
+            os.utime(file_path, ns=(mtime, mtime))
+        dst_path = os.path.join(tmp_dir, "model.tar")
+        tfd_cursor.create_archive(src_path, dst_path)
+
+        results = {"archive hash": timeit(tfd_cursor._calculate_hash, dst_path)[0]}
+        digest_cache, tfd_cursor.digest_cache = tfd_cursor.digest_cache, None
+        results["fingerprint, 1 thread"] = timeit(tfd_cursor.fingerprint, src_path, 1)[0]
+        results["fingerprint, all cores"] = timeit(tfd_cursor.fingerprint, src_path)[0]
+        tfd_cursor.digest_cache = digest_cache
+        results["fingerprint, cold cache"] = timeit(tfd_cursor.fingerprint, src_path)[0]
+        results["fingerprint, warm cache"] = timeit(tfd_cursor.fingerprint, src_path)[0]
+
+    for mode, elapsed in results.items():
+        print(f"{mode}: {elapsed * 1000:.1f}ms ({args.size_mb / elapsed:.1f} MiB/s)")
+
+
+if __name__ == "__main__":
+
+    main()
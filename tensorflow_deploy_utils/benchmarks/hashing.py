@@ -0,0 +1,70 @@
+import argparse
+import hashlib
+import os
+import tempfile
+
+from tensorflow_deploy_utils.hashing import file_digest
+from tensorflow_deploy_utils.benchmarks.common import timeit
+
+
+def _legacy_hash(path: str) -> str:
+    """
+    Hash calculated like _calculate_hash before hashing engine: 4 KiB reads in Python loop.
+    """
+    sha256_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for byte_block in iter(lambda: f.read(4096), b""):
+            sha256_hash.update(byte_block)
+    return sha256_hash.hexdigest()
+
+
+def _stdlib_digest(path: str) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.file_digest(fh, "sha256").hexdigest()
+
+
+def _engine(block_size: int, mode: str, prefetch: bool):
+    return lambda path: file_digest(path, "sha256", block_size, mode, prefetch)
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Benchmark compare hashing modes, block sizes and prefetch of "
+                                                 "file_digest (used by _calculate_hash) across file sizes")
+    parser.add_argument("--sizes_mb", type=int, nargs="+", default=[16, 256, 2048], help="Sizes of hashed files in "
+                                                                                         "MiB")
+    parser.add_argument("--block_sizes_kb", type=int, nargs="+", default=[64, 1024, 8192], help="Compared block "
+                                                                                               "sizes in KiB")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs of every variant, best one is shown")
+    parser.add_argument("--tmp_dir", type=str, default=None, help="Directory for hashed files")
+    args = parser.parse_args()
+
+    variants = [("legacy 4 KiB reads", _legacy_hash)]
+    if hasattr(hashlib, "file_digest"):  # Python 3.11+
+        variants.append(("hashlib.file_digest", _stdlib_digest))
+    for block_kb in args.block_sizes_kb:
+        for mode in ("read", "readinto", "mmap"):
+            for prefetch in (False, True):
+                name = f"{mode}, {block_kb} KiB{', prefetch' if prefetch else ''}"
+                variants.append((name, _engine(block_kb * 1024, mode, prefetch)))
+
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir) as tmp_dir:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(tmp_dir, f"file_{size_mb}")
+            with open(path, "wb") as fh:
+                for _ in range(size_mb):
+                    fh.write(os.urandom(1024 * 1024))
+            # file was just written, so all variants read it from page cache; results show CPU cost of hashing
+            print(f"file size: {size_mb} MiB")
+            expected = None
+            for name, function in variants:
+                elapsed, digest = min(timeit(function, path) for _ in range(args.repeat))
+                expected = expected or digest
+                assert digest == expected, f"{name}: hashes differ!"
+                print(f"  {name}: {elapsed * 1000:.1f}ms ({size_mb / elapsed:.1f} MiB/s)")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,394 @@
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import stat
+import tempfile
+from time import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "tensorflow_deploy_utils",
+)
+VALIDATION_LEVELS = {"fast": 0, "deep": 1}
+# last use of cached validation is refreshed at most once per interval, so cache hits rarely rewrite cache file
+VALIDATION_TOUCH_INTERVAL = 60
+DEFAULT_MODEL_CACHE_SIZE = 10 * 1024 * 1024 * 1024
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+@contextmanager
+def file_lock(path: Path):
+    """
+    Context manager which holds exclusive lock of given lock file, shared by all processes on the node. Lock is
+    released by operating system also when process is killed.
+    :param path: Path to lock file, created if missing
+    :return: None
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as fh:
+        if fcntl:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        else:
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_json(path: Path, data: dict) -> None:
+    """
+    Internal function. Write JSON file atomically, so concurrent processes never read partially written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.stem}_")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+class ValidationCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_entries: int = 1000) -> None:
+        """
+        Persistent cache of successful model/module validations. Entries are keyed by content (archive hash or
+        directory fingerprint), so the same model uploaded to several TensorFlow Deploy instances is validated once.
+        Least recently used entries are evicted when cache has more than max_entries entries.
+        :param cache_dir: (optional) Directory where cache file is kept (default: ~/.cache/tensorflow_deploy_utils)
+        :param max_entries: (optional) Maximum number of cached validations (default: 1000)
+        """
+        self.path = Path(cache_dir, "validation.json")
+        self.max_entries = max_entries
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r") as fh:
+                entries = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        # malformed entries (e.g. written by other version) are treated as missing
+        return {
+            key: entry
+            for key, entry in entries.items()
+            if isinstance(entry, dict)
+            and entry.get("level") in VALIDATION_LEVELS
+            and isinstance(entry.get("used"), (int, float))
+        }
+
+    def _save(self, entries: dict) -> None:
+        _write_json(self.path, entries)
+
+    def _lock(self):
+        return file_lock(self.path.with_suffix(".lock"))
+
+    def get(self, key: str, level: str) -> dict:
+        """
+        Method return cached validation of given key, if it was made on given or higher level. 'deep' validation
+        satisfies 'fast' one.
+        :param key: Cache key
+        :param level: Required validation level
+        :return: Cached entry or None
+        """
+        entry = self._load().get(key)
+        if entry is None or VALIDATION_LEVELS[entry["level"]] < VALIDATION_LEVELS[level]:
+            return None
+        now = time()
+        if now - entry["used"] >= VALIDATION_TOUCH_INTERVAL:
+            with self._lock():
+                entries = self._load()
+                if key in entries:
+                    entries[key]["used"] = now
+                    self._save(entries)
+        return entry
+
+    def put(self, key: str, level: str, signatures: list = None) -> None:
+        """
+        Method store successful validation of given key and evict least recently used entries above limit.
+        :param key: Cache key
+        :param level: Validation level
+        :param signatures: (optional) Signatures found during validation
+        :return: None
+        """
+        with self._lock():
+            entries = self._load()
+            previous = entries.get(key)
+            if previous and VALIDATION_LEVELS[previous["level"]] > VALIDATION_LEVELS[level]:
+                level = previous["level"]
+            entries[key] = {"level": level, "signatures": signatures or [], "used": time()}
+            for old_key in sorted(entries, key=lambda k: entries[k]["used"])[
+                : max(len(entries) - self.max_entries, 0)
+            ]:
+                del entries[old_key]
+            self._save(entries)
+
+    def invalidate(self, key: str = "") -> None:
+        """
+        Method remove given entry from cache, or all entries if key is not given.
+        :param key: (optional) Cache key
+        :return: None
+        """
+        with self._lock():
+            entries = self._load()
+            if key:
+                entries.pop(key, None)
+            else:
+                entries = {}
+            self._save(entries)
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+class DigestCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_entries: int = 100000) -> None:
+        """
+        Persistent cache of file hashes used by directory fingerprints. Entries are keyed by algorithm and absolute
+        path of file and keep its size, modification time and inode, so hash is reused only while file is unchanged.
+        Least recently stored entries are evicted when cache has more than max_entries entries.
+        :param cache_dir: (optional) Directory where cache file is kept (default: ~/.cache/tensorflow_deploy_utils)
+        :param max_entries: (optional) Maximum number of cached file hashes (default: 100000)
+        """
+        self.path = Path(cache_dir, "digests.json")
+        self.max_entries = max_entries
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r") as fh:
+                entries = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def get_many(self, keys) -> dict:
+        """
+        Method return cached entries of given keys.
+        :param keys: Iterable of cache keys
+        :return: Dictionary with key as key and list [size, mtime_ns, inode, hash] as value, missing keys are skipped
+        """
+        entries = self._load()
+        return {key: entries[key] for key in keys if key in entries}
+
+    def put_many(self, new_entries: dict) -> None:
+        """
+        Method store given entries, merging them with entries stored by other processes meanwhile.
+        :param new_entries: Dictionary with key as key and list [size, mtime_ns, inode, hash] as value
+        :return: None
+        """
+        if not new_entries:
+            return
+        with file_lock(self.path.with_suffix(".lock")):
+            entries = self._load()
+            for key, entry in new_entries.items():
+                # re-inserted keys go to the end, so the oldest entries are evicted first
+                entries.pop(key, None)
+                entries[key] = entry
+            for old_key in list(entries)[: max(len(entries) - self.max_entries, 0)]:
+                del entries[old_key]
+            _write_json(self.path, entries)
+
+    def invalidate(self) -> None:
+        """
+        Method remove all entries from cache.
+        :return: None
+        """
+        with file_lock(self.path.with_suffix(".lock")):
+            _write_json(self.path, {})
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+class ModelCache:
+    def __init__(
+        self, cache_dir: str = DEFAULT_CACHE_DIR, max_size: int = DEFAULT_MODEL_CACHE_SIZE, hardlink: bool = False
+    ) -> None:
+        """
+        Local content-addressed cache of downloaded model/module archives. Every archive is stored once as
+        `blobs/<sha256>.tar` and index maps download URL (i.e. version or label of model) to archive hash and HTTP
+        validators (ETag/Last-Modified) used to check freshness of labels. Index and blobs are modified under lock
+        shared by all processes on the node, so parallel jobs share one copy of archive. Least recently used archives
+        are evicted when cache is bigger than max_size bytes.
+        :param cache_dir: (optional) Directory where cache is kept (default: ~/.cache/tensorflow_deploy_utils)
+        :param max_size: (optional) Maximum size of cached archives in bytes (default: 10 GiB)
+        :param hardlink: (optional) Write cached archives to destination as hard links instead of copies. Hard link
+        shares data with cache, so archive modified in place after changing its permissions corrupts the cache for all
+        processes on the node (default: False)
+        """
+        self.root = Path(cache_dir, "models")
+        self.index_path = self.root.joinpath("index.json")
+        self.max_size = max_size
+        self.hardlink = hardlink
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()[:32]
+
+    def lock(self, key: str = ""):
+        """
+        Method return cross-process lock of whole cache, or lock of downloads of given key.
+        :param key: (optional) Cache key
+        :return: Lock context manager
+        """
+        return file_lock(self.root.joinpath("locks", f"{key or 'index'}.lock"))
+
+    def blob_path(self, archive_hash: str) -> Path:
+        return self.root.joinpath("blobs", f"{archive_hash}.tar")
+
+    def download_path(self, key: str) -> Path:
+        """
+        Method return path for archive being downloaded for given key. It is kept in cache directory, so downloaded
+        file can be moved to blobs without copying, and interrupted downloads can be resumed.
+        :param key: Cache key
+        :return: Path to download file
+        """
+        path = self.root.joinpath("downloads", f"{key}.tar")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _load(self) -> dict:
+        try:
+            with open(self.index_path, "r") as fh:
+                index = json.load(fh)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault("urls", {})
+        index.setdefault("blobs", {})
+        return index
+
+    def get(self, key: str) -> dict:
+        """
+        Method return cache entry of given key (archive hash and validators) if its archive is still in cache.
+        :param key: Cache key
+        :return: Cache entry or None
+        """
+        with self.lock():
+            index = self._load()
+            entry = index["urls"].get(key)
+            if entry is None or entry["hash"] not in index["blobs"] or not self.blob_path(entry["hash"]).is_file():
+                return None
+            return entry
+
+    def put(self, key: str, path: Path, archive_hash: str, etag: str = None, last_modified: str = None) -> None:
+        """
+        Method move downloaded archive into cache under its hash, remember it for given key and evict least recently
+        used archives above size limit.
+        :param key: Cache key
+        :param path: Path to downloaded archive (moved into cache)
+        :param archive_hash: SHA256 hash of archive
+        :param etag: (optional) ETag header of download response
+        :param last_modified: (optional) Last-Modified header of download response
+        :return: None
+        """
+        with self.lock():
+            index = self._load()
+            blob_path = self.blob_path(archive_hash)
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            if blob_path.is_file():
+                os.remove(path)
+            else:
+                os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                os.replace(path, blob_path)
+            index["blobs"][archive_hash] = {"size": blob_path.stat().st_size, "used": time()}
+            index["urls"][key] = {"hash": archive_hash, "etag": etag, "last_modified": last_modified}
+            self._evict(index, keep=archive_hash)
+            _write_json(self.index_path, index)
+
+    def copy_to(self, archive_hash: str, path: Path) -> bool:
+        """
+        Method write cached archive to given path as copy (or hard link, if enabled and cache is on the same
+        filesystem) and mark archive as recently used. Archive is copied without holding lock of the cache, from file
+        opened under lock, so archive evicted meanwhile is still copied whole.
+        :param archive_hash: SHA256 hash of archive
+        :param path: Destination file path
+        :return: True if archive was in cache
+        """
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        src = None
+        try:
+            with self.lock():
+                index = self._load()
+                blob_path = self.blob_path(archive_hash)
+                if archive_hash not in index["blobs"] or not blob_path.is_file():
+                    return False
+                index["blobs"][archive_hash]["used"] = time()
+                _write_json(self.index_path, index)
+                linked = False
+                if self.hardlink:
+                    try:
+                        os.link(blob_path, tmp_path)
+                        linked = True
+                    except OSError:
+                        pass
+                if not linked:
+                    src = open(blob_path, "rb")
+            if src is not None:
+                with open(tmp_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+            os.replace(tmp_path, path)
+        finally:
+            if src is not None:
+                src.close()
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+        return True
+
+    def _evict(self, index: dict, keep: str = "") -> None:
+        """
+        Internal method. Remove least recently used archives from cache until it fits in max_size bytes.
+        """
+        size = sum(blob["size"] for blob in index["blobs"].values())
+        for archive_hash in sorted(index["blobs"], key=lambda h: index["blobs"][h]["used"]):
+            if size <= self.max_size:
+                break
+            if archive_hash == keep:
+                continue
+            size -= index["blobs"].pop(archive_hash)["size"]
+            try:
+                os.remove(self.blob_path(archive_hash))
+            except FileNotFoundError:
+                pass
+        index["urls"] = {key: entry for key, entry in index["urls"].items() if entry["hash"] in index["blobs"]}
+
+    def invalidate(self) -> None:
+        """
+        Method remove all archives from cache.
+        :return: None
+        """
+        with self.lock():
+            index = self._load()
+            for archive_hash in index["blobs"]:
+                try:
+                    os.remove(self.blob_path(archive_hash))
+                except FileNotFoundError:
+                    pass
+            _write_json(self.index_path, {"urls": {}, "blobs": {}})
+
+    def size(self) -> int:
+        return sum(blob["size"] for blob in self._load()["blobs"].values())
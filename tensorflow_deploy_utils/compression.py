@@ -0,0 +1,246 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import os
+import struct
+import zlib
+
+# NOTE: zstandard is optional dependency, it is imported only when zstd archive is created or read.
+
+COMPRESSIONS = ("", "gzip", "zstd")
+ARCHIVE_SUFFIXES = {"": ".tar", "gzip": ".tar.gz", "zstd": ".tar.zst"}
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+_MAGIC = {"gzip": b"\x1f\x8b", "zstd": b"\x28\xb5\x2f\xfd"}
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires zstandard package: pip install zstandard")
+    return zstandard
+
+
+def check_compression(compression: str) -> str:
+    """
+    Function check name of compression.
+    :param compression: Compression name: '' (none), 'gzip' or 'zstd'
+    :return: Compression name
+    """
+    compression = compression or ""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}, expected one of: gzip, zstd")
+    return compression
+
+
+def detect_compression(head: bytes) -> str:
+    """
+    Function detect compression of archive from its first bytes.
+    :param head: At least 4 first bytes of archive
+    :return: Compression name, empty for plain tar
+    """
+    for compression, magic in _MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return ""
+
+
+def is_archive_path(path: str) -> bool:
+    """
+    Function check if given file name looks like (compressed) tar archive.
+    :param path: Path to file
+    :return: True for .tar, .tar.gz, .tgz and .tar.zst files
+    """
+    return str(path).endswith((*ARCHIVE_SUFFIXES.values(), ".tgz"))
+
+
+def _gzip_member(data: bytes, level: int) -> bytes:
+    """
+    Internal function. Compress data to one gzip member with zero modification time and no file name, so output is
+    deterministic (like gzip.compress(data, level, mtime=0), which needs Python 3.8).
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    extra_flags = 2 if level == 9 else 4 if level == 1 else 0
+    header = struct.pack("<BBBBIBB", 0x1F, 0x8B, 8, 0, 0, extra_flags, 255)
+    trailer = struct.pack("<II", zlib.crc32(data) & 0xFFFFFFFF, len(data) & 0xFFFFFFFF)
+    return header + compressor.compress(data) + compressor.flush() + trailer
+
+
+class _BlockGzipWriter:
+    def __init__(self, fileobj, level: int = 6, threads: int = 0, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        """
+        Internal file-like object which compresses written data in independent blocks on many threads (zlib releases
+        GIL) and writes them in order as members of multi-member gzip stream, which is readable by every gzip reader.
+        :param fileobj: Destination file-like object
+        :param level: (optional) Compression level 1-9 (default: 6)
+        :param threads: (optional) Number of compressing threads, 0 - all cores (default: 0)
+        :param block_size: (optional) Size of independently compressed block (default: 4 MiB)
+        """
+        self.fileobj = fileobj
+        self.level = level
+        self.block_size = block_size
+        self.threads = threads or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(max_workers=self.threads)
+        self.pending = deque()
+        self.buffer = bytearray()
+        self.position = 0
+
+    def write(self, data: bytes) -> int:
+        self.buffer += data
+        self.position += len(data)
+        while len(self.buffer) >= self.block_size:
+            self._submit(bytes(self.buffer[: self.block_size]))
+            del self.buffer[: self.block_size]
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def _submit(self, block: bytes) -> None:
+        self.pending.append(self.executor.submit(_gzip_member, block, self.level))
+        # limit memory used by blocks waiting for compression
+        while len(self.pending) > 2 * self.threads:
+            self.fileobj.write(self.pending.popleft().result())
+
+    def close(self) -> None:
+        if self.executor is None:
+            return
+        try:
+            if self.buffer or not self.position:
+                self._submit(bytes(self.buffer))
+                self.buffer = bytearray()
+            while self.pending:
+                self.fileobj.write(self.pending.popleft().result())
+        finally:
+            # blocks waiting for compression are not needed after error
+            for future in self.pending:
+                future.cancel()
+            self.pending.clear()
+            self.executor.shutdown()
+            self.executor = None
+
+
+class _ZstdWriter:
+    def __init__(self, fileobj, level: int = 3, threads: int = 0) -> None:
+        """
+        Internal file-like object which compresses written data with zstd using its built-in multi-threading.
+        :param fileobj: Destination file-like object
+        :param level: (optional) Compression level 1-22 (default: 3)
+        :param threads: (optional) Number of compressing threads, 0 - all cores (default: 0)
+        """
+        zstandard = _zstandard()
+        compressor = zstandard.ZstdCompressor(level=level, threads=threads or -1)
+        self.writer = compressor.stream_writer(fileobj, closefd=False)
+        self.position = 0
+
+    def write(self, data: bytes) -> int:
+        self.writer.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def compressing_writer(
+    fileobj, compression: str, level: int = None, threads: int = 0, block_size: int = DEFAULT_BLOCK_SIZE
+):
+    """
+    Function wrap file-like object with writer compressing data with given compression on many threads. Writer must
+    be closed to flush compressed data; destination file-like object is not closed.
+    :param fileobj: Destination file-like object
+    :param compression: Compression name: 'gzip' or 'zstd'
+    :param level: (optional) Compression level (default: 6 for gzip, 3 for zstd)
+    :param threads: (optional) Number of compressing threads, 0 - all cores (default: 0)
+    :param block_size: (optional) Size of independently compressed gzip block (default: 4 MiB)
+    :return: File-like writer
+    """
+    if check_compression(compression) == "gzip":
+        return _BlockGzipWriter(fileobj, 6 if level is None else level, threads, block_size)
+    if compression == "zstd":
+        return _ZstdWriter(fileobj, 3 if level is None else level, threads)
+    raise ValueError("Compression is required for compressing writer")
+
+
+class _ChunksSink:
+    def __init__(self) -> None:
+        self.chunks = []
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> list:
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+def compress_chunks(
+    chunks, compression: str, level: int = None, threads: int = 0, block_size: int = DEFAULT_BLOCK_SIZE
+):
+    """
+    Function compress iterable of chunks (e.g. archive generated on the fly) with given compression.
+    :param chunks: Iterable of bytes
+    :param compression: Compression name, empty string returns chunks unchanged
+    :param level: (optional) Compression level (default: 6 for gzip, 3 for zstd)
+    :param threads: (optional) Number of compressing threads, 0 - all cores (default: 0)
+    :param block_size: (optional) Size of independently compressed gzip block (default: 4 MiB)
+    :return: Generator of compressed chunks
+    """
+    if not check_compression(compression):
+        yield from chunks
+        return
+    sink = _ChunksSink()
+    writer = compressing_writer(sink, compression, level, threads, block_size)
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+            yield from sink.take()
+    finally:
+        writer.close()
+    yield from sink.take()
+
+
+class _PrefixedReader:
+    def __init__(self, head: bytes, fileobj) -> None:
+        """
+        Internal file-like object, which returns already read head before rest of file-like object.
+        """
+        self.head = head
+        self.fileobj = fileobj
+
+    def read(self, size: int = -1) -> bytes:
+        if not self.head:
+            return self.fileobj.read(size)
+        if size < 0:
+            data, self.head = self.head + self.fileobj.read(), b""
+            return data
+        data, self.head = self.head[:size], self.head[size:]
+        if len(data) < size:
+            data += self.fileobj.read(size - len(data))
+        return data
+
+
+def decompressing_reader(fileobj):
+    """
+    Function detect compression of archive read from file-like object and return reader of decompressed archive.
+    Multi-member gzip streams and multi-frame zstd streams are supported.
+    :param fileobj: Readable file-like object
+    :return: File-like reader
+    """
+    head = fileobj.read(4)
+    reader = _PrefixedReader(head, fileobj)
+    compression = detect_compression(head)
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=reader, mode="rb")
+    if compression == "zstd":
+        return _zstandard().ZstdDecompressor().stream_reader(reader, read_across_frames=True)
+    return reader
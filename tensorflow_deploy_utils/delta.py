@@ -0,0 +1,66 @@
+import os
+import stat
+
+from .archive import iter_tree, normalized_mode
+
+# Delta upload contract proposed for TensorFlow Deploy. Blobs are files identified by SHA256 of their contents, stored
+# per model name; manifest lists members of model archive in order of reproducible archive (see: archive.iter_tree).
+#
+#   POST /v1/models/{team}/{project}/names/{name}/blobs/missing
+#       body: {"blobs": [sha256, ...]}, response 200: {"missing": [sha256, ...]} - blobs not stored yet
+#   PUT /v1/models/{team}/{project}/names/{name}/blobs/{sha256}
+#       body: file contents, response 200 when stored, 400 when contents don't match hash
+#   POST /v1/models/{team}/{project}/names/{name}/labels/{label}/manifest
+#       body: manifest, response 200 when new model version with given label was created from blobs (the same as
+#       created by upload of reproducible archive), 409 {"missing": [sha256, ...]} when some blobs are not stored
+#
+# Servers without delta upload answer 404 to blobs/missing and model is uploaded as full archive.
+# See delta_stub module for reference implementation used as local stand-in of TensorFlow Deploy.
+
+MANIFEST_VERSION = 1
+
+
+def build_manifest(src_path: str, digests: dict) -> dict:
+    """
+    Function build manifest of model directory for delta upload: list of directories, files (with hash, size and
+    normalized permissions) and symbolic links in order of reproducible archive.
+    :param src_path: Full path to your TF model or module
+    :param digests: Dictionary with relative file path (with '/' separator) as key and its SHA256 hash as value, see:
+    hashing.file_digests
+    :return: Manifest dictionary
+    """
+    src_path = src_path.rstrip(str(os.path.sep))
+    entries = []
+    for path, arcname in iter_tree(src_path):
+        path_stat = os.lstat(path)
+        if stat.S_ISLNK(path_stat.st_mode):
+            entries.append(
+                {
+                    "path": arcname,
+                    "type": "symlink",
+                    "mode": normalized_mode(0, is_symlink=True),
+                    "link": os.readlink(path),
+                }
+            )
+        elif stat.S_ISDIR(path_stat.st_mode):
+            entries.append({"path": arcname, "type": "dir", "mode": normalized_mode(0, is_dir=True)})
+        elif stat.S_ISREG(path_stat.st_mode):
+            entries.append(
+                {
+                    "path": arcname,
+                    "type": "file",
+                    "mode": normalized_mode(path_stat.st_mode),
+                    "size": path_stat.st_size,
+                    "sha256": digests[arcname[len("./") :]],
+                }
+            )
+    return {"version": MANIFEST_VERSION, "entries": entries}
+
+
+def manifest_blobs(manifest: dict) -> dict:
+    """
+    Function return blobs used by manifest.
+    :param manifest: Manifest dictionary
+    :return: Dictionary with SHA256 hash as key and size of blob as value
+    """
+    return {entry["sha256"]: entry["size"] for entry in manifest["entries"] if entry["type"] == "file"}
@@ -0,0 +1,186 @@
+import hashlib
+import http.server
+import io
+import json
+import re
+import tarfile
+import threading
+
+from .archive import normalize_tarinfo
+
+# Reference implementation of delta upload contract (see: delta module) used as local stand-in of TensorFlow Deploy,
+# e.g. in tests or to try delta uploads offline. It is not a TensorFlow Deploy server: only /ping and delta upload
+# endpoints are served and models are kept in memory.
+
+_MODEL_PATH = r"/v1/models/(?P<team>[^/]+)/(?P<project>[^/]+)/names/(?P<name>[^/]+)"
+_ROUTES = {
+    ("POST", "missing"): re.compile(_MODEL_PATH + r"/blobs/missing$"),
+    ("PUT", "blob"): re.compile(_MODEL_PATH + r"/blobs/(?P<blob>[0-9a-f]{64})$"),
+    ("POST", "manifest"): re.compile(_MODEL_PATH + r"/labels/(?P<label>[^/]+)/manifest$"),
+}
+
+
+class DeltaStore:
+    def __init__(self) -> None:
+        """
+        In-memory store of blobs and model versions created from manifests.
+        """
+        self.lock = threading.Lock()
+        # (team, project, name) -> {sha256: contents}
+        self.blobs = {}
+        # (team, project, name) -> list of (label, archive) tuples, version is index + 1
+        self.versions = {}
+
+    def missing(self, model: tuple, blobs: list) -> list:
+        """
+        Method return blobs which are not stored for given model.
+        :param model: Tuple with team, project and name
+        :param blobs: List of SHA256 hashes
+        :return: List of missing SHA256 hashes
+        """
+        with self.lock:
+            stored = self.blobs.get(model, {})
+            return [blob for blob in blobs if blob not in stored]
+
+    def put_blob(self, model: tuple, blob: str, data: bytes) -> bool:
+        """
+        Method store blob of given model, if its contents match its hash.
+        :param model: Tuple with team, project and name
+        :param blob: SHA256 hash of contents
+        :param data: Contents
+        :return: True if blob was stored
+        """
+        if hashlib.sha256(data).hexdigest() != blob:
+            return False
+        with self.lock:
+            self.blobs.setdefault(model, {})[blob] = data
+        return True
+
+    def commit(self, model: tuple, label: str, manifest: dict) -> tuple:
+        """
+        Method create new model version with given label from manifest.
+        :param model: Tuple with team, project and name
+        :param label: Label of new version
+        :param manifest: Manifest dictionary, see: delta.build_manifest
+        :return: Tuple with version (None if blobs are missing) and list of missing SHA256 hashes
+        """
+        with self.lock:
+            stored = dict(self.blobs.get(model, {}))
+        missing = sorted(
+            {entry["sha256"] for entry in manifest["entries"] if entry["type"] == "file"} - set(stored)
+        )
+        if missing:
+            return None, missing
+        archive = assemble_archive(manifest, stored.__getitem__)
+        with self.lock:
+            versions = self.versions.setdefault(model, [])
+            versions.append((label, archive))
+            return len(versions), []
+
+
+def assemble_archive(manifest: dict, get_blob) -> bytes:
+    """
+    Function create model archive from manifest and blobs. Archive is byte-identical to reproducible archive of
+    uploaded directory (see: TFD.create_archive).
+    :param manifest: Manifest dictionary, see: delta.build_manifest
+    :param get_blob: Function returning contents of blob with given SHA256 hash
+    :return: Archive bytes
+    """
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.PAX_FORMAT, encoding="utf-8") as archive:
+        for entry in manifest["entries"]:
+            tarinfo = tarfile.TarInfo(entry["path"])
+            tarinfo.mode = entry["mode"]
+            if entry["type"] == "dir":
+                tarinfo.type = tarfile.DIRTYPE
+                archive.addfile(normalize_tarinfo(tarinfo))
+            elif entry["type"] == "symlink":
+                tarinfo.type = tarfile.SYMTYPE
+                tarinfo.linkname = entry["link"]
+                archive.addfile(normalize_tarinfo(tarinfo))
+            else:
+                data = get_blob(entry["sha256"])
+                tarinfo.size = len(data)
+                archive.addfile(normalize_tarinfo(tarinfo), io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class DeltaStubHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body) -> None:
+        data = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self):
+        """
+        Return name and parameters of endpoint matching request, or None.
+        """
+        for (method, name), pattern in _ROUTES.items():
+            match = pattern.match(self.path.split("?")[0])
+            if method == self.command and match:
+                return name, match.groupdict()
+        return None
+
+    def do_GET(self):
+        if self.path == "/ping":
+            self._send(200, "pong")
+        else:
+            self._send(404, "not found")
+
+    def _handle(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        route = self._route()
+        if route is None:
+            self._send(404, "not found")
+            return
+        name, params = route
+        store = self.server.store
+        model = (params["team"], params["project"], params["name"])
+        self.server.requests.append((self.command, self.path, len(body)))
+        try:
+            if name == "missing":
+                self._send(200, {"missing": store.missing(model, json.loads(body)["blobs"])})
+            elif name == "blob":
+                if store.put_blob(model, params["blob"], body):
+                    self._send(200, "ok")
+                else:
+                    self._send(400, "blob contents don't match its hash")
+            else:
+                version, missing = store.commit(model, params["label"], json.loads(body))
+                if missing:
+                    self._send(409, {"missing": missing})
+                else:
+                    self._send(200, f"version {version} created")
+        except (ValueError, KeyError, TypeError) as error:
+            self._send(400, f"invalid request: {error}")
+
+    do_POST = do_PUT = _handle
+
+
+class DeltaStubServer(http.server.ThreadingHTTPServer):
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, store: DeltaStore = None) -> None:
+        """
+        Local HTTP server implementing delta upload contract. It can be used as context manager, which serves requests
+        on background thread.
+        :param host: (optional) Listening address (default: 127.0.0.1)
+        :param port: (optional) Listening port, 0 - random free port (default: 0)
+        :param store: (optional) Store of blobs and models (default: new DeltaStore)
+        """
+        super().__init__((host, port), DeltaStubHandler)
+        self.daemon_threads = True
+        self.store = store or DeltaStore()
+        self.requests = []
+        self.port = self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
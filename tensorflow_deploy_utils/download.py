@@ -0,0 +1,396 @@
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import requests
+import shutil
+import tarfile
+import threading
+import uuid
+
+from .archive import extract_tar_stream
+from .transport import check_deadline
+
+DEFAULT_BUFFER_SIZE = 8 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+_write_lock = threading.Lock()
+
+
+def write_response(
+    response, path: Path, buffer_size: int = DEFAULT_BUFFER_SIZE, expected_hash: str = ""
+) -> str:
+    """
+    Function write body of streamed HTTP response to given path. Body is written in chunks of buffer_size bytes to
+    temporary file in destination directory, which is renamed to given path only when whole body was received and
+    verified, so partially downloaded file is never visible under given path.
+    :param response: requests.Response object returned for request with stream=True
+    :param path: Destination file path
+    :param buffer_size: (optional) Maximum size of chunk kept in memory (default: 8 MiB)
+    :param expected_hash: (optional) Expected SHA256 hash of body
+    :return: String with SHA256 hash of written body
+    """
+    sha256_hash = hashlib.sha256()
+    written = 0
+    tmp_path = str(path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp"))
+    fh = open(tmp_path, "xb")
+    try:
+        with fh:
+            for chunk in response.iter_content(chunk_size=buffer_size):
+                check_deadline()
+                sha256_hash.update(chunk)
+                fh.write(chunk)
+                written += len(chunk)
+
+        expected_length = response.headers.get("Content-Length")
+        if (
+            expected_length is not None
+            and "Content-Encoding" not in response.headers
+            and written != int(expected_length)
+        ):
+            raise ValueError(f"incomplete body, received {written} of {expected_length} bytes")
+        archive_hash = sha256_hash.hexdigest()
+        if expected_hash and archive_hash != expected_hash.lower():
+            raise ValueError(f"hash mismatch, expected {expected_hash}, got {archive_hash}")
+
+        os.replace(tmp_path, str(path))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    finally:
+        response.close()
+
+    return archive_hash
+
+
+def extract_response(
+    response, path: Path, buffer_size: int = DEFAULT_BUFFER_SIZE, expected_hash: str = ""
+) -> str:
+    """
+    Function extract tar archive from body of streamed HTTP response to given directory in one pass, without writing
+    archive on disk. Members are extracted to temporary directory next to given path, which is renamed to given path
+    only when whole body was received and verified.
+    :param response: requests.Response object returned for request with stream=True
+    :param path: Destination directory path, it must not exist or be empty
+    :param buffer_size: (optional) Maximum size of chunk kept in memory (default: 8 MiB)
+    :param expected_hash: (optional) Expected SHA256 hash of archive
+    :return: String with SHA256 hash of archive
+    """
+    sha256_hash = hashlib.sha256()
+    received = 0
+
+    def chunks():
+        nonlocal received
+        for chunk in response.iter_content(chunk_size=buffer_size):
+            check_deadline()
+            sha256_hash.update(chunk)
+            received += len(chunk)
+            yield chunk
+
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.mkdir()
+    try:
+        try:
+            extract_tar_stream(chunks(), str(tmp_path))
+        except tarfile.TarError as error:
+            raise ValueError(f"invalid archive, {error}")
+
+        expected_length = response.headers.get("Content-Length")
+        if (
+            expected_length is not None
+            and "Content-Encoding" not in response.headers
+            and received != int(expected_length)
+        ):
+            raise ValueError(f"incomplete body, received {received} of {expected_length} bytes")
+        archive_hash = sha256_hash.hexdigest()
+        if expected_hash and archive_hash != expected_hash.lower():
+            raise ValueError(f"hash mismatch, expected {expected_hash}, got {archive_hash}")
+
+        os.replace(str(tmp_path), str(path))
+    except BaseException:
+        shutil.rmtree(str(tmp_path), ignore_errors=True)
+        raise
+    finally:
+        response.close()
+
+    return archive_hash
+
+
+class PartialDownload:
+    def __init__(self, path: Path, url: str) -> None:
+        """
+        State of resumable download kept next to destination file: `.partial` file with already received bytes and
+        small JSON sidecar with URL, expected length and validators (ETag/Last-Modified) of downloaded resource.
+        Partial file name depends only on URL, so next download of the same URL into the same directory can resume it.
+        :param path: Destination file path
+        :param url: Downloaded URL
+        """
+        key = hashlib.sha256(url.encode()).hexdigest()[:16]
+        self.url = url
+        self.data_path = path.parent.joinpath(f".tfd_download_{key}.partial")
+        self.meta_path = path.parent.joinpath(f".tfd_download_{key}.partial.json")
+
+    def load(self) -> dict:
+        """
+        Method return saved state of download, or empty dict if there is nothing to resume.
+        :return: Dictionary with url, length, etag, last_modified and offset keys
+        """
+        try:
+            with open(self.meta_path, "r") as fh:
+                meta = json.load(fh)
+            offset = self.data_path.stat().st_size
+        except (OSError, ValueError):
+            self.remove()
+            return {}
+        if meta.get("url") != self.url or (meta.get("length") is not None and offset > meta["length"]):
+            self.remove()
+            return {}
+        meta["offset"] = offset
+        return meta
+
+    def save(self, response, length: int) -> None:
+        meta = {
+            "url": self.url,
+            "length": length,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        with open(self.meta_path, "w") as fh:
+            json.dump(meta, fh)
+
+    def remove(self) -> None:
+        for path in (self.data_path, self.meta_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _content_range(response) -> tuple:
+    """
+    Internal function. Return first byte position and total length from Content-Range header of 206 response, e.g.
+    `bytes 100-199/200` gives (100, 200). Unknown total length is returned as None.
+    """
+    match = re.fullmatch(r"bytes (\d+)-\d+/(\d+|\*)", response.headers.get("Content-Range", ""))
+    if not match:
+        return -1, None
+    return int(match.group(1)), None if match.group(2) == "*" else int(match.group(2))
+
+
+def _hash_file(path: Path, size: int, buffer_size: int):
+    """
+    Internal function. Return SHA256 hash object updated with first size bytes of given file.
+    """
+    sha256_hash = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while size > 0:
+            chunk = fh.read(min(buffer_size, size))
+            if not chunk:
+                break
+            sha256_hash.update(chunk)
+            size -= len(chunk)
+    return sha256_hash
+
+
+def download_resumable(
+    session,
+    url: str,
+    path: Path,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    expected_hash: str = "",
+    attempts: int = 3,
+) -> str:
+    """
+    Function download given URL to given path, resuming interrupted downloads with HTTP Range requests. Received
+    bytes are kept in `.partial` file, which survives failures, so download can be continued by next attempt or next
+    call of this function. Range request is conditional (If-Range), so when resource changed or server ignores ranges,
+    whole body is downloaded again.
+    :param session: requests.Session used for requests
+    :param url: Downloaded URL
+    :param path: Destination file path
+    :param buffer_size: (optional) Maximum size of chunk kept in memory (default: 8 MiB)
+    :param expected_hash: (optional) Expected SHA256 hash of body
+    :param attempts: (optional) Number of attempts in case of connection errors (default: 3)
+    :return: String with SHA256 hash of written body
+    """
+    partial = PartialDownload(path, url)
+    for attempt in range(1, attempts + 1):
+        state = partial.load()
+        offset = state.get("offset", 0)
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            validator = state.get("etag") or state.get("last_modified")
+            if validator:
+                headers["If-Range"] = validator
+
+        response = session.get(url, headers=headers, stream=True)
+        if response.status_code == 206 and offset:
+            start, length = _content_range(response)
+            if start != offset:
+                response.close()
+                partial.remove()
+                continue
+        elif response.status_code == 200:
+            offset = 0
+            length = response.headers.get("Content-Length")
+            if length is not None and "Content-Encoding" not in response.headers:
+                length = int(length)
+            else:
+                length = None
+        elif response.status_code == 416:
+            response.close()
+            partial.remove()
+            continue
+        else:
+            raise requests.HTTPError(
+                f"unexpected status code: {response.status_code}", response=response
+            )
+
+        sha256_hash = _hash_file(partial.data_path, offset, buffer_size) if offset else hashlib.sha256()
+        partial.save(response, length)
+        received = offset
+        try:
+            with open(partial.data_path, "r+b" if offset else "wb") as fh:
+                fh.seek(offset)
+                fh.truncate()
+                for chunk in response.iter_content(chunk_size=buffer_size):
+                    check_deadline()
+                    sha256_hash.update(chunk)
+                    fh.write(chunk)
+                    received += len(chunk)
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
+            if attempt == attempts:
+                raise
+            continue
+        finally:
+            response.close()
+
+        if length is not None and received != length:
+            if attempt == attempts:
+                raise ValueError(f"incomplete body, received {received} of {length} bytes")
+            continue
+        break
+    else:
+        raise ValueError("server can't continue download")
+
+    archive_hash = sha256_hash.hexdigest()
+    if expected_hash and archive_hash != expected_hash.lower():
+        partial.remove()
+        raise ValueError(f"hash mismatch, expected {expected_hash}, got {archive_hash}")
+
+    os.replace(str(partial.data_path), str(path))
+    partial.remove()
+    return archive_hash
+
+
+def _write_at(fd: int, data: bytes, offset: int) -> None:
+    """
+    Internal function. Write data at given offset of file, without moving its position (pwrite), so many threads can
+    write to one file descriptor.
+    """
+    if hasattr(os, "pwrite"):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data = data[written:]
+            offset += written
+    else:
+        with _write_lock, open(fd, "r+b", closefd=False) as fh:
+            fh.seek(offset)
+            fh.write(data)
+
+
+def download_parallel(
+    session,
+    url: str,
+    path: Path,
+    workers: int = 4,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    expected_hash: str = "",
+) -> str:
+    """
+    Function download given URL to given path with many concurrent HTTP Range requests. File is preallocated and
+    every range of chunk_size bytes is written directly at its offset by one of worker threads. SHA256 hash is
+    calculated at the end. If server doesn't support ranges, body is downloaded in one stream.
+    Note: requests session should have at least `workers` connections in its pool (pool_maxsize).
+    :param session: requests.Session used for requests
+    :param url: Downloaded URL
+    :param path: Destination file path
+    :param workers: (optional) Number of concurrent range requests (default: 4)
+    :param chunk_size: (optional) Size of one range in bytes (default: 64 MiB)
+    :param buffer_size: (optional) Maximum size of chunk kept in memory by one worker (default: 8 MiB)
+    :param expected_hash: (optional) Expected SHA256 hash of body
+    :return: String with SHA256 hash of written body
+    """
+    response = session.get(url, headers={"Range": "bytes=0-0"}, stream=True)
+    if response.status_code == 200:
+        return write_response(response, path, buffer_size, expected_hash)
+    if response.status_code != 206:
+        raise requests.HTTPError(
+            f"unexpected status code: {response.status_code}", response=response
+        )
+    response.close()
+    _, length = _content_range(response)
+    if length is None:
+        raise ValueError("server didn't return length of archive")
+    headers = {}
+    validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+    if validator:
+        headers["If-Range"] = validator
+
+    def fetch(start: int) -> int:
+        end = min(start + chunk_size, length) - 1
+        range_response = session.get(
+            url, headers={**headers, "Range": f"bytes={start}-{end}"}, stream=True
+        )
+        with range_response:
+            if range_response.status_code != 206 or _content_range(range_response)[0] != start:
+                raise ValueError(
+                    f"range {start}-{end} request failed with status code: {range_response.status_code}"
+                )
+            offset = start
+            for chunk in range_response.iter_content(chunk_size=buffer_size):
+                check_deadline()
+                _write_at(fd, chunk, offset)
+                offset += len(chunk)
+        if offset != end + 1:
+            raise ValueError(f"incomplete range {start}-{end}, received {offset - start} bytes")
+        return offset - start
+
+    tmp_path = str(path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp"))
+    fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        try:
+            try:
+                os.posix_fallocate(fd, 0, length)
+            except (AttributeError, OSError):
+                os.ftruncate(fd, length)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # ranges are fetched in context of current operation, so their retries are counted in it
+                futures = [
+                    executor.submit(contextvars.copy_context().run, fetch, start)
+                    for start in range(0, length, chunk_size)
+                ]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            os.close(fd)
+
+        archive_hash = _hash_file(Path(tmp_path), length, buffer_size).hexdigest()
+        if expected_hash and archive_hash != expected_hash.lower():
+            raise ValueError(f"hash mismatch, expected {expected_hash}, got {archive_hash}")
+        os.replace(tmp_path, str(path))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    return archive_hash
@@ -0,0 +1,334 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import mmap
+import os
+import queue
+import threading
+from time import time_ns
+
+HASH_MODES = ("read", "readinto", "mmap")
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+# files modified so recently could be rewritten again within the same mtime tick, their digests are not cached
+RACY_WINDOW_NS = 2 * 10**9
+
+
+class HashingFileWrapper:
+    def __init__(self, fileobj, algorithm: str = "sha256") -> None:
+        """
+        File-like wrapper which updates hash with every chunk written through it. It allows to get hash of written
+        data (e.g. tar archive) without reading the whole file back from disk.
+        :param fileobj: File object opened for binary writing
+        :param algorithm: (optional) Hash algorithm name accepted by hashlib (default: sha256)
+        """
+        self.fileobj = fileobj
+        self.hash = hashlib.new(algorithm)
+        self.position = 0
+
+    def write(self, data: bytes) -> int:
+        self.hash.update(data)
+        self.position += len(data)
+        return self.fileobj.write(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        self.fileobj.flush()
+
+    def hexdigest(self) -> str:
+        """
+        Method return hash of all data written so far.
+        :return: String with calculated hash
+        """
+        return self.hash.hexdigest()
+
+
+def stat_fingerprint(path: str) -> str:
+    """
+    Function calculate cheap fingerprint of directory tree from metadata of its files (relative path, size,
+    modification time, device and inode). File contents are not read, so any rewrite of a file changes fingerprint,
+    but fingerprint of the same content in other location is different.
+    :param path: Path to directory
+    :return: String with fingerprint
+    """
+    fingerprint = hashlib.sha256()
+    stat = os.stat(path)
+    fingerprint.update(f"{stat.st_dev}\0{stat.st_ino}\n".encode())
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            stat = os.stat(file_path)
+            fingerprint.update(
+                f"{os.path.relpath(file_path, path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{stat.st_dev}\0{stat.st_ino}\n".encode()
+            )
+    return fingerprint.hexdigest()
+
+
+def check_hash_mode(mode: str) -> str:
+    """
+    Function check name of file hashing mode.
+    :param mode: Hashing mode: 'read', 'readinto' or 'mmap'
+    :return: Hashing mode
+    """
+    if mode not in HASH_MODES:
+        raise ValueError(f"Unsupported hash mode: {mode}, expected one of: {', '.join(HASH_MODES)}")
+    return mode
+
+
+def _read_blocks(fh, block_size: int):
+    """
+    Internal function. Generate blocks read from file-like object.
+    """
+    while True:
+        block = fh.read(block_size)
+        if not block:
+            return
+        yield block
+
+
+def _readinto_blocks(fh, block_size: int):
+    """
+    Internal function. Generate memoryviews of blocks read into one reused buffer, without copying data.
+    """
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    while True:
+        size = fh.readinto(buffer)
+        if not size:
+            return
+        yield view[:size]
+
+
+def _prefetched_blocks(fh, block_size: int, depth: int = 2):
+    """
+    Internal function. Generate memoryviews of blocks read by background thread up to depth blocks ahead, so reading
+    of next block overlaps hashing of current one (both release GIL). Buffers are reused, every block is valid only
+    until next one is requested.
+    """
+    free = queue.Queue()
+    ready = queue.Queue()
+    for _ in range(depth + 1):
+        free.put(bytearray(block_size))
+
+    def reader() -> None:
+        try:
+            while True:
+                buffer = free.get()
+                if buffer is None:
+                    return
+                size = fh.readinto(buffer)
+                ready.put((buffer, size))
+                if not size:
+                    return
+        except Exception as error:
+            ready.put((error, 0))
+
+    thread = threading.Thread(target=reader, name="hash-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            buffer, size = ready.get()
+            if isinstance(buffer, Exception):
+                raise buffer
+            if not size:
+                return
+            yield memoryview(buffer)[:size]
+            free.put(buffer)
+    finally:
+        # stop reader, it exits at latest after filling remaining free buffers
+        free.put(None)
+        thread.join()
+
+
+def _mapped_blocks(fh, block_size: int, prefetch: bool):
+    """
+    Internal function. Generate memoryviews of blocks of memory-mapped file. Kernel is told that file is read
+    sequentially and, with prefetch, to read next block ahead while current one is hashed.
+    """
+    size = os.fstat(fh.fileno()).st_size
+    if not size:
+        # empty file can't be mapped
+        return
+    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        # madvise is not available on Windows
+        advise = getattr(mapped, "madvise", None)
+        if advise is not None:
+            advise(mmap.MADV_SEQUENTIAL)
+        view = memoryview(mapped)
+        try:
+            for offset in range(0, size, block_size):
+                next_offset = offset + block_size
+                if prefetch and advise is not None and next_offset < size:
+                    aligned = next_offset - next_offset % mmap.PAGESIZE
+                    advise(mmap.MADV_WILLNEED, aligned, min(block_size, size - aligned))
+                block = view[offset:next_offset]
+                try:
+                    yield block
+                finally:
+                    block.release()
+        finally:
+            view.release()
+
+
+def file_digest(
+    path: str,
+    algorithm: str = "sha256",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    mode: str = "read",
+    prefetch: bool = False,
+) -> str:
+    """
+    Function calculate hash of file contents in large blocks: 'read' mode reads blocks as new bytes objects,
+    'readinto' mode reads them into reused buffer without copying data in Python (like hashlib.file_digest), 'mmap'
+    mode hashes blocks of memory-mapped file. hashlib releases GIL for large blocks, so many files can be hashed in
+    parallel on threads.
+    :param path: Path to file
+    :param algorithm: (optional) Hash algorithm name accepted by hashlib (default: sha256)
+    :param block_size: (optional) Size of block passed to hash at once in bytes (default: 1 MiB)
+    :param mode: (optional) Hashing mode: 'read', 'readinto' or 'mmap' (default: read)
+    :param prefetch: (optional) Read next block ahead while current one is hashed: on background thread into reused
+    buffers in 'read' and 'readinto' modes, by kernel (madvise) in 'mmap' mode (default: False)
+    :return: String with calculated hash
+    """
+    check_hash_mode(mode)
+    file_hash = hashlib.new(algorithm)
+    with open(path, "rb", buffering=0) as fh:
+        if mode == "mmap":
+            blocks = _mapped_blocks(fh, block_size, prefetch)
+        elif prefetch:
+            blocks = _prefetched_blocks(fh, block_size)
+        elif mode == "readinto":
+            blocks = _readinto_blocks(fh, block_size)
+        else:
+            blocks = _read_blocks(fh, block_size)
+        try:
+            for block in blocks:
+                file_hash.update(block)
+        finally:
+            # release buffers and stop prefetching thread before file is closed
+            blocks.close()
+    return file_hash.hexdigest()
+
+
+def _list_files(path: str) -> list:
+    """
+    Internal function. Return sorted relative paths (with '/' separator) of all files in directory tree.
+    """
+    files = []
+    for root, dirs, names in os.walk(path):
+        relative_root = os.path.relpath(root, path)
+        for name in names:
+            relative_path = name if relative_root == "." else os.path.join(relative_root, name)
+            files.append(relative_path.replace(os.path.sep, "/"))
+    return sorted(files)
+
+
+def file_digests(
+    path: str,
+    workers: int = 0,
+    cache=None,
+    algorithm: str = "sha256",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    mode: str = "read",
+) -> dict:
+    """
+    Function calculate hashes of all files in directory tree on thread pool. With cache, files whose path, size,
+    modification time and inode didn't change are not read again.
+    :param path: Path to directory
+    :param workers: (optional) Number of hashing threads, 0 - all cores (default: 0)
+    :param cache: (optional) DigestCache object with per-file hashes (default: no cache)
+    :param algorithm: (optional) Hash algorithm name accepted by hashlib (default: sha256)
+    :param block_size: (optional) Size of hashed block in bytes, see: file_digest (default: 1 MiB)
+    :param mode: (optional) Hashing mode: 'read', 'readinto' or 'mmap', see: file_digest (default: read)
+    :return: Dictionary with relative file path (with '/' separator) as key and its hash as value
+    """
+    check_hash_mode(mode)
+    root = os.path.realpath(path)
+    stats = {}
+    for relative_path in _list_files(root):
+        stat = os.stat(os.path.join(root, relative_path))
+        stats[relative_path] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    keys = {relative_path: f"{algorithm}:{os.path.join(root, relative_path)}" for relative_path in stats}
+    digests = {}
+    if cache is not None:
+        cached = cache.get_many(keys.values())
+        for relative_path, key in keys.items():
+            entry = cached.get(key)
+            if entry is not None and tuple(entry[:3]) == stats[relative_path]:
+                digests[relative_path] = entry[3]
+    missing = [relative_path for relative_path in stats if relative_path not in digests]
+    if missing:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+            hashed = executor.map(
+                lambda p: file_digest(os.path.join(root, p), algorithm, block_size, mode), missing
+            )
+            digests.update(zip(missing, hashed))
+    if cache is not None and missing:
+        now = time_ns()
+        try:
+            cache.put_many(
+                {
+                    keys[relative_path]: [*stats[relative_path], digests[relative_path]]
+                    for relative_path in missing
+                    if now - stats[relative_path][1] > RACY_WINDOW_NS
+                }
+            )
+        except OSError:
+            # cache is only an optimization, fingerprint is valid without it
+            pass
+    return digests
+
+
+def merkle_root(digests: dict, algorithm: str = "sha256") -> str:
+    """
+    Function combine hashes of files into Merkle-style root hash of directory tree. Every directory node is hash of
+    sorted entries of its files and subdirectories (type, name and hash), so change of any file changes hashes of all
+    directories on its path, and file contents moved between names give different root.
+    :param digests: Dictionary with relative file path (with '/' separator) as key and its hash as value
+    :param algorithm: (optional) Hash algorithm name accepted by hashlib (default: sha256)
+    :return: String with root hash
+    """
+    tree = {}
+    for relative_path, digest in digests.items():
+        *dirs, name = relative_path.split("/")
+        node = tree
+        for directory in dirs:
+            node = node.setdefault(directory, {})
+        node[name] = digest
+
+    def node_hash(node: dict) -> str:
+        node_digest = hashlib.new(algorithm)
+        for name in sorted(node):
+            child = node[name]
+            if isinstance(child, dict):
+                node_digest.update(f"d\0{name}\0{node_hash(child)}\n".encode())
+            else:
+                node_digest.update(f"f\0{name}\0{child}\n".encode())
+        return node_digest.hexdigest()
+
+    return node_hash(tree)
+
+
+def fingerprint_directory(
+    path: str,
+    workers: int = 0,
+    cache=None,
+    algorithm: str = "sha256",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    mode: str = "read",
+) -> str:
+    """
+    Function calculate fingerprint of directory tree from contents of its files (see: file_digests and merkle_root).
+    Unlike stat_fingerprint, it doesn't depend on location and modification times of files.
+    :param path: Path to directory
+    :param workers: (optional) Number of hashing threads, 0 - all cores (default: 0)
+    :param cache: (optional) DigestCache object with per-file hashes (default: no cache)
+    :param algorithm: (optional) Hash algorithm name accepted by hashlib (default: sha256)
+    :param block_size: (optional) Size of hashed block in bytes, see: file_digest (default: 1 MiB)
+    :param mode: (optional) Hashing mode: 'read', 'readinto' or 'mmap', see: file_digest (default: read)
+    :return: String with fingerprint
+    """
+    if not os.path.isdir(path):
+        raise NotADirectoryError(f"Not a directory: {path}")
+    return merkle_root(file_digests(path, workers, cache, algorithm, block_size, mode), algorithm)
@@ -0,0 +1,172 @@
+import atexit
+from functools import partial
+import logging
+import threading
+from time import monotonic
+import weakref
+
+from .transport import operation_scope
+
+# reloads still pending at interpreter exit must not hang exit when TensorFlow Deploy doesn't respond
+EXIT_FLUSH_DEADLINE = 10.0
+
+_shared_schedulers = {}
+_shared_lock = threading.Lock()
+# all schedulers in process, their pending reloads are made at interpreter exit
+_schedulers = weakref.WeakSet()
+
+
+class ReloadScheduler:
+    def __init__(self, reload, quiet_window: float = 5.0, max_delay: float = None) -> None:
+        """
+        Scheduler which coalesces reload requests of one TensorFlow Deploy project. Requests are collected and merged
+        (full reload wins over short one) and one reload is made when there were no new requests for quiet_window
+        seconds, at latest max_delay seconds after first pending request, or on explicit flush. Result (and failure)
+        of reload made by timer is only logged, only flush returns it to caller.
+        :param reload: Function making reload, called with short_reload argument, returning action result
+        :param quiet_window: (optional) Seconds without new requests after which reload is made (default: 5)
+        :param max_delay: (optional) Maximum seconds between first pending request and reload (default: no limit)
+        """
+        self.reload = reload
+        self.quiet_window = quiet_window
+        self.max_delay = max_delay
+        self.loger = logging.getLogger("TFD")
+        self.lock = threading.Lock()
+        self.reload_lock = threading.Lock()
+        self.timer = None
+        # None - nothing to reload, True - short reload, False - full reload
+        self.pending = None
+        self.first_request = None
+        _schedulers.add(self)
+
+    def request(self, short_reload: bool = True) -> None:
+        """
+        Method add reload request and (re)start quiet window.
+        :param short_reload: True for simple reload, False for full reload
+        :return: None
+        """
+        with self.lock:
+            now = monotonic()
+            if self.pending is None:
+                self.pending = short_reload
+                self.first_request = now
+            else:
+                self.pending = self.pending and short_reload
+            delay = self.quiet_window
+            if self.max_delay is not None:
+                delay = max(0.0, min(delay, self.first_request + self.max_delay - now))
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(delay, self._fire)
+            # pending reload doesn't block interpreter exit, it is made by exit handler instead
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self) -> str:
+        """
+        Method make pending reload immediately.
+        :return: Action result
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            pending, self.pending, self.first_request = self.pending, None, None
+        if pending is None:
+            return "Nothing to reload"
+        with self.reload_lock:
+            return self.reload(pending)
+
+    def _fire(self) -> None:
+        """
+        Internal method. Make pending reload after quiet window, result is only logged, as there is no caller to
+        return it to.
+        """
+        try:
+            self.loger.info(f"scheduled reload: {self.flush()}")
+        except Exception as error:
+            self.loger.error(f"scheduled reload failed: {error}")
+
+
+class _SharedReload:
+    def __init__(self) -> None:
+        """
+        Internal class. Reload function of shared scheduler, which reloads with the most recently registered cursor
+        still in use. Cursors are referenced weakly, so shared scheduler doesn't keep them alive.
+        """
+        # (weak reference of cursor method, its leading arguments)
+        self.reloads = []
+
+    def register(self, reload) -> None:
+        args = ()
+        if isinstance(reload, partial):
+            reload, args = reload.func, reload.args
+        self.reloads = [item for item in self.reloads if item[0]() is not None] + [(weakref.WeakMethod(reload), args)]
+
+    def unregister(self, owner) -> None:
+        self.reloads = [item for item in self.reloads if item[0]() is not None and item[0]().__self__ is not owner]
+
+    def __len__(self) -> int:
+        return sum(1 for item in self.reloads if item[0]() is not None)
+
+    def __call__(self, short_reload: bool) -> str:
+        for ref, args in reversed(self.reloads):
+            reload = ref()
+            if reload is not None:
+                return reload(*args, short_reload)
+        return "Nothing to reload, all cursors are closed"
+
+
+def shared_scheduler(key: tuple, reload, quiet_window: float = 5.0, max_delay: float = None) -> ReloadScheduler:
+    """
+    Function return reload scheduler shared by all cursors in process with the same key (e.g. host, port, team and
+    project), creating it with given parameters if it doesn't exist yet. Existing scheduler is returned only if it has
+    the same parameters. Reload is made with the most recently registered cursor which wasn't released yet, see:
+    release_shared_scheduler.
+    :param key: Scheduler key
+    :param reload: Bound method of cursor making reload (or its partial), see: ReloadScheduler. Only weak reference of
+    cursor is kept.
+    :param quiet_window: (optional) Seconds without new requests after which reload is made (default: 5)
+    :param max_delay: (optional) Maximum seconds between first pending request and reload (default: no limit)
+    :return: ReloadScheduler object
+    """
+    with _shared_lock:
+        if key not in _shared_schedulers:
+            _shared_schedulers[key] = ReloadScheduler(_SharedReload(), quiet_window, max_delay)
+        scheduler = _shared_schedulers[key]
+        if (scheduler.quiet_window, scheduler.max_delay) != (quiet_window, max_delay):
+            raise ValueError(
+                f"Reload scheduler of {key} is shared with quiet_window={scheduler.quiet_window} and "
+                f"max_delay={scheduler.max_delay}, got: quiet_window={quiet_window} and max_delay={max_delay}"
+            )
+        scheduler.reload.register(reload)
+        return scheduler
+
+
+def release_shared_scheduler(key: tuple, owner) -> None:
+    """
+    Function unregister cursor from reload scheduler shared with given key, e.g. when cursor is closed. Scheduler is
+    removed when no cursor uses it.
+    :param key: Scheduler key
+    :param owner: Cursor which registered its reload method in shared_scheduler
+    :return: None
+    """
+    with _shared_lock:
+        scheduler = _shared_schedulers.get(key)
+        if scheduler is None:
+            return
+        scheduler.reload.unregister(owner)
+        if not scheduler.reload and scheduler.pending is None:
+            del _shared_schedulers[key]
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    """
+    Internal function. Make reloads still pending at interpreter exit, as timers of schedulers are daemon threads.
+    All of them have to finish within EXIT_FLUSH_DEADLINE seconds, failures are only logged.
+    """
+    with operation_scope(EXIT_FLUSH_DEADLINE):
+        for scheduler in list(_schedulers):
+            if scheduler.pending is not None:
+                scheduler._fire()
@@ -8,12 +8,24 @@ def main() -> None:
                                                  "tensorflow-deploy")
     parser.add_argument("src_path", type=str, help="Source path to file or dir to archive - this must be")
     parser.add_argument("dst_path", type=str, help="Destination path to write archive")
+    parser.add_argument("--hash_on_write", action="store_true", help="Calculate hash while archive is written (single "
+                                                                        "pass over data)")
+    parser.add_argument("--compression", type=str, choices=["gzip", "zstd"], default="", help="Compress archive with "
+                        "gzip or zstd (zstd requires zstandard package)")
+    parser.add_argument("--level", type=int, required=False, default=None, help="Compression level (default: 6 for "
+                        "gzip, 3 for zstd)")
+    parser.add_argument("--threads", type=int, required=False, default=0, help="Number of compressing threads "
+                        "(default: all cores)")
+    parser.add_argument("--reproducible", action="store_true", help="Create reproducible archive: sorted members with "
+                        "normalized modification times, owners and permissions")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode")
 
     args = parser.parse_args()
 
-    tfd_cursor = TFD(**args.__dict__)
-    print(tfd_cursor.create_archive(args.src_path, args.dst_path))
+    # creating archive doesn't need connection with TensorFlow Deploy
+    tfd_cursor = TFD(team="", project="", host="", check_connection=False, verbose=args.verbose)
+    print(tfd_cursor.create_archive(args.src_path, args.dst_path, args.hash_on_write, compression=args.compression,
+                                    level=args.level, threads=args.threads, reproducible=args.reproducible))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,25 @@
+import argparse
+from tensorflow_deploy_utils.TFD import TFD
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Script calculate fingerprint of TF model or module directory from "
+                                                 "contents of its files")
+    parser.add_argument("src_path", type=str, help="Path to model or module directory")
+    parser.add_argument("--workers", type=int, required=False, default=0, help="Number of hashing threads (default: "
+                        "all cores)")
+    parser.add_argument("--no_cache", action="store_true", help="Don't use cache of file hashes")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode")
+
+    args = parser.parse_args()
+
+    # fingerprint doesn't need connection with TensorFlow Deploy
+    tfd_cursor = TFD(team="", project="", host="", check_connection=False, verbose=args.verbose,
+                     digest_cache=not args.no_cache)
+    print(tfd_cursor.fingerprint(args.src_path, args.workers))
+
+
+if __name__ == "__main__":
+
+    main()
@@ -9,6 +9,12 @@ def main() -> None:
     parser.add_argument("--port", type=int, default=9500, help="TensorFlow Deploy instance port")
     parser.add_argument("--team", type=str, required=True, help="TEAM")
     parser.add_argument("--project", type=str, required=True, help="PROJECT")
+    parser.add_argument("--connect_timeout", type=float, required=False, default=10, help="Timeout of connecting "
+                        "to TensorFlow Deploy in seconds")
+    parser.add_argument("--read_timeout", type=float, required=False, default=120, help="Timeout of waiting for "
+                        "response data in seconds")
+    parser.add_argument("--deadline", type=float, required=False, default=None, help="Maximum time of whole "
+                        "operation in seconds, including retries")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode")
 
     args = parser.parse_args()
@@ -1,5 +1,6 @@
 import argparse
 from tensorflow_deploy_utils.TFD import TFD
+from tensorflow_deploy_utils.cache import DEFAULT_CACHE_DIR
 
 
 def main() -> None:
@@ -13,15 +14,46 @@ def main() -> None:
     parser.add_argument("--name", type=str, required=True, help="NAME")
     parser.add_argument("--version", type=int, required=False, default=0, help="Version for given model")
     parser.add_argument("--label", type=str, required=False, default="", help="Label for given model")
+    parser.add_argument("--expected_hash", type=str, required=False, default="", help="Expected SHA256 hash of "
+                                                                                        "archive")
+    parser.add_argument("--buffer_size", type=int, required=False, default=8 * 1024 * 1024, help="Download buffer "
+                                                                                                 "size in bytes")
+    parser.add_argument("--resume", action="store_true", help="Resume interrupted download (keeps partial file)")
+    parser.add_argument("--workers", type=int, required=False, default=1, help="Number of parallel range requests "
+                                                                               "(1 - single stream download)")
+    parser.add_argument("--chunk_size", type=int, required=False, default=64 * 1024 * 1024, help="Size of one range "
+                                                                                                 "in bytes for "
+                                                                                                 "parallel download")
+    parser.add_argument("--extract_to", type=str, required=False, default="", help="Extract model to this directory "
+                                                                                    "while downloading, instead of "
+                                                                                    "writing archive to dst_path")
+    parser.add_argument("--model_cache", action="store_true", help="Reuse archives from local model cache shared by "
+                                                                    "all processes on the node")
+    parser.add_argument("--model_cache_size", type=int, required=False, default=10 * 1024 * 1024 * 1024,
+                        help="Maximum size of model cache in bytes")
+    parser.add_argument("--model_cache_hardlink", action="store_true", help="Write archives from model cache as hard "
+                                                                             "links instead of copies")
+    parser.add_argument("--cache_dir", type=str, required=False, default=DEFAULT_CACHE_DIR, help="Directory for "
+                                                                                                 "cache files")
+    parser.add_argument("--connect_timeout", type=float, required=False, default=10, help="Timeout of connecting "
+                        "to TensorFlow Deploy in seconds")
+    parser.add_argument("--read_timeout", type=float, required=False, default=120, help="Timeout of waiting for "
+                        "response data in seconds")
+    parser.add_argument("--deadline", type=float, required=False, default=None, help="Maximum time of whole "
+                        "operation in seconds, including retries")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode")
 
     args = parser.parse_args()
 
-    tfd_cursor = TFD(**args.__dict__)
+    tfd_cursor = TFD(pool_maxsize=max(args.workers, 10), **args.__dict__)
     if args.version:
-        print(tfd_cursor.get_model(dst_path=args.dst_path, version=args.version))
+        print(tfd_cursor.get_model(dst_path=args.dst_path, version=args.version, buffer_size=args.buffer_size,
+                                   expected_hash=args.expected_hash, resume=args.resume, workers=args.workers,
+                                   chunk_size=args.chunk_size, extract_to=args.extract_to))
     if args.label:
-        print(tfd_cursor.get_model(dst_path=args.dst_path, label=args.label))
+        print(tfd_cursor.get_model(dst_path=args.dst_path, label=args.label, buffer_size=args.buffer_size,
+                                   expected_hash=args.expected_hash, resume=args.resume, workers=args.workers,
+                                   chunk_size=args.chunk_size, extract_to=args.extract_to))
 
 
 if __name__ == "__main__":
@@ -12,12 +12,19 @@ def main() -> None:
     parser.add_argument("--name", type=str, required=False, default="", help="NAME")
     parser.add_argument("--version", type=int, required=False, default=0, help="Model version")
     parser.add_argument("--label", type=str, required=False, default="", help="Model label")
+    parser.add_argument("--connect_timeout", type=float, required=False, default=10, help="Timeout of connecting "
+                        "to TensorFlow Deploy in seconds")
+    parser.add_argument("--read_timeout", type=float, required=False, default=120, help="Timeout of waiting for "
+                        "response data in seconds")
+    parser.add_argument("--deadline", type=float, required=False, default=None, help="Maximum time of whole "
+                        "operation in seconds, including retries")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode")
 
     args = parser.parse_args()
 
     tfd_cursor = TFD(team=args.team, project=args.project, name=args.name, host=args.host, port=args.port,
-                     verbose=args.verbose)
+                     verbose=args.verbose, connect_timeout=args.connect_timeout, read_timeout=args.read_timeout,
+                     deadline=args.deadline)
     result_df = tfd_cursor.list_models(team=args.team, project=args.project, name=args.name, version=args.version,
                                        label=args.label)
     print(result_df)
@@ -11,12 +11,20 @@ def main():
     parser.add_argument("--team", type=str, required=True, help="TEAM")
     parser.add_argument("--project", type=str, required=True, help="PROJECT")
     parser.add_argument("--reload_type", type=str, default=True, help="True/False: Skip hard reload (optional)")
+    parser.add_argument("--wait", action="store_true", help="Wait until model version is available on every TFS "
+                                                             "instance")
+    parser.add_argument("--name", type=str, required=False, default="", help="NAME of model to wait for")
+    parser.add_argument("--version", type=int, required=False, default=0, help="Model version to wait for")
+    parser.add_argument("--label", type=str, required=False, default="", help="Label of model version to wait for")
+    parser.add_argument("--wait_timeout", type=float, required=False, default=300,
+                        help="Maximum time of waiting in seconds")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode")
 
     args = parser.parse_args()
 
-    tfd_cursor = TFD(**args.__dict__, name="")
-    print(tfd_cursor.reload_config(args.reload_type))
+    tfd_cursor = TFD(**args.__dict__)
+    print(tfd_cursor.reload_config(args.reload_type, wait=args.wait, version=args.version,
+                                   wait_timeout=args.wait_timeout))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+import argparse
+from tensorflow_deploy_utils.TFD import TFD
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser(description="Script set labels for many models at once and reload every "
+                                                 "affected project only once")
+    parser.add_argument("--host", type=str, default="localhost.service", help="TensorFlow Deploy instance IP or address")
+    parser.add_argument("--port", type=int, default=9500, help="TensorFlow Deploy instance port")
+    parser.add_argument("--team", type=str, required=True, help="TEAM")
+    parser.add_argument("--project", type=str, required=True, help="PROJECT")
+    parser.add_argument("--assignment", type=str, nargs=3, action="append", default=[],
+                        metavar=("NAME", "VERSION", "LABEL"), help="Label for model version (can be repeated)")
+    parser.add_argument("--assignments_file", type=str, required=False, default="",
+                        help="File with one assignment per line: 'NAME VERSION LABEL' or 'PROJECT NAME VERSION LABEL'")
+    parser.add_argument("--workers", type=int, required=False, default=8, help="Number of concurrent requests")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode")
+
+    args = parser.parse_args()
+
+    assignments = list(args.assignment)
+    if args.assignments_file:
+        with open(args.assignments_file, "r") as fh:
+            assignments += [line.split() for line in fh if line.strip() and not line.startswith("#")]
+    if not assignments:
+        parser.error("at least one --assignment or --assignments_file is required")
+
+    tfd_cursor = TFD(**args.__dict__)
+    print(tfd_cursor.set_labels_bulk(assignments, workers=args.workers))
+
+
+if __name__ == "__main__":
+
+    main()
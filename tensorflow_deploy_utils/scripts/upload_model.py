@@ -15,11 +15,30 @@ def main() -> None:
     parser.add_argument("--name", type=str, required=True, help="NAME")
     parser.add_argument("--label", type=str, required=False, default="canary", help="LABEL")
     parser.add_argument("--timeout", type=int, required=False, default=120, help="Upload timeout in seconds")
+    parser.add_argument("--validation", type=str, choices=["fast", "deep"], default="fast",
+                        help="Validation level: 'fast' checks files and saved_model.pb, 'deep' loads model with TF")
+    parser.add_argument("--validation_cache", action="store_true", help="Skip validation of models already "
+                                                                        "validated on this machine")
+    parser.add_argument("--stream", action="store_true", help="Stream archive in request body, without temporary "
+                                                              "archive on disk")
+    parser.add_argument("--hash_pre_pass", action="store_true", help="In stream mode calculate archive hash before "
+                                                                     "upload")
+    parser.add_argument("--skip_existing", action="store_true", help="Don't upload model already uploaded with the "
+                        "same archive hash, just set label to its version")
+    parser.add_argument("--compression", type=str, choices=["gzip", "zstd"], default="", help="Compress archive "
+                        "created from directory, if TensorFlow Deploy accepts it")
+    parser.add_argument("--reproducible_archives", action="store_true", help="Create reproducible archive from "
+                        "directory, identical for the same files on every machine")
+    parser.add_argument("--delta", action="store_true", help="Upload only files which TensorFlow Deploy doesn't have "
+                        "yet for the model, if it supports delta uploads")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode")
     args = parser.parse_args()
 
     tfd_cursor = TFD(**args.__dict__)
-    print(tfd_cursor.upload_model(src_path=args.path, timeout=args.timeout, label=args.label))
+    print(tfd_cursor.upload_model(src_path=args.path, timeout=args.timeout, label=args.label,
+                                  stream=args.stream, hash_pre_pass=args.hash_pre_pass,
+                                  skip_existing=args.skip_existing, compression=args.compression,
+                                  delta=args.delta))
 
 
 if __name__ == "__main__":
@@ -15,11 +15,24 @@ def main() -> None:
     parser.add_argument("--name", type=str, required=True, help="NAME")
     parser.add_argument("--timeout", type=int, required=False, default=600, help="Upload timeout in seconds")
 
+    parser.add_argument("--validation", type=str, choices=["fast", "deep"], default="fast",
+                        help="Validation level: 'fast' checks files and saved_model.pb, 'deep' loads model with TF")
+    parser.add_argument("--validation_cache", action="store_true", help="Skip validation of models already "
+                                                                        "validated on this machine")
+    parser.add_argument("--stream", action="store_true", help="Stream archive in request body, without temporary "
+                                                              "archive on disk")
+    parser.add_argument("--hash_pre_pass", action="store_true", help="In stream mode calculate archive hash before "
+                                                                     "upload")
+    parser.add_argument("--compression", type=str, choices=["gzip", "zstd"], default="", help="Compress archive "
+                        "created from directory, if TensorFlow Deploy accepts it")
+    parser.add_argument("--reproducible_archives", action="store_true", help="Create reproducible archive from "
+                        "directory, identical for the same files on every machine")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose mode")
     args = parser.parse_args()
 
     tfd_cursor = TFD(**args.__dict__)
-    print(tfd_cursor.upload_module(args.path, args.timeout))
+    print(tfd_cursor.upload_module(args.path, args.timeout, stream=args.stream, hash_pre_pass=args.hash_pre_pass,
+                                   compression=args.compression))
 
 
 if __name__ == "__main__":
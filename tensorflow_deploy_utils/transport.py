@@ -0,0 +1,461 @@
+from contextlib import contextmanager
+import contextvars
+from functools import wraps
+import logging
+import random
+import requests
+import threading
+from time import monotonic, sleep
+from urllib.parse import urlsplit
+
+# PUT is idempotent only in isolation: replayed label change can undo concurrent change of the label, so PUT requests
+# are retried only when they are marked with retry_safe
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "DELETE"))
+PROBE_PATH = "/ping"
+
+_shared_breakers = {}
+_shared_lock = threading.Lock()
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 10.0,
+        jitter: bool = True,
+        retry_statuses: tuple = (502, 503, 504),
+        retry_post: bool = False,
+    ) -> None:
+        """
+        Policy of retrying requests to TensorFlow Deploy after connection errors, timeouts and given status codes
+        (e.g. during rolling restart of TensorFlow Deploy). Delay before n-th retry is backoff_base * 2^n seconds,
+        limited by backoff_cap, and with jitter it is random number between 0 and this value.
+        :param attempts: (optional) Maximum number of attempts of one request, 1 means no retries (default: 3)
+        :param backoff_base: (optional) Delay before first retry in seconds (default: 0.5)
+        :param backoff_cap: (optional) Maximum delay between attempts in seconds (default: 10)
+        :param jitter: (optional) Randomize delays, so many clients don't retry at the same time? (default: True)
+        :param retry_statuses: (optional) Response status codes which are retried (default: 502, 503, 504)
+        :param retry_post: (optional) Retry also POST requests, e.g. reload_config and uploads, which are not
+        idempotent in general (default: False)
+        Note: PUT requests (e.g. revert_model) are retried only where replaying them is harmless, see: retry_safe.
+        """
+        self.attempts = attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_post = retry_post
+
+    def delay(self, retry: int) -> float:
+        """
+        Method return delay in seconds before given retry (counted from 0).
+        :param retry: Number of retry
+        :return: Delay in seconds
+        """
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** retry)
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def can_retry(self, request: requests.PreparedRequest, safe: bool = False) -> bool:
+        """
+        Method check if given request may be sent again: its method is idempotent (or it is POST and retry_post is
+        set, or request was marked as safe to retry) and its body isn't a stream, which can be read only once.
+        :param request: Sent request
+        :param safe: (optional) Request is safe to retry regardless of method, see: retry_safe (default: False)
+        :return: True if request can be retried
+        """
+        if not self.can_retry_method(request.method, safe):
+            return False
+        return request.body is None or isinstance(request.body, (bytes, str))
+
+    def can_retry_method(self, method: str, safe: bool = False) -> bool:
+        """
+        Method check if requests with given method may be sent again, see: can_retry.
+        :param method: HTTP method
+        :param safe: (optional) Request is safe to retry regardless of method, see: retry_safe (default: False)
+        :return: True if request can be retried
+        """
+        return safe or method in IDEMPOTENT_METHODS or (method == "POST" and self.retry_post)
+
+    def __repr__(self):
+        return (
+            f"RetryPolicy(attempts={self.attempts}, backoff_base={self.backoff_base}, "
+            f"backoff_cap={self.backoff_cap}, jitter={self.jitter}, retry_statuses={sorted(self.retry_statuses)}, "
+            f"retry_post={self.retry_post})"
+        )
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """
+    Deadline of cursor operation passed before request could be sent or response was read.
+    """
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Request wasn't sent, because circuit breaker of TensorFlow Deploy host is open.
+    """
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        failure_statuses: tuple = (502, 503, 504),
+    ) -> None:
+        """
+        Circuit breaker of one TensorFlow Deploy host. It opens after failure_threshold consecutive failed requests
+        (connection errors, timeouts or failure_statuses) and then requests fail fast with CircuitOpenError. After
+        reset_timeout seconds it is half-open: one probe request is let through, its success closes the breaker and
+        its failure opens it again.
+        :param failure_threshold: (optional) Number of consecutive failures opening breaker (default: 5)
+        :param reset_timeout: (optional) Seconds after which open breaker lets probe through (default: 30)
+        :param failure_statuses: (optional) Response status codes counted as failures (default: 502, 503, 504)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_statuses = frozenset(failure_statuses)
+        self.loger = logging.getLogger("TFD")
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def allow(self, probe: bool) -> str:
+        """
+        Method check if request can be sent. Open breaker becomes half-open after reset timeout, then only one probe
+        request at a time is let through.
+        :param probe: Request is probe of host health
+        :return: State of breaker; HALF_OPEN means that other request must be preceded by successful probe
+        """
+        with self.lock:
+            if self.state == self.OPEN:
+                if monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"circuit breaker open after {self.failures} consecutive failures")
+                self.state = self.HALF_OPEN
+                self.probing = False
+            if self.state == self.HALF_OPEN and probe:
+                if self.probing:
+                    raise CircuitOpenError("circuit breaker half-open, probe in progress")
+                self.probing = True
+            return self.state
+
+    def record_success(self) -> None:
+        with self.lock:
+            if self.state != self.CLOSED:
+                self.loger.info("circuit breaker closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.loger.warning(f"circuit breaker opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = monotonic()
+                self.probing = False
+
+
+def shared_breaker(key: tuple, failure_threshold: int = 5, reset_timeout: float = 30.0) -> CircuitBreaker:
+    """
+    Function return circuit breaker shared by all cursors in process with the same key (host and port), creating it
+    with given parameters if it doesn't exist yet. Existing breaker is returned only if it has the same parameters.
+    :param key: Breaker key
+    :param failure_threshold: (optional) Number of consecutive failures opening breaker (default: 5)
+    :param reset_timeout: (optional) Seconds after which open breaker lets probe through (default: 30)
+    :return: CircuitBreaker object
+    """
+    with _shared_lock:
+        if key not in _shared_breakers:
+            _shared_breakers[key] = CircuitBreaker(failure_threshold, reset_timeout)
+        breaker = _shared_breakers[key]
+        if (breaker.failure_threshold, breaker.reset_timeout) != (failure_threshold, reset_timeout):
+            raise ValueError(
+                f"Circuit breaker of {key} is shared with failure_threshold={breaker.failure_threshold} and "
+                f"reset_timeout={breaker.reset_timeout}, got: failure_threshold={failure_threshold} and "
+                f"reset_timeout={reset_timeout}"
+            )
+        return breaker
+
+
+class Operation:
+    def __init__(
+        self,
+        parent: "Operation" = None,
+        deadline: float = None,
+        connect_timeout: float = None,
+        read_timeout: float = None,
+    ) -> None:
+        """
+        State of one cursor operation (public method call) shared by all requests made by it. Operations nested in
+        other operations, e.g. upload_model and reload_config called by deploy_model, get remaining deadline of
+        parent operation (own deadline can only shorten it), inherit its timeouts and add their retries to it.
+        :param parent: (optional) Operation in which this operation is nested
+        :param deadline: (optional) Maximum time of operation in seconds (default: deadline of parent)
+        :param connect_timeout: (optional) Connect timeout of requests in seconds (default: timeout of parent)
+        :param read_timeout: (optional) Read timeout of requests in seconds (default: timeout of parent)
+        """
+        self.parent = parent
+        self.retries = 0
+        self.deadline = parent.deadline if parent else None
+        if deadline is not None:
+            until = monotonic() + deadline
+            self.deadline = until if self.deadline is None else min(self.deadline, until)
+        if parent:
+            connect_timeout = parent.connect_timeout if connect_timeout is None else connect_timeout
+            read_timeout = parent.read_timeout if read_timeout is None else read_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    def add_retry(self) -> None:
+        operation = self
+        while operation is not None:
+            operation.retries += 1
+            operation = operation.parent
+
+    def remaining(self) -> float:
+        """
+        Method return time in seconds left to deadline of operation.
+        :return: Seconds left (negative after deadline), None if operation has no deadline
+        """
+        if self.deadline is None:
+            return None
+        return self.deadline - monotonic()
+
+    def timeout(self, timeout, default: tuple) -> tuple:
+        """
+        Method return (connect, read) timeout of request limited by time left to deadline.
+        :param timeout: Timeout given to request: None, number or (connect, read) tuple
+        :param default: Default (connect, read) timeout of session
+        :return: (connect, read) timeout
+        """
+        if timeout is None:
+            connect, read = default
+            connect = connect if self.connect_timeout is None else self.connect_timeout
+            read = read if self.read_timeout is None else self.read_timeout
+        elif isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        remaining = self.remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                raise DeadlineExceeded("operation deadline exceeded")
+            connect = remaining if connect is None else min(connect, remaining)
+            read = remaining if read is None else min(read, remaining)
+        return connect, read
+
+
+_operation = contextvars.ContextVar("tfd_operation", default=None)
+_retry_safe = contextvars.ContextVar("tfd_retry_safe", default=False)
+_no_retry = contextvars.ContextVar("tfd_no_retry", default=False)
+
+
+@contextmanager
+def operation_scope(deadline: float = None, connect_timeout: float = None, read_timeout: float = None):
+    """
+    Context manager which starts new operation, nested in current one if there is any.
+    :param deadline: (optional) Maximum time of operation in seconds (default: deadline of current operation)
+    :param connect_timeout: (optional) Connect timeout of requests in seconds (default: current one)
+    :param read_timeout: (optional) Read timeout of requests in seconds (default: current one)
+    :return: Operation object
+    """
+    operation = Operation(_operation.get(), deadline, connect_timeout, read_timeout)
+    token = _operation.set(operation)
+    try:
+        yield operation
+    finally:
+        _operation.reset(token)
+
+
+def current_operation() -> Operation:
+    return _operation.get()
+
+
+def remaining_time(default: float = None) -> float:
+    """
+    Function return time in seconds left to deadline of current operation, but no more than given default.
+    :param default: (optional) Time used when there is no deadline (default: None)
+    :return: Seconds left
+    """
+    operation = _operation.get()
+    remaining = operation.remaining() if operation is not None else None
+    if remaining is None:
+        return default
+    return remaining if default is None else min(default, remaining)
+
+
+def check_deadline() -> None:
+    """
+    Function raise DeadlineExceeded if deadline of current operation passed, e.g. during reading response body.
+    :return: None
+    """
+    operation = _operation.get()
+    if operation is not None and operation.deadline is not None and operation.remaining() <= 0:
+        raise DeadlineExceeded("operation deadline exceeded")
+
+
+@contextmanager
+def retry_safe():
+    """
+    Context manager marking requests sent inside it as safe to retry, although their method isn't idempotent, e.g.
+    POST of reload, which has the same effect when repeated, or PUT of label which isn't changed concurrently.
+    """
+    token = _retry_safe.set(True)
+    try:
+        yield
+    finally:
+        _retry_safe.reset(token)
+
+
+@contextmanager
+def no_retry():
+    """
+    Context manager disabling retries of requests sent inside it, e.g. when method retries them itself, so requests
+    aren't sent attempts^2 times.
+    """
+    token = _no_retry.set(True)
+    try:
+        yield
+    finally:
+        _no_retry.reset(token)
+
+
+def retry_allowed(policy: RetryPolicy, method: str) -> bool:
+    """
+    Function check if request with given method, sent in current context, may be retried by given policy, see:
+    retry_safe and no_retry. It is used by clients which don't send requests with TFDAdapter, e.g. AsyncTFD.
+    :param policy: Retry policy
+    :param method: HTTP method
+    :return: True if request can be retried
+    """
+    return not _no_retry.get() and policy.can_retry_method(method, _retry_safe.get())
+
+
+def operation(method):
+    """
+    Decorator of cursor methods, which runs method in operation scope with cursor deadline and saves number of
+    retries made by it in `last_retries` attribute of cursor.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with operation_scope(self.deadline) as scope:
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.last_retries = scope.retries
+
+    return wrapper
+
+
+class TFDAdapter(requests.adapters.HTTPAdapter):
+    def __init__(
+        self,
+        retry_policy: RetryPolicy = None,
+        timeout: tuple = (None, None),
+        breaker: CircuitBreaker = None,
+        probe=None,
+        **kwargs,
+    ) -> None:
+        """
+        HTTP adapter (connection pool) of TFD cursor session, which retries requests according to retry policy,
+        limits their timeouts by deadline of current operation and guards host with circuit breaker. Number of
+        retries is saved in `retries` attribute of response and added to current operation.
+        :param retry_policy: (optional) Retry policy (default: no retries)
+        :param timeout: (optional) Default (connect, read) timeout of requests in seconds (default: no timeout)
+        :param breaker: (optional) Circuit breaker of host (default: no breaker)
+        :param probe: (optional) Function checking host health (e.g. cursor _check_connection), called before
+        request when breaker is half-open; it should raise exception on failure (default: request itself is probe)
+        :param kwargs: Arguments of requests.adapters.HTTPAdapter (pool params)
+        """
+        self.retry_policy = retry_policy or RetryPolicy(attempts=1)
+        self.timeout = timeout
+        self.breaker = breaker
+        self.probe = probe
+        self.loger = logging.getLogger("TFD")
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        operation = current_operation() or Operation()
+        retry = 0
+        while True:
+            try:
+                self._check_breaker(request)
+                response = super().send(request, timeout=operation.timeout(timeout, self.timeout), **kwargs)
+            except (DeadlineExceeded, CircuitOpenError):
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                if not self._before_retry(request, retry, str(error)):
+                    raise
+            except requests.exceptions.RequestException:
+                if self.breaker is not None:
+                    self.breaker.record_failure()
+                raise
+            else:
+                if self.breaker is not None:
+                    if response.status_code in self.breaker.failure_statuses:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                if response.status_code not in self.retry_policy.retry_statuses or not self._before_retry(
+                    request, retry, f"status code {response.status_code}"
+                ):
+                    response.retries = retry
+                    return response
+                response.close()
+            retry += 1
+
+    def _check_breaker(self, request) -> None:
+        """
+        Internal method. Check circuit breaker before sending request: fail fast when it is open and probe host when
+        it is half-open.
+        :param request: Request to send
+        :return: None
+        """
+        if self.breaker is None:
+            return
+        probe = self.probe is None or urlsplit(request.url).path == PROBE_PATH
+        if self.breaker.allow(probe) != CircuitBreaker.HALF_OPEN or probe:
+            return
+        try:
+            self.probe()
+        except Exception as error:
+            raise CircuitOpenError(f"circuit breaker half-open, probe failed: {error}")
+        if self.breaker.allow(probe) != CircuitBreaker.CLOSED:
+            raise CircuitOpenError("circuit breaker half-open, probe failed")
+
+    def _before_retry(self, request, retry: int, reason: str) -> bool:
+        """
+        Internal method. Check if request can be retried and wait before retry.
+        :param request: Sent request
+        :param retry: Number of retries made so far
+        :param reason: Reason of retry, for logs
+        :return: True if request should be retried
+        """
+        if _no_retry.get() or retry + 1 >= self.retry_policy.attempts:
+            return False
+        if not self.retry_policy.can_retry(request, _retry_safe.get()):
+            return False
+        delay = self.retry_policy.delay(retry)
+        remaining = remaining_time()
+        if remaining is not None and remaining <= delay:
+            # there would be no time left for the retry
+            return False
+        self.loger.debug(f"{request.method} {request.url} failed ({reason}), retry #{retry + 1} in {delay:.2f}s")
+        operation = current_operation()
+        if operation is not None:
+            operation.add_retry()
+        sleep(delay)
+        return True
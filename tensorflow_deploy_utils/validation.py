@@ -0,0 +1,181 @@
+import os
+import re
+
+from .archive import member_name, open_tar_stream
+
+SAVED_MODEL_FILENAMES = ("saved_model.pb", "saved_model.pbtxt")
+VARIABLES_INDEX = "variables/variables.index"
+VARIABLES_SHARD = re.compile(r"variables/variables\.data-(\d+)-of-(\d+)")
+
+
+_saved_model_class = None
+
+
+def _saved_model_message():
+    """
+    Internal function. Return protobuf message class of SavedModel, which describes only fields used in validation
+    (meta graphs, their signatures and signature outputs), other fields are skipped while parsing. It depends only on
+    protobuf package, so fast validation doesn't load TensorFlow. Messages are defined in private descriptor pool, so
+    they don't conflict with SavedModel of TensorFlow.
+    """
+    global _saved_model_class
+    if _saved_model_class is not None:
+        return _saved_model_class
+
+    from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+    field_proto = descriptor_pb2.FieldDescriptorProto
+    file_proto = descriptor_pb2.FileDescriptorProto(name="tfd_saved_model.proto", package="tfd", syntax="proto3")
+
+    def add_message(container, name: str, fields: list, map_entry: bool = False):
+        """
+        Add message with fields given as (number, name, message type name or empty string for string) tuples.
+        """
+        message_proto = container.add(name=name)
+        message_proto.options.map_entry = map_entry
+        for number, field_name, type_name in fields:
+            field = message_proto.field.add(
+                name=field_name,
+                number=number,
+                label=field_proto.LABEL_OPTIONAL if map_entry else field_proto.LABEL_REPEATED,
+                type=field_proto.TYPE_MESSAGE if type_name else field_proto.TYPE_STRING,
+            )
+            if type_name:
+                field.type_name = type_name
+        return message_proto
+
+    # field numbers are the same as in tensorflow/core/protobuf/{saved_model,meta_graph}.proto
+    add_message(file_proto.message_type, "TensorInfo", [])
+    signature_def = add_message(
+        file_proto.message_type, "SignatureDef", [(2, "outputs", ".tfd.SignatureDef.OutputsEntry")]
+    )
+    add_message(signature_def.nested_type, "OutputsEntry", [(1, "key", ""), (2, "value", ".tfd.TensorInfo")], True)
+    meta_graph_def = add_message(
+        file_proto.message_type, "MetaGraphDef", [(5, "signature_def", ".tfd.MetaGraphDef.SignatureDefEntry")]
+    )
+    add_message(
+        meta_graph_def.nested_type, "SignatureDefEntry", [(1, "key", ""), (2, "value", ".tfd.SignatureDef")], True
+    )
+    add_message(file_proto.message_type, "SavedModel", [(2, "meta_graphs", ".tfd.MetaGraphDef")])
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    descriptor = pool.FindMessageTypeByName("tfd.SavedModel")
+    if hasattr(message_factory, "GetMessageClass"):
+        _saved_model_class = message_factory.GetMessageClass(descriptor)
+    else:  # protobuf < 4.21
+        _saved_model_class = message_factory.MessageFactory(pool).GetPrototype(descriptor)
+    return _saved_model_class
+
+
+def check_saved_model_proto(data: bytes, text_format: bool = False) -> list:
+    """
+    Function parse content of saved_model.pb (or saved_model.pbtxt) file as SavedModel protobuf and check its meta
+    graphs and signature definitions. Graph is not loaded into TensorFlow and no variables are restored.
+    :param data: Content of saved_model.pb/saved_model.pbtxt file
+    :param text_format: Is content in protobuf text format (saved_model.pbtxt)?
+    :return: List with names of signatures defined in SavedModel
+    """
+    from google.protobuf import message, text_format as pb_text_format
+
+    saved_model = _saved_model_message()()
+    try:
+        if text_format:
+            pb_text_format.Parse(data.decode(), saved_model, allow_unknown_field=True)
+        else:
+            saved_model.ParseFromString(data)
+    except (message.DecodeError, pb_text_format.ParseError, UnicodeDecodeError) as error:
+        raise ValueError(f"Invalid SavedModel protobuf! Error: {error}")
+
+    if not saved_model.meta_graphs:
+        raise ValueError("SavedModel without meta graphs!")
+
+    signatures = []
+    for meta_graph in saved_model.meta_graphs:
+        for signature_name, signature_def in meta_graph.signature_def.items():
+            if not signature_def.outputs:
+                raise ValueError(f"Signature '{signature_name}' without outputs!")
+            signatures.append(signature_name)
+
+    return signatures
+
+
+def check_variables(names: list) -> None:
+    """
+    Function check that variables of SavedModel are complete, i.e. if there are any variables, the index file and all
+    data shards `variables.data-XXXXX-of-NNNNN` exist and have the same number of shards.
+    :param names: Paths of all model files relative to model directory, e.g. `variables/variables.index`
+    :return: None
+    """
+    shards = [VARIABLES_SHARD.fullmatch(name) for name in names]
+    shards = [(int(shard.group(1)), int(shard.group(2))) for shard in shards if shard]
+    has_index = VARIABLES_INDEX in names
+
+    if not shards and not has_index:
+        return
+    if not has_index:
+        raise ValueError(f"Missing {VARIABLES_INDEX} file!")
+    if not shards:
+        raise ValueError("Missing variables data shards!")
+
+    shards_number = {total for _, total in shards}
+    if len(shards_number) != 1:
+        raise ValueError(f"Inconsistent number of variables data shards: {sorted(shards_number)}")
+    missing = set(range(shards_number.pop())) - {shard for shard, _ in shards}
+    if missing:
+        raise ValueError(f"Missing variables data shards: {sorted(missing)}")
+
+
+def validate_saved_model_dir(path: str) -> list:
+    """
+    Function make fast validation of SavedModel directory: parse saved_model.pb and check variables files.
+    :param path: Full path to your TF model or module
+    :return: List with names of signatures defined in SavedModel
+    """
+    for filename in SAVED_MODEL_FILENAMES:
+        saved_model_path = os.path.join(path, filename)
+        if os.path.isfile(saved_model_path):
+            break
+    else:
+        raise ValueError(f"SavedModel file does not exist at: {path}")
+
+    with open(saved_model_path, "rb") as fh:
+        signatures = check_saved_model_proto(
+            fh.read(), text_format=filename.endswith(".pbtxt")
+        )
+
+    variables_path = os.path.join(path, "variables")
+    if os.path.isdir(variables_path):
+        check_variables([f"variables/{name}" for name in os.listdir(variables_path)])
+
+    return signatures
+
+
+def validate_saved_model_archive(path: str) -> list:
+    """
+    Function make fast validation of tar archive with SavedModel without extracting it. Archive members are iterated
+    once and only saved_model.pb is read into memory.
+    :param path: Full path to your TF model or module archive
+    :return: List with names of signatures defined in SavedModel
+    """
+    names = []
+    saved_model = None
+    with open_tar_stream(path) as archive:
+        for member in archive:
+            name = member_name(member)
+            if not name:
+                continue
+            names.append(name)
+            if name in SAVED_MODEL_FILENAMES and member.isfile() and saved_model is None:
+                saved_model = (name, archive.extractfile(member).read())
+
+    if "README.md" not in names:
+        raise ValueError("Archive without README.md file!")
+    if saved_model is None:
+        raise ValueError(f"SavedModel file does not exist in archive: {path}")
+    signatures = check_saved_model_proto(
+        saved_model[1], text_format=saved_model[0].endswith(".pbtxt")
+    )
+    check_variables(names)
+
+    return signatures
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import unittest
+import unittest.mock as mock
+from pathlib import Path
+
+from tensorflow_deploy_utils import AsyncTFD
+from test import test_TFD
+
+# Disable TFD logger messages
+logging.disable(logging.CRITICAL)
+
+
+class TestAsyncTFD(unittest.TestCase):
+
+    # variables
+    team = "test_team"
+    project = "test_project"
+    name = "test_name"
+    label = "test_label"
+    version = 1
+
+    def _cursor(self, port: int) -> AsyncTFD:
+        return AsyncTFD(
+            team=self.team,
+            project=self.project,
+            host="127.0.0.1",
+            name=self.name,
+            label=self.label,
+            port=port,
+            check_connection=False,
+        )
+
+    def test_status_calls_concurrent(self):
+        """
+        Scenario tests that many get_config calls run concurrently on one cursor and one connection pool.
+        """
+
+        async def run(port):
+            async with self._cursor(port) as tfd_cursor:
+                return await asyncio.gather(*(tfd_cursor.get_config() for _ in range(200)))
+
+        with test_TFD.StandInServer(b"test config") as server:
+            responses = asyncio.run(run(server.port))
+
+        self.assertEqual(responses, ["test config"] * 200)
+        self.assertEqual(len(server.requests), 200)
+
+    def test_set_label(self):
+        """
+        Scenario tests set_label coroutine, which should set label and reload configuration.
+        """
+
+        async def run(port):
+            async with self._cursor(port) as tfd_cursor:
+                return await tfd_cursor.set_label(self.version)
+
+        with test_TFD.StandInServer() as server:
+            response = asyncio.run(run(server.port))
+
+        self.assertEqual(response, "set_label success: ok, reload: reload_config success!")
+        self.assertEqual(
+            [(request["method"], request["path"]) for request in server.requests],
+            [
+                (
+                    "PUT",
+                    "/v1/models/{t}/{p}/names/{n}/versions/{v}/labels/{l}".format(
+                        t=self.team, p=self.project, n=self.name, v=self.version, l=self.label
+                    ),
+                ),
+                ("POST", "/v1/models/{t}/{p}/reload?SkipShortConfig=False".format(t=self.team, p=self.project)),
+            ],
+        )
+
+    def test_set_labels_bulk(self):
+        """
+        Scenario tests set_labels_bulk coroutine, which should set all labels and reload affected project once.
+        """
+
+        async def run(port):
+            async with self._cursor(port) as tfd_cursor:
+                return await tfd_cursor.set_labels_bulk([("model_{i}".format(i=i), i, "stable") for i in range(1, 41)])
+
+        with test_TFD.StandInServer() as server:
+            response = asyncio.run(run(server.port))
+
+        lines = response.split("\n")
+        self.assertEqual(len(lines), 42)
+        self.assertEqual(lines[-1], "reload {p}: reload_config success!".format(p=self.project))
+        self.assertEqual([request["method"] for request in server.requests].count("POST"), 1)
+        self.assertEqual(len(server.requests), 41)
+
+    def test_get_model(self):
+        """
+        Scenario tests get_model coroutine, which should stream archive to destination directory and verify its hash.
+        """
+
+        content = os.urandom(1000000)
+
+        async def run(port, dst_path):
+            async with self._cursor(port) as tfd_cursor:
+                return (
+                    await tfd_cursor.get_model(
+                        dst_path, self.version, buffer_size=4096, expected_hash=hashlib.sha256(content).hexdigest()
+                    ),
+                    await tfd_cursor.get_module(dst_path, self.version, expected_hash="0" * 64),
+                )
+
+        with tempfile.TemporaryDirectory() as tmp_dir, test_TFD.StandInServer(content) as server:
+            response, response_err = asyncio.run(run(server.port, tmp_dir))
+
+            self.assertTrue(response.startswith("Model successfully written to"), msg=response)
+            self.assertEqual(Path(response.split(" to ")[1]).read_bytes(), content)
+            self.assertRegex(response_err, "^Download error: hash mismatch")
+            self.assertEqual(len(os.listdir(tmp_dir)), 1)
+
+    def test_upload_model(self):
+        """
+        Scenario tests upload_model coroutine with model directory, which should be validated and streamed in
+        multipart body with archive and its hash.
+        """
+
+        async def run(port, src_path):
+            async with self._cursor(port) as tfd_cursor:
+                return await tfd_cursor.upload_model(src_path)
+
+        with tempfile.TemporaryDirectory() as tmp_dir, test_TFD.StandInServer() as server:
+            model = test_TFD.TestTFD._create_test_model(str(Path(tmp_dir, "model")))
+            with mock.patch(
+                "tensorflow_deploy_utils.TFD.validate_saved_model_dir", return_value=["serving_default"]
+            ):
+                response = asyncio.run(run(server.port, model))
+
+        self.assertEqual(response, "Upload success!")
+        request = server.requests[0]
+        self.assertEqual(request["Transfer-Encoding"], "chunked")
+        fields = dict(test_TFD.TestTFD._parse_multipart(request["body"]))
+        self.assertEqual(fields["archive_hash"].decode(), hashlib.sha256(fields["archive_data"]).hexdigest())
+
+
+    @mock.patch("asyncio.sleep", new_callable=mock.AsyncMock)
+    def test_request_retry(self, sleep_mock):
+        """
+        Scenario tests that idempotent requests are retried according to retry policy of cursor, like in TFD cursor.
+        """
+
+        async def run(port):
+            async with self._cursor(port) as tfd_cursor:
+                return await tfd_cursor.get_config()
+
+        with test_TFD.StandInServer(b"test config") as server:
+            server.fail_statuses = [502, 503]
+            response = asyncio.run(run(server.port))
+
+        self.assertEqual(response, "test config")
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(sleep_mock.call_count, 2)
+
+    @mock.patch("asyncio.sleep", new_callable=mock.AsyncMock)
+    @mock.patch("builtins.input", return_value="y")
+    def test_set_stable_connection_err(self, input_mock, sleep_mock):
+        """
+        Scenario tests set_stable coroutine when TensorFlow Deploy is not available. Connection errors should be
+        reported as errors of attempts, without retries of requests inside attempts.
+        """
+
+        import socket
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        async def run():
+            async with self._cursor(port) as tfd_cursor:
+                return await tfd_cursor.set_stable(self.version, attempts=3)
+
+        response = asyncio.run(run())
+
+        self.assertTrue(response.startswith("set_stable error! Errors from all attempts: "), response)
+        self.assertEqual(
+            [i for i in range(4) if "#{i} error: ".format(i=i) in response], [0, 1, 2], msg=response
+        )
+        self.assertEqual(sleep_mock.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,17 +2,33 @@
 # -*- coding: utf-8 -*-
 
 import hashlib
+import http.server
 import json
 import logging
+import os
+import subprocess
+import sys
 import tarfile
+import tempfile
+import threading
 import time
 import unittest
 import unittest.mock as mock
+from pathlib import Path
 
 import pandas as pd
+import requests
 import requests_mock
 
-from tensorflow_deploy_utils import TFD
+from tensorflow_deploy_utils import CircuitOpenError, RetryPolicy, TFD
+from tensorflow_deploy_utils.transport import DeadlineExceeded, remaining_time
+
+try:
+    import zstandard  # noqa: F401
+
+    COMPRESSIONS = ("gzip", "zstd")
+except ImportError:
+    COMPRESSIONS = ("gzip",)
 
 # Disable TFD logger messages
 logging.disable(logging.CRITICAL)
@@ -32,9 +48,126 @@ endpoint = {
     "set_status": "http://{host}:{port}/v1/models/{team}/{project}/names/{name}/versions/{version}/labels/stable",
     "set_label": "http://{host}:{port}/v1/models/{team}/{project}/names/{name}/versions/{version}/labels/{label}",
     "revert_model": "http://{host}:{port}/v1/models/{team}/{project}/names/{name}/revert",
+    "reload_status": "http://{host}:{port}/v1/models/{team}/{project}/names/{name}/status",
 }
 
 
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Request handler of local stand-in for TensorFlow Deploy, which serves server.content for every GET request
+    and server.reply for other ones.
+    It honours Range requests only if server.ranges is True, answers 304 for matching If-None-Match and interrupts response body after number of bytes
+    taken from server.fail_after list (one value per request). Requests are answered with error status codes taken
+    from server.fail_statuses list first (one value per request) and GET requests are answered after server.delay
+    seconds.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def _fail_status(self):
+        """
+        Answers request with next status code from server.fail_statuses, if there is any.
+        """
+        if not self.server.fail_statuses:
+            return False
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(self.server.fail_statuses.pop(0))
+        self.send_header("Content-Length", "7")
+        self.end_headers()
+        self.wfile.write(b"failure")
+        return True
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if self._fail_status():
+            return
+        time.sleep(server.delay)
+        content = server.content
+        if self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.send_header("ETag", server.etag)
+            self.end_headers()
+            return
+        start = 0
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        end = len(content) - 1
+        if server.ranges and range_header and if_range in (None, server.etag):
+            start, end = range_header[len("bytes=") :].split("-")
+            start, end = int(start), min(int(end or len(content) - 1), len(content) - 1)
+            self.send_response(206)
+            self.send_header(
+                "Content-Range",
+                "bytes {s}-{e}/{t}".format(s=start, e=end, t=len(content)),
+            )
+        else:
+            self.send_response(200)
+        body = content[start : end + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", server.etag)
+        self.end_headers()
+        if server.fail_after:
+            body = body[: server.fail_after.pop(0)]
+            self.close_connection = True
+        self.wfile.write(body)
+
+    def _reply(self):
+        """
+        Records method, path and body (plain or chunked) of request and answers with server.reply text.
+        """
+        if self._fail_status():
+            self.server.requests.append(dict(self.headers, method=self.command, path=self.path))
+            return
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if not size:
+                    self.rfile.readline()
+                    break
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        else:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests.append(dict(self.headers, method=self.command, path=self.path, body=body))
+        reply = self.server.reply.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    do_POST = do_PUT = do_DELETE = _reply
+
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    """
+    Local HTTP server running in background thread, used as stand-in for TensorFlow Deploy in tests.
+    """
+
+    def __init__(self, content: bytes = b"", ranges: bool = True, fail_after: list = None):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.daemon_threads = True
+        self.content = content
+        self.reply = "ok"
+        self.ranges = ranges
+        self.fail_after = fail_after or []
+        self.fail_statuses = []
+        self.delay = 0
+        self.etag = '"{h}"'.format(h=hashlib.sha256(content).hexdigest()[:16])
+        self.requests = []
+        self.port = self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+
 class TestTFD(unittest.TestCase):
 
     # variables
@@ -66,6 +199,7 @@ class TestTFD(unittest.TestCase):
             name=self.name,
             label=self.label,
             check_connection=self.check_connection,
+            validation="deep",
         )
 
     def test_str(self):
@@ -604,7 +738,9 @@ class TestTFD(unittest.TestCase):
         Should return success message.
         """
 
-        path = "/dir/to/test/"
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = tmp_dir.name + "/"
         r_path = path + "model_{t}.tar".format(t=int(time.time()))
 
         version_url = endpoint["model_v"].format(
@@ -622,14 +758,17 @@ class TestTFD(unittest.TestCase):
             status_code=200,
         )
         expected = "Model successfully written to {p}".format(p=r_path)
-        with mock.patch("pathlib.Path.write_bytes", return_value="response.content"):
-            with mock.patch("pathlib.Path.is_dir", return_value=True):
-                response = self.tfd_cursor.get_model(path, self.version, self.label)
+        response = self.tfd_cursor.get_model(path, self.version, self.label)
         self.assertEqual(
             response,
             expected,
             msg="Expected: '{}', got '{}'".format(expected, response),
         )
+        self.assertEqual(
+            Path(r_path).read_text(),
+            "{w} successfully written to {p}".format(w="Model", p=path),
+        )
+        self.assertEqual(sorted(Path(path).iterdir()), [Path(r_path)])
 
     @requests_mock.mock()
     def test_get_model_label(self, requests_mock):
@@ -638,7 +777,9 @@ class TestTFD(unittest.TestCase):
         Should return success message.
         """
 
-        path = "/dir/to/test/"
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = tmp_dir.name + "/"
         r_path = path + "model_{t}.tar".format(t=int(time.time()))
         url = endpoint["label"].format(
             host=self.host,
@@ -655,14 +796,17 @@ class TestTFD(unittest.TestCase):
             status_code=200,
         )
         expected = "Model successfully written to {p}".format(p=r_path)
-        with mock.patch("pathlib.Path.write_bytes", return_value="response.content"):
-            with mock.patch("pathlib.Path.is_dir", return_value=True):
-                response = self.tfd_cursor.get_model(dst_path=path, label=self.label)
+        response = self.tfd_cursor.get_model(dst_path=path, label=self.label)
         self.assertEqual(
             response,
             expected,
             msg="Expected: '{}', got '{}'".format(expected, response),
         )
+        self.assertEqual(
+            Path(r_path).read_text(),
+            "{w} successfully written to {p}".format(w="Model", p=path),
+        )
+        self.assertEqual(sorted(Path(path).iterdir()), [Path(r_path)])
 
     @requests_mock.mock()
     def test_get_model(self, requests_mock):
@@ -671,7 +815,9 @@ class TestTFD(unittest.TestCase):
         Should return success message.
         """
 
-        path = "/dir/to/test/"
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = tmp_dir.name + "/"
         r_path = path + "model_{t}.tar".format(t=int(time.time()))
         url = endpoint["label"].format(
             host=self.host,
@@ -688,14 +834,581 @@ class TestTFD(unittest.TestCase):
             status_code=200,
         )
         expected = "Model successfully written to {p}".format(p=r_path)
-        with mock.patch("pathlib.Path.write_bytes", return_value="response.content"):
-            with mock.patch("pathlib.Path.is_dir", return_value=True):
-                response = self.tfd_cursor.get_model(dst_path=path)
+        response = self.tfd_cursor.get_model(dst_path=path)
         self.assertEqual(
             response,
             expected,
             msg="Expected: '{}', got '{}'".format(expected, response),
         )
+        self.assertEqual(
+            Path(r_path).read_text(),
+            "{w} successfully written to {p}".format(w="Model", p=path),
+        )
+        self.assertEqual(sorted(Path(path).iterdir()), [Path(r_path)])
+
+    @requests_mock.mock()
+    def test_get_model_hash(self, requests_mock):
+        """
+        Scenario tests get_model function with expected hash of archive.
+        Should write model when hash is valid and return error without leaving any file when it is not.
+        """
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        url = endpoint["model_v"].format(
+            host=self.host,
+            port=self.port,
+            team=self.team,
+            project=self.project,
+            name=self.name,
+            version=self.version,
+        )
+        content = b"test data" * 1000
+        requests_mock.get(url, content=content, status_code=200)
+
+        expected_hash = hashlib.sha256(content).hexdigest()
+        response = self.tfd_cursor.get_model(
+            tmp_dir.name, self.version, buffer_size=1024, expected_hash=expected_hash
+        )
+        self.assertTrue(response.startswith("Model successfully written to"))
+        written = list(Path(tmp_dir.name).iterdir())
+        self.assertEqual(written[0].read_bytes(), content)
+        written[0].unlink()
+
+        response = self.tfd_cursor.get_model(
+            tmp_dir.name, self.version, expected_hash="0" * 64
+        )
+        expected = "Download error: hash mismatch, expected {e}, got {h}".format(
+            e="0" * 64, h=expected_hash
+        )
+        self.assertEqual(response, expected)
+        self.assertEqual(list(Path(tmp_dir.name).iterdir()), [])
+
+    @requests_mock.mock()
+    def test_get_module_incomplete_err(self, requests_mock):
+        """
+        Scenario tests get_module function when server sends less data than declared in Content-Length.
+        Should return error and should not leave any file.
+        """
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        url = endpoint["modules_v"].format(
+            host=self.host,
+            port=self.port,
+            team=self.team,
+            project=self.project,
+            name=self.name,
+            version=self.version,
+        )
+        requests_mock.get(
+            url,
+            content=b"test data",
+            headers={"Content-Length": "100"},
+            status_code=200,
+        )
+        response = self.tfd_cursor.get_module(tmp_dir.name, self.version)
+        self.assertEqual(
+            response, "Download error: incomplete body, received 9 of 100 bytes"
+        )
+        self.assertEqual(list(Path(tmp_dir.name).iterdir()), [])
+
+    def test_get_model_resume(self):
+        """
+        Scenario tests get_model function in resume mode against local stand-in server which breaks connection.
+        Download should be continued with Range request in the next attempt and whole model should be written.
+        """
+
+        content = bytes(range(256)) * 4000
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        with StandInServer(content, fail_after=[300000]) as server:
+            tfd_cursor = self._stand_in_cursor(server.port)
+            response = tfd_cursor.get_model(
+                tmp_dir.name,
+                self.version,
+                buffer_size=4096,
+                expected_hash=hashlib.sha256(content).hexdigest(),
+                resume=True,
+            )
+            tfd_cursor.close()
+
+        self.assertTrue(response.startswith("Model successfully written to"), msg=response)
+        written = list(Path(tmp_dir.name).iterdir())
+        self.assertEqual(len(written), 1)
+        self.assertEqual(written[0].read_bytes(), content)
+        self.assertNotIn("Range", server.requests[0])
+        self.assertRegex(server.requests[1]["Range"], r"^bytes=2\d{5}-$")
+        self.assertEqual(server.requests[1]["If-Range"], server.etag)
+
+    def test_get_module_resume_next_call(self):
+        """
+        Scenario tests get_module function in resume mode when all attempts fail.
+        Partial download should be kept and continued by the next call, also when server ignores Range requests.
+        """
+
+        content = bytes(range(256)) * 4000
+        for ranges in (True, False):
+            tmp_dir = tempfile.TemporaryDirectory()
+            self.addCleanup(tmp_dir.cleanup)
+            with StandInServer(content, ranges=ranges, fail_after=[100000]) as server:
+                tfd_cursor = self._stand_in_cursor(server.port)
+                response = tfd_cursor.get_module(
+                    tmp_dir.name,
+                    self.version,
+                    buffer_size=4096,
+                    resume=True,
+                    resume_attempts=1,
+                )
+                self.assertTrue(response.startswith("Download interrupted"), msg=response)
+                self.assertEqual(len(list(Path(tmp_dir.name).glob(".tfd_download_*"))), 2)
+
+                response = tfd_cursor.get_module(tmp_dir.name, self.version, resume=True)
+                tfd_cursor.close()
+
+            self.assertTrue(response.startswith("Module successfully written to"), msg=response)
+            written = list(Path(tmp_dir.name).iterdir())
+            self.assertEqual(len(written), 1)
+            self.assertEqual(written[0].read_bytes(), content)
+            self.assertRegex(server.requests[1]["Range"], r"^bytes=\d{5}-$")
+            self.assertEqual(len(server.requests), 2)
+
+    def test_get_model_parallel(self):
+        """
+        Scenario tests get_model function in parallel mode against local stand-in server with and without range support.
+        Archive should be downloaded in many ranges when server supports them and in one request otherwise.
+        """
+
+        content = os.urandom(1000000)
+        for ranges, requests_number in ((True, 1 + 10), (False, 1)):
+            tmp_dir = tempfile.TemporaryDirectory()
+            self.addCleanup(tmp_dir.cleanup)
+            with StandInServer(content, ranges=ranges) as server:
+                tfd_cursor = self._stand_in_cursor(server.port)
+                response = tfd_cursor.get_model(
+                    tmp_dir.name,
+                    self.version,
+                    expected_hash=hashlib.sha256(content).hexdigest(),
+                    workers=4,
+                    chunk_size=100000,
+                )
+                tfd_cursor.close()
+
+            self.assertTrue(response.startswith("Model successfully written to"), msg=response)
+            written = list(Path(tmp_dir.name).iterdir())
+            self.assertEqual(len(written), 1)
+            self.assertEqual(written[0].read_bytes(), content)
+            self.assertEqual(len(server.requests), requests_number)
+
+    def test_get_model_cache(self):
+        """
+        Scenario tests get_model function with model cache against local stand-in server.
+        Model version should be downloaded once, model label should be checked with conditional request and downloaded
+        again only when it points to other archive.
+        """
+
+        content = os.urandom(100000)
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+
+        def get_model(port, **kwargs):
+            dst_dir = tempfile.TemporaryDirectory()
+            self.addCleanup(dst_dir.cleanup)
+            with self._stand_in_cursor(port, model_cache=True, cache_dir=cache_dir.name) as tfd_cursor:
+                response = tfd_cursor.get_model(dst_dir.name, **kwargs)
+            self.assertTrue(response.startswith("Model successfully written to"), msg=response)
+            return response.split(" to ")[1]
+
+        with StandInServer(content) as server:
+            path = get_model(server.port, version=self.version)
+            self.assertEqual(Path(get_model(server.port, version=self.version)).read_bytes(), content)
+            self.assertEqual(Path(path).read_bytes(), content)
+            self.assertEqual(len(server.requests), 1)
+
+            get_model(server.port, label=self.label)
+            self.assertEqual(Path(get_model(server.port, label=self.label)).read_bytes(), content)
+            self.assertEqual(len(server.requests), 3)
+            self.assertEqual(server.requests[2]["If-None-Match"], server.etag)
+
+            server.content = os.urandom(100000)
+            server.etag = '"new"'
+            self.assertEqual(Path(get_model(server.port, label=self.label)).read_bytes(), server.content)
+            self.assertEqual(len(server.requests), 4)
+
+        from tensorflow_deploy_utils.cache import ModelCache
+
+        self.assertEqual(ModelCache(cache_dir.name).size(), 200000)
+
+    def test_get_module_cache_concurrent(self):
+        """
+        Scenario tests get_module function with model cache called by many threads at the same time.
+        Module should be downloaded once and shared by all calls.
+        """
+
+        content = os.urandom(100000)
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        responses = []
+
+        def get_module(port):
+            dst_dir = tempfile.TemporaryDirectory()
+            self.addCleanup(dst_dir.cleanup)
+            with self._stand_in_cursor(port, model_cache=True, cache_dir=cache_dir.name) as tfd_cursor:
+                responses.append(tfd_cursor.get_module(dst_dir.name, self.version))
+
+        with StandInServer(content) as server:
+            threads = [threading.Thread(target=get_module, args=(server.port,)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(responses), 4)
+        for response in responses:
+            self.assertTrue(response.startswith("Module successfully written to"), msg=response)
+            self.assertEqual(Path(response.split(" to ")[1]).read_bytes(), content)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_create_archive_reproducible(self):
+        """
+        Scenario tests that reproducible archives of the same files are byte-identical, regardless of modification
+        times, permissions, hard links and order of files on disk, and that streamed archive is the same.
+        """
+
+        from tensorflow_deploy_utils.archive import iter_tar_stream
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model = Path(self._create_test_model(Path(tmp_dir, "model")))
+            other = Path(tmp_dir, "other")
+            # the same files written in other order, with other times and permissions, and copy instead of hard link
+            os.link(model.joinpath("README.md"), model.joinpath("variables", "README.md"))
+            other.joinpath("variables").mkdir(parents=True)
+            for name in (
+                "variables/variables.index",
+                "variables/README.md",
+                "saved_model.pb",
+                "variables/variables.data-00000-of-00001",
+                "README.md",
+            ):
+                other.joinpath(name).write_bytes(model.joinpath(name).read_bytes())
+            os.chmod(other.joinpath("saved_model.pb"), 0o600)
+            os.utime(other.joinpath("variables"), (1, 1))
+
+            archives = []
+            for src, dst in ((model, "model.tar"), (other, "other.tar")):
+                dst = str(Path(tmp_dir, dst))
+                _hash = self.tfd_cursor.create_archive(str(src), dst, reproducible=True)
+                self.assertEqual(_hash, hashlib.sha256(Path(dst).read_bytes()).hexdigest())
+                archives.append(Path(dst).read_bytes())
+            self.assertEqual(archives[0], archives[1])
+            self.assertEqual(b"".join(iter_tar_stream(str(other), reproducible=True)), archives[0])
+
+            with tarfile.open(str(Path(tmp_dir, "model.tar"))) as archive:
+                members = archive.getmembers()
+            self.assertEqual(
+                [member.name for member in members],
+                [
+                    ".",
+                    "./README.md",
+                    "./saved_model.pb",
+                    "./variables",
+                    "./variables/README.md",
+                    "./variables/variables.data-00000-of-00001",
+                    "./variables/variables.index",
+                ],
+            )
+            self.assertTrue(all(member.isreg() or member.isdir() for member in members))
+            self.assertEqual(
+                {(member.mtime, member.uid, member.gid, member.uname) for member in members}, {(0, 0, 0, "")}
+            )
+            self.assertEqual({member.mode for member in members if member.isreg()}, {0o644})
+
+            self.assertNotEqual(
+                self.tfd_cursor.create_archive(str(model), str(Path(tmp_dir, "model.tar"))),
+                self.tfd_cursor.create_archive(str(other), str(Path(tmp_dir, "other.tar"))),
+            )
+
+    def test_create_archive_compressed(self):
+        """
+        Scenario tests create_archive function with compression.
+        Compressed archive should be deterministic, detected transparently in validation and extraction.
+        """
+
+        from tensorflow_deploy_utils.archive import extract_tar_stream, iter_file
+        from tensorflow_deploy_utils.compression import detect_compression
+        from tensorflow_deploy_utils.validation import validate_saved_model_archive
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model = self._create_test_model(str(Path(tmp_dir, "src")))
+            Path(model, "assets").mkdir()
+            Path(model, "assets", "vocab.txt").write_text("token\n" * 200000)
+            plain_hash = self.tfd_cursor.create_archive(model, str(Path(tmp_dir, "model.tar")))
+            plain_size = Path(tmp_dir, "model.tar").stat().st_size
+            for compression in COMPRESSIONS:
+                archive = Path(tmp_dir, "model.{c}".format(c=compression))
+                archive_hash = self.tfd_cursor.create_archive(model, str(archive), compression=compression, threads=2)
+                self.assertEqual(archive_hash, hashlib.sha256(archive.read_bytes()).hexdigest())
+                self.assertNotEqual(archive_hash, plain_hash)
+                self.assertEqual(
+                    self.tfd_cursor.create_archive(model, str(archive), compression=compression), archive_hash
+                )
+                self.assertEqual(detect_compression(archive.read_bytes()[:4]), compression)
+                self.assertLess(archive.stat().st_size, plain_size / 2)
+                # members are read, test saved_model.pb is not valid protobuf
+                with self.assertRaisesRegex(ValueError, "Invalid SavedModel protobuf"):
+                    validate_saved_model_archive(str(archive))
+
+                for extract in (self.tfd_cursor._extract_archive, None):
+                    dst = Path(tmp_dir, "dst_{c}_{e}".format(c=compression, e=bool(extract)))
+                    dst.mkdir()
+                    if extract:
+                        extract(str(archive), str(dst))
+                    else:
+                        extract_tar_stream(iter_file(str(archive), 1000), str(dst))
+                    for path in Path(model).rglob("*"):
+                        if path.is_file():
+                            self.assertEqual(dst.joinpath(path.relative_to(model)).read_bytes(), path.read_bytes())
+
+    def test_compress_chunks_blocks(self):
+        """
+        Scenario checks that gzip compression in blocks on many threads produces multi-member gzip of whole input.
+        """
+
+        import gzip
+        from tensorflow_deploy_utils.compression import compress_chunks
+
+        chunks = [os.urandom(1000) + bytes(50000) for _ in range(40)]
+        compressed = list(compress_chunks(chunks, "gzip", threads=4, block_size=100000))
+        self.assertGreater(len(compressed), 10)
+        self.assertEqual(gzip.decompress(b"".join(compressed)), b"".join(chunks))
+        self.assertEqual(gzip.decompress(b"".join(compress_chunks([], "gzip"))), b"")
+        self.assertEqual(list(compress_chunks(chunks, "")), chunks)
+        with self.assertRaises(ValueError):
+            list(compress_chunks(chunks, "lz4"))
+        # every gzip member has zero modification time, so output is deterministic
+        self.assertEqual(b"".join(compressed)[4:8], bytes(4))
+        self.assertEqual(b"".join(compressed), b"".join(compress_chunks(chunks, "gzip", threads=2, block_size=100000)))
+
+    @requests_mock.mock()
+    def test_upload_model_stream_compressed(self, requests_mock):
+        """
+        Scenario tests upload_model function in stream mode with compression.
+        Compressed archive should be sent only if TensorFlow Deploy accepts its compression.
+        """
+
+        url = endpoint["label"].format(
+            host=self.host,
+            port=self.port,
+            team=self.team,
+            project=self.project,
+            name=self.name,
+            label=self.label,
+        )
+        compressions_url = "http://{host}:{port}/v1/archives/compressions".format(host=self.host, port=self.port)
+        bodies = []
+
+        def callback(request, context):
+            bodies.append(b"".join(request.body))
+            return "ok"
+
+        requests_mock.post(url, text=callback, status_code=200)
+        compressions_mock = requests_mock.get(compressions_url, text=json.dumps(["gzip"]), status_code=200)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src = self._create_test_model(Path(tmp_dir, "model"))
+            with mock.patch.object(self.tfd_cursor, "_validate_model_or_module"):
+                self.assertEqual(self.tfd_cursor.upload_model(src, stream=True, compression="gzip"), "Upload success!")
+                self.assertEqual(self.tfd_cursor.upload_model(src, stream=True, compression="zstd"), "Upload success!")
+            archive = Path(tmp_dir, "model.tar.gz")
+            self.tfd_cursor.create_archive(src, str(archive), compression="gzip")
+            self.assertEqual(compressions_mock.call_count, 1)
+
+            requests_mock.get(compressions_url, status_code=404)
+            tfd_cursor = TFD(
+                host=self.host, team=self.team, project=self.project, name=self.name, check_connection=False
+            )
+            with mock.patch.object(tfd_cursor, "_validate_archived_model_or_module"):
+                result = tfd_cursor.upload_model(str(archive), stream=True)
+            self.assertEqual(result, "Upload failed! TensorFlow Deploy doesn't accept gzip archives")
+            tfd_cursor.close()
+
+        fields = [self._parse_multipart(body) for body in bodies]
+        self.assertEqual(len(fields), 2)
+        self.assertTrue(fields[0][0][1].startswith(b"\x1f\x8b"))
+        self.assertIn(b'filename="model.tar.gz"', bodies[0])
+        self.assertIn(b'filename="model.tar"', bodies[1])
+        self.assertFalse(fields[1][0][1].startswith(b"\x1f\x8b"))
+
+    def test_get_model_extract(self):
+        """
+        Scenario tests get_model function in extract mode against local stand-in server.
+        Model should be extracted to destination directory without writing archive, hash mismatch should leave
+        nothing.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model = self._create_test_model(str(Path(tmp_dir, "src")))
+            archive_path = str(Path(tmp_dir, "model.tar"))
+            TFD(team=self.team, project=self.project, host=self.host, check_connection=False).create_archive(
+                model, archive_path
+            )
+            content = Path(archive_path).read_bytes()
+
+            with StandInServer(content) as server, self._stand_in_cursor(server.port) as tfd_cursor:
+                extract_to = Path(tmp_dir, "dst", "model")
+                extract_to.parent.mkdir()
+                response = tfd_cursor.get_model(
+                    "", self.version, expected_hash=hashlib.sha256(content).hexdigest(), extract_to=str(extract_to)
+                )
+                self.assertEqual(response, f"Model successfully extracted to {extract_to}")
+                for path in Path(model).rglob("*"):
+                    extracted = extract_to.joinpath(path.relative_to(model))
+                    if path.is_file():
+                        self.assertEqual(extracted.read_bytes(), path.read_bytes())
+                    else:
+                        self.assertTrue(extracted.is_dir())
+                self.assertEqual(
+                    tfd_cursor.get_model("", self.version, extract_to=str(extract_to)),
+                    "ERROR: extract_to is not empty dir",
+                )
+
+                response = tfd_cursor.get_module(
+                    "", self.version, expected_hash="0" * 64, extract_to=str(Path(tmp_dir, "dst", "module"))
+                )
+                self.assertRegex(response, "^Download error: hash mismatch")
+                self.assertEqual(os.listdir(str(extract_to.parent)), ["model"])
+
+    def test_get_model_extract_traversal_err(self):
+        """
+        Scenario tests get_model function in extract mode with archives pointing outside of destination directory.
+        Should return error and should not write anything.
+        """
+
+        for name, link in (("../evil.txt", False), ("./evil", True)):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                archive_path = Path(tmp_dir, "model.tar")
+                Path(tmp_dir, "dst").mkdir()
+                with tarfile.open(str(archive_path), "w") as archive:
+                    member = tarfile.TarInfo(name)
+                    if link:
+                        member.type = tarfile.SYMTYPE
+                        member.linkname = "/etc"
+                        archive.addfile(member)
+                    else:
+                        member.size = 4
+                        archive.addfile(member, tarfile.io.BytesIO(b"evil"))
+
+                with StandInServer(archive_path.read_bytes()) as server, self._stand_in_cursor(
+                    server.port
+                ) as tfd_cursor:
+                    response = tfd_cursor.get_model(
+                        "", self.version, extract_to=str(Path(tmp_dir, "dst", "model"))
+                    )
+
+                self.assertRegex(response, "^Download error: (archive member outside|unsupported archive member)")
+                self.assertEqual(sorted(os.listdir(tmp_dir)), ["dst", "model.tar"])
+                self.assertEqual(os.listdir(str(Path(tmp_dir, "dst"))), [])
+
+    def test_model_cache_lru(self):
+        """
+        Scenario tests that model cache evicts least recently used archives above its size limit.
+        """
+
+        from tensorflow_deploy_utils.cache import ModelCache
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ModelCache(tmp_dir, max_size=250)
+            with mock.patch("tensorflow_deploy_utils.cache.time", side_effect=[1, 2, 3, 4]):
+                for key in ("a", "b"):
+                    path = cache.download_path(key)
+                    path.write_bytes(key.encode() * 100)
+                    cache.put(key, path, key * 64)
+                cache.copy_to("a" * 64, Path(tmp_dir, "a.tar"))
+                path = cache.download_path("c")
+                path.write_bytes(b"c" * 100)
+                cache.put("c", path, "c" * 64)
+
+            self.assertIsNotNone(cache.get("a"))
+            self.assertIsNone(cache.get("b"))
+            self.assertIsNotNone(cache.get("c"))
+            self.assertEqual(cache.size(), 200)
+            self.assertEqual(Path(tmp_dir, "a.tar").read_bytes(), b"a" * 100)
+
+    def test_model_cache_copy(self):
+        """
+        Scenario tests that cached archives are copied to destination, unless hard links are enabled, so modifying
+        written archive doesn't modify cache.
+        """
+
+        from tensorflow_deploy_utils.cache import ModelCache
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for hardlink in (False, True):
+                cache = ModelCache(str(Path(tmp_dir, "cache")), hardlink=hardlink)
+                path = cache.download_path("a")
+                path.write_bytes(b"a" * 100)
+                cache.put("a", path, "a" * 64)
+                dst_path = Path(tmp_dir, f"a_{hardlink}.tar")
+                self.assertTrue(cache.copy_to("a" * 64, dst_path))
+                self.assertEqual(dst_path.stat().st_ino == cache.blob_path("a" * 64).stat().st_ino, hardlink)
+            dst_path = Path(tmp_dir, "a_False.tar")
+            dst_path.write_bytes(b"b" * 100)
+            self.assertEqual(cache.blob_path("a" * 64).read_bytes(), b"a" * 100)
+
+    def test_model_cache_copy_unlocked(self):
+        """
+        Scenario tests that cached archive is copied without lock of the cache, even if it is evicted meanwhile, and
+        that failed copy leaves no temporary file.
+        """
+
+        import shutil
+
+        from tensorflow_deploy_utils.cache import ModelCache
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ModelCache(str(Path(tmp_dir, "cache")))
+            path = cache.download_path("a")
+            path.write_bytes(b"a" * 100)
+            cache.put("a", path, "a" * 64)
+            dst_dir = Path(tmp_dir, "dst")
+            dst_dir.mkdir()
+            copyfileobj = shutil.copyfileobj
+
+            def evict_and_copy(src, dst, length):
+                # the cache is not locked during copy, so other process can evict archive
+                cache.invalidate()
+                copyfileobj(src, dst, length)
+
+            with mock.patch("shutil.copyfileobj", side_effect=evict_and_copy):
+                self.assertTrue(cache.copy_to("a" * 64, dst_dir.joinpath("a.tar")))
+            self.assertEqual(dst_dir.joinpath("a.tar").read_bytes(), b"a" * 100)
+            self.assertIsNone(cache.get("a"))
+
+            path = cache.download_path("a")
+            path.write_bytes(b"a" * 100)
+            cache.put("a", path, "a" * 64)
+            with mock.patch("shutil.copyfileobj", side_effect=OSError(28, "No space left on device")):
+                with self.assertRaises(OSError):
+                    cache.copy_to("a" * 64, dst_dir.joinpath("b.tar"))
+            self.assertEqual(sorted(p.name for p in dst_dir.iterdir()), ["a.tar"])
+
+    def test_get_module_parallel_err(self):
+        """
+        Scenario tests get_module function in parallel mode when one of ranges is interrupted.
+        Should raise connection error and should not leave any file.
+        """
+
+        content = os.urandom(1000000)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        with StandInServer(content, fail_after=[1, 1000]) as server:
+            tfd_cursor = self._stand_in_cursor(server.port)
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                tfd_cursor.get_module(
+                    tmp_dir.name, self.version, workers=2, chunk_size=500000
+                )
+            tfd_cursor.close()
+
+        self.assertEqual(list(Path(tmp_dir.name).iterdir()), [])
 
     @requests_mock.mock()
     def test_get_model_label_err(self, requests_mock):
@@ -780,7 +1493,9 @@ class TestTFD(unittest.TestCase):
         Should return success message.
         """
 
-        path = "/dir/to/test/"
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = tmp_dir.name + "/"
         r_path = path + "module_{t}.tar".format(t=int(time.time()))
 
         url = endpoint["modules_v"].format(
@@ -798,15 +1513,18 @@ class TestTFD(unittest.TestCase):
             status_code=200,
         )
         expected = "Module successfully written to {p}".format(p=r_path)
-        with mock.patch("pathlib.Path.write_bytes", return_value="response.content"):
-            with mock.patch("pathlib.Path.is_dir", return_value=True):
-                response = self.tfd_cursor.get_module(path, self.version)
+        response = self.tfd_cursor.get_module(path, self.version)
 
         self.assertEqual(
             response,
             expected,
             msg="Expected: '{}', got '{}'".format(expected, response),
         )
+        self.assertEqual(
+            Path(r_path).read_text(),
+            "{w} successfully written to {p}".format(w="Module", p=path),
+        )
+        self.assertEqual(sorted(Path(path).iterdir()), [Path(r_path)])
 
     @requests_mock.mock()
     def test_get_module_err(self, request_mock):
@@ -1350,6 +2068,356 @@ class TestTFD(unittest.TestCase):
             msg="Got '{r}', expected '{e}'".format(r=error, e=expected),
         )
 
+    @requests_mock.mock()
+    def test_set_labels_bulk(self, requests_mock):
+        """
+        Scenario tests set_labels_bulk function with models from two projects and one failing assignment.
+        Should return result of every assignment and reload every project with changed label only once.
+        """
+
+        assignments = [
+            ("model_a", 1, "stable"),
+            ("model_b", 2, "stable"),
+            ("other_project", "model_c", 3, "canary"),
+            ("failing_project", "model_d", 4, "canary"),
+        ]
+        for assignment in assignments:
+            project, name, version, label = (self.project, *assignment) if len(assignment) == 3 else assignment
+            url = endpoint["set_label"].format(
+                team=self.team,
+                project=project,
+                name=name,
+                version=version,
+                label=label,
+                host=self.host,
+                port=self.port,
+            )
+            if project == "failing_project":
+                requests_mock.put(url, text="label not set", status_code=500)
+            else:
+                requests_mock.put(url, text="label set", status_code=200)
+        for project in (self.project, "other_project", "failing_project"):
+            url_reload = endpoint["reload"].format(
+                team=self.team, project=project, host=self.host, port=self.port, reload_type=False
+            )
+            requests_mock.post(url_reload, text="reloaded", status_code=200)
+
+        response = self.tfd_cursor.set_labels_bulk(assignments, workers=4)
+        expected = "\n".join(
+            [
+                "set_labels_bulk results:",
+                f"{self.project}/model_a version 1 label stable: success: label set",
+                f"{self.project}/model_b version 2 label stable: success: label set",
+                "other_project/model_c version 3 label canary: success: label set",
+                "failing_project/model_d version 4 label canary: error: label not set",
+                f"reload {self.project}: reload_config success!",
+                "reload other_project: reload_config success!",
+            ]
+        )
+        self.assertEqual(expected, response, msg="Got '{r}', expected '{e}'".format(r=response, e=expected))
+        self.assertEqual(
+            [request.method for request in requests_mock.request_history].count("POST"), 2
+        )
+
+    @requests_mock.mock()
+    def test_set_label_coalesced_reload(self, requests_mock):
+        """
+        Scenario tests set_label function on cursors with coalesced reloads, also shared by two cursors.
+        Labels should be set immediately and one full reload should be made on flush_reload/close.
+        """
+
+        for name in ("model_a", "model_b"):
+            requests_mock.put(
+                endpoint["set_label"].format(
+                    team=self.team,
+                    project=self.project,
+                    name=name,
+                    version=self.version,
+                    label=self.label,
+                    host=self.host,
+                    port=self.port,
+                ),
+                text="label set",
+                status_code=200,
+            )
+        url_reload = endpoint["reload"].format(
+            team=self.team, project=self.project, host=self.host, port=self.port, reload_type=False
+        )
+        requests_mock.post(url_reload, text="reloaded", status_code=200)
+
+        cursors = [
+            TFD(
+                team=self.team,
+                project=self.project,
+                host=self.host,
+                name=name,
+                label=self.label,
+                check_connection=False,
+                reload_delay=60,
+                shared_reload=shared,
+            )
+            for name, shared in (("model_a", False), ("model_a", True), ("model_b", True))
+        ]
+
+        for tfd_cursor in cursors[:1] * 3:
+            response = tfd_cursor.set_label(self.version)
+            self.assertEqual(response, "set_label success: label set, reload: reload_config scheduled")
+        self.assertEqual(requests_mock.call_count, 3)
+        self.assertEqual(
+            cursors[0].flush_reload(), f"reload {self.project}: reload_config success!"
+        )
+        self.assertEqual(requests_mock.call_count, 4)
+        self.assertEqual(cursors[0].flush_reload(), f"reload {self.project}: Nothing to reload")
+
+        for tfd_cursor in cursors[1:]:
+            tfd_cursor.set_label(self.version)
+        for tfd_cursor in cursors:
+            tfd_cursor.close()
+        self.assertEqual(
+            [request.method for request in requests_mock.request_history],
+            ["PUT"] * 3 + ["POST"] + ["PUT"] * 2 + ["POST"],
+        )
+
+    def test_shared_scheduler_lifetime(self):
+        """
+        Scenario tests that shared reload scheduler doesn't keep cursors alive, reloads with cursor still in use and
+        is removed when all cursors are closed. Timers of pending reloads must not block interpreter exit.
+        """
+
+        import gc
+        import weakref
+
+        from tensorflow_deploy_utils import reload
+
+        def new_cursor():
+            return TFD(
+                team=self.team,
+                project=self.project,
+                host=self.host,
+                name=self.name,
+                check_connection=False,
+                reload_delay=60,
+                shared_reload=True,
+            )
+
+        key = (self.host, self.port, self.team, self.project)
+        first, second = new_cursor(), new_cursor()
+        with mock.patch.object(TFD, "_reload_project", autospec=True, return_value="reloaded") as reload_mock:
+            scheduler = first._reload_scheduler(self.project)
+            self.assertIs(second._reload_scheduler(self.project), scheduler)
+            first.close()
+            scheduler.request()
+            self.assertTrue(scheduler.timer.daemon)
+            self.assertEqual(scheduler.flush(), "reloaded")
+            reload_mock.assert_called_once_with(second, self.project, True)
+
+            first_ref = weakref.ref(first)
+            del first
+            gc.collect()
+            self.assertIsNone(first_ref())
+            self.assertIn(key, reload._shared_schedulers)
+            second.close()
+            self.assertNotIn(key, reload._shared_schedulers)
+
+    def test_shared_scheduler_conflict(self):
+        """
+        Scenario tests that cursors sharing reload scheduler can't use other reload delays.
+        """
+
+        from tensorflow_deploy_utils.reload import release_shared_scheduler, shared_scheduler
+
+        class Cursor:
+            def reload(self, short_reload):
+                return "reloaded"
+
+        key = ("shared_scheduler_conflict",)
+        first, second = Cursor(), Cursor()
+        scheduler = shared_scheduler(key, first.reload, 10, None)
+        self.assertIs(shared_scheduler(key, second.reload, 10, None), scheduler)
+        for quiet_window, max_delay in ((5, None), (10, 60)):
+            with self.assertRaises(ValueError):
+                shared_scheduler(key, second.reload, quiet_window, max_delay)
+        for owner in (first, second):
+            release_shared_scheduler(key, owner)
+
+    def test_reload_flush_at_exit(self):
+        """
+        Scenario tests that reloads pending at interpreter exit are made with deadline, so exit can't hang.
+        """
+
+        from tensorflow_deploy_utils import reload
+
+        budgets = []
+
+        def reload_project(short_reload):
+            budgets.append(remaining_time())
+            raise DeadlineExceeded("operation deadline exceeded")
+
+        scheduler = reload.ReloadScheduler(reload_project, quiet_window=60)
+        scheduler.request()
+        reload._flush_at_exit()
+        self.assertIsNone(scheduler.pending)
+        self.assertEqual(len(budgets), 1)
+        self.assertTrue(0 < budgets[0] <= reload.EXIT_FLUSH_DEADLINE, msg=budgets)
+
+    @staticmethod
+    def _model_status(states: dict) -> str:
+        """
+        Returns reload_status response with TF Serving model status of every instance, states: {instance: {version:
+        state}}.
+        """
+
+        return json.dumps(
+            {
+                instance: {
+                    "model_version_status": [
+                        {"version": str(version), "state": state, "status": {"error_code": "OK"}}
+                        for version, state in versions.items()
+                    ]
+                }
+                for instance, versions in states.items()
+            }
+        )
+
+    @requests_mock.mock()
+    def test_reload_status(self, requests_mock):
+        """
+        Scenario tests reload_status function.
+        Should return states of model versions on every TFS instance.
+        """
+
+        url = endpoint["reload_status"].format(
+            team=self.team, project=self.project, name=self.name, host=self.host, port=self.port
+        )
+        requests_mock.get(
+            url,
+            text=self._model_status({"tfs-0": {1: "AVAILABLE", 2: "LOADING"}, "tfs-1": {1: "AVAILABLE"}}),
+            status_code=200,
+        )
+        response = self.tfd_cursor.reload_status()
+        expected = {"tfs-0": {1: "AVAILABLE", 2: "LOADING"}, "tfs-1": {1: "AVAILABLE"}}
+        self.assertEqual(expected, response, msg="Got '{r}', expected '{e}'".format(r=response, e=expected))
+
+    @requests_mock.mock()
+    @mock.patch("tensorflow_deploy_utils.TFD.sleep")
+    def test_reload_config_wait(self, requests_mock, sleep_mock):
+        """
+        Scenario tests reload_config function with wait for model version with cursor label.
+        Should poll reload_status with growing delays until version is available on every instance.
+        """
+
+        requests_mock.get(
+            endpoint["list_models"].format(host=self.host, port=self.port),
+            text=json.dumps({"version": [2], "label": [self.label]}),
+            status_code=200,
+        )
+        requests_mock.post(
+            endpoint["reload"].format(
+                team=self.team, project=self.project, host=self.host, port=self.port, reload_type=True
+            ),
+            text="reloaded",
+            status_code=200,
+        )
+        url = endpoint["reload_status"].format(
+            team=self.team, project=self.project, name=self.name, host=self.host, port=self.port
+        )
+        requests_mock.get(
+            url,
+            [
+                {"text": self._model_status({"tfs-0": {1: "AVAILABLE"}, "tfs-1": {1: "AVAILABLE"}})},
+                {"text": "unavailable", "status_code": 503},
+                {"text": self._model_status({"tfs-0": {2: "AVAILABLE"}, "tfs-1": {1: "UNLOADING", 2: "LOADING"}})},
+                {"text": self._model_status({"tfs-0": {2: "AVAILABLE"}, "tfs-1": {2: "AVAILABLE"}})},
+            ],
+        )
+
+        response = self.tfd_cursor.reload_config(wait=True)
+        self.assertRegex(
+            response,
+            r"^reload_config success!\nmodel version 2 available on:\ntfs-0: \d+\.\d\ds\ntfs-1: \d+\.\d\ds$",
+        )
+        self.assertEqual(sleep_mock.call_count, 3)
+        delays = [call.args[0] for call in sleep_mock.call_args_list]
+        for delay, max_delay in zip(delays, (0.5, 1, 2)):
+            self.assertTrue(max_delay / 2 <= delay <= max_delay, msg=delays)
+
+    @requests_mock.mock()
+    def test_reload_config_wait_deadline_err(self, requests_mock):
+        """
+        Scenario tests reload_config function with wait when model version isn't available before wait timeout.
+        Should return error with instances which are not ready.
+        """
+
+        requests_mock.post(
+            endpoint["reload"].format(
+                team=self.team, project=self.project, host=self.host, port=self.port, reload_type=True
+            ),
+            text="reloaded",
+            status_code=200,
+        )
+        requests_mock.get(
+            endpoint["reload_status"].format(
+                team=self.team, project=self.project, name=self.name, host=self.host, port=self.port
+            ),
+            text=self._model_status({"tfs-0": {3: "AVAILABLE"}, "tfs-1": {3: "LOADING"}}),
+            status_code=200,
+        )
+
+        response = self.tfd_cursor.reload_config(wait=True, version=3, wait_timeout=0)
+        expected = "reload_config error: model version 3 not available within 0s on: ['tfs-1']"
+        self.assertEqual(expected, response, msg="Got '{r}', expected '{e}'".format(r=response, e=expected))
+
+    def test_reload_scheduler(self):
+        """
+        Scenario tests that reload scheduler merges requests (full reload wins) and reloads after quiet window or
+        maximum delay.
+        """
+
+        from tensorflow_deploy_utils.reload import ReloadScheduler
+
+        reload_mock = mock.Mock(return_value="reload_config success!")
+        scheduler = ReloadScheduler(reload_mock, quiet_window=0.1)
+        scheduler.request(short_reload=True)
+        scheduler.request(short_reload=False)
+        scheduler.request(short_reload=True)
+        reload_mock.assert_not_called()
+        time.sleep(0.5)
+        reload_mock.assert_called_once_with(False)
+
+        reload_mock.reset_mock()
+        scheduler = ReloadScheduler(reload_mock, quiet_window=60, max_delay=1)
+        for _ in range(5):
+            scheduler.request(short_reload=True)
+            time.sleep(0.05)
+        time.sleep(1.2)
+        reload_mock.assert_called_once_with(True)
+        self.assertEqual(scheduler.flush(), "Nothing to reload")
+
+    def test_set_labels_bulk_err(self):
+        """
+        Scenario tests set_labels_bulk function with assignment without version.
+        Should raise ValueError before any request.
+        """
+
+        with self.assertRaises(ValueError):
+            self.tfd_cursor.set_labels_bulk([("model_a", 1, "stable"), ("model_b", None, "stable")])
+
+    def test_set_labels_bulk_invalid_params(self):
+        """
+        Scenario tests set_labels_bulk function with project, name or label not allowed in request URL.
+        Should raise ValueError before any request.
+        """
+
+        for assignment in (
+            ("model_a", 1, "../stable"),
+            ("model_a/versions", 1, "stable"),
+            ("project?x=1", "model_a", 1, "stable"),
+        ):
+            with mock.patch.object(self.tfd_cursor.session, "put") as put_mock:
+                with self.assertRaisesRegex(ValueError, "has invalid format"):
+                    self.tfd_cursor.set_labels_bulk([("model_b", 1, "stable"), assignment])
+                put_mock.assert_not_called()
+
     @requests_mock.mock()
     def test_set_label_err(self, requests_mock):
         """
@@ -1445,8 +2513,9 @@ class TestTFD(unittest.TestCase):
         )
 
     @requests_mock.mock()
+    @mock.patch("tensorflow_deploy_utils.TFD.sleep")
     @mock.patch("builtins.input", return_value="y")
-    def test_set_stable_err(self, requests_mock, input_mock):
+    def test_set_stable_err(self, requests_mock, input_mock, sleep_mock):
         """
         Scenario tests set_stable function when something is wrong with TFD Api.
         Should return error.
@@ -1479,6 +2548,27 @@ class TestTFD(unittest.TestCase):
             expected,
             msg="Got '{r}', expected: '{e}'".format(r=result, e=expected),
         )
+        self.assertEqual(sleep_mock.call_count, attempts - 1)
+
+    @mock.patch("tensorflow_deploy_utils.TFD.sleep")
+    @mock.patch("tensorflow_deploy_utils.transport.sleep")
+    @mock.patch("builtins.input", return_value="y")
+    def test_set_stable_retries(self, input_mock, transport_sleep_mock, sleep_mock):
+        """
+        Scenario tests that set_stable attempts aren't multiplied by retries of session.
+        Should send request once per attempt.
+        """
+
+        with StandInServer() as server:
+            server.fail_statuses = [502] * 10
+            tfd_cursor = self._stand_in_cursor(server.port, circuit_breaker=False)
+            result = tfd_cursor.set_stable(self.version, attempts=3)
+            tfd_cursor.close()
+            self.assertTrue(result.startswith("set_stable error! Errors from all attempts"), result)
+            self.assertEqual([request["method"] for request in server.requests], ["PUT"] * 3)
+        self.assertEqual(tfd_cursor.last_retries, 0)
+        self.assertEqual(sleep_mock.call_count, 2)
+        transport_sleep_mock.assert_not_called()
 
     @requests_mock.mock()
     @mock.patch("builtins.input", return_value="n")
@@ -1539,6 +2629,41 @@ class TestTFD(unittest.TestCase):
             msg="Got '{r}', expected '{e}'".format(r=result, e=expected),
         )
 
+
+    def test_calculate_hash_modes(self):
+        """
+        Scenario checks that hash is the same for every hash mode, block size and prefetch, also for empty file and
+        file which is not multiple of block size.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir, "file")
+            for size in (0, 4096, 3 * 4096 + 7):
+                data = os.urandom(size)
+                path.write_bytes(data)
+                expected = hashlib.sha256(data).hexdigest()
+                for mode in ("read", "readinto", "mmap"):
+                    for prefetch in (False, True):
+                        for block_size in (4096, 10000):
+                            tfd_cursor = TFD(
+                                host=self.host,
+                                team=self.team,
+                                project=self.project,
+                                check_connection=False,
+                                hash_block_size=block_size,
+                                hash_mode=mode,
+                                hash_prefetch=prefetch,
+                            )
+                            self.assertEqual(
+                                tfd_cursor._calculate_hash(str(path)),
+                                expected,
+                                msg=f"size: {size}, mode: {mode}, prefetch: {prefetch}, block: {block_size}",
+                            )
+            with self.assertRaises(ValueError):
+                TFD(host=self.host, team=self.team, project=self.project, check_connection=False, hash_mode="direct")
+            with self.assertRaises(FileNotFoundError):
+                self.tfd_cursor._calculate_hash(str(Path(tmp_dir, "missing")))
+
     @mock.patch("tensorflow.saved_model.load", return_values=object)
     def test_validate_model_or_module(self, tf_patch):
         """
@@ -1611,50 +2736,303 @@ class TestTFD(unittest.TestCase):
         )
         self.assertIsNotNone(result)
 
-    @mock.patch("tarfile.open", return_values=object)
+    @staticmethod
+    def _create_saved_model_proto(outputs: bool = True) -> bytes:
+        """
+        Returns serialized SavedModel protobuf with one meta graph and 'serving_default' signature.
+        """
+
+        from tensorflow.core.protobuf import saved_model_pb2
+
+        saved_model = saved_model_pb2.SavedModel()
+        meta_graph = saved_model.meta_graphs.add()
+        meta_graph.meta_info_def.tags.append("serve")
+        signature = meta_graph.signature_def["serving_default"]
+        signature.inputs["x"].name = "x:0"
+        if outputs:
+            signature.outputs["y"].name = "y:0"
+        return saved_model.SerializeToString()
+
     @mock.patch("tensorflow.saved_model.load", return_values=object)
-    def test_validate_archived_model_or_module(self, tar_mock, tf_mock):
+    def test_validate_model_or_module_fast(self, tf_patch):
         """
-        Scenario tests validate_archived_model_or_module function.
-        None on return when everything is ok.
+        Scenario tests validate_model_or_module function on fast level.
+        Should return validation time and should not load model with TensorFlow.
         """
 
-        err = None
-        path_tar = "/path/to/file.tar"
-        with mock.patch("os.path", return_values=True):
-            with mock.patch("os.listdir", return_value=["README.md"]):
-                try:
-                    self.tfd_cursor._validate_archived_model_or_module(path_tar)
-                except Exception as e:
-                    err = e
-                    pass
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model = Path(self._create_test_model(Path(tmp_dir, "model")))
+            model.joinpath("saved_model.pb").write_bytes(self._create_saved_model_proto())
+            result = self.tfd_cursor._validate_model_or_module(str(model), level="fast")
 
-        self.assertIsNone(err, msg="Expected None, got '{e}'".format(e=err))
+        self.assertEqual(list(result), ["fast"])
+        tf_patch.assert_not_called()
+
+    def test_validate_model_or_module_fast_err(self):
+        """
+        Scenario tests validate_model_or_module function on fast level with broken models.
+        Should return error describing the problem.
+        """
+
+        cases = [
+            ("invalid protobuf", "Invalid SavedModel protobuf!"),
+            ("no outputs", "Signature 'serving_default' without outputs!"),
+            ("missing shard", "Missing variables data shards: [1]"),
+            ("missing index", "Missing variables/variables.index file!"),
+            ("missing saved_model.pb", "SavedModel file does not exist at:"),
+        ]
+        for case, expected in cases:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                model = Path(self._create_test_model(Path(tmp_dir, "model")))
+                model.joinpath("saved_model.pb").write_bytes(
+                    self._create_saved_model_proto(outputs=case != "no outputs")
+                )
+                if case == "invalid protobuf":
+                    model.joinpath("saved_model.pb").write_bytes(b"\xff\xff\xff")
+                elif case == "missing shard":
+                    model.joinpath(
+                        "variables", "variables.data-00000-of-00001"
+                    ).rename(model.joinpath("variables", "variables.data-00000-of-00002"))
+                elif case == "missing index":
+                    model.joinpath("variables", "variables.index").unlink()
+                elif case == "missing saved_model.pb":
+                    model.joinpath("saved_model.pb").unlink()
+                with self.assertRaises(ValueError, msg=case) as error:
+                    self.tfd_cursor._validate_model_or_module(str(model), level="fast")
+            self.assertIn(expected, str(error.exception), msg=case)
 
-    @mock.patch("tarfile.open", return_values=object)
     @mock.patch("tensorflow.saved_model.load", return_values=object)
-    def test_validate_archived_model_or_module_err(self, tar_mock, tf_mock):
+    def test_validation_cache(self, tf_mock):
+        """
+        Scenario tests that validation results are cached on disk for model directories and archives.
+        Validation of unchanged model should be skipped, deep validation should also satisfy fast validation and
+        invalidated or changed model should be validated again.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tfd_cursor = TFD(
+                host=self.host,
+                team=self.team,
+                project=self.project,
+                check_connection=False,
+                validation_cache=True,
+                cache_dir=str(Path(tmp_dir, "cache")),
+            )
+            model = Path(self._create_test_model(Path(tmp_dir, "model")))
+            model.joinpath("saved_model.pb").write_bytes(self._create_saved_model_proto())
+            path_tar = str(Path(tmp_dir, "model.tar"))
+            tfd_cursor.create_archive(str(model), path_tar)
+
+            self.assertEqual(list(tfd_cursor._validate_model_or_module(str(model))), ["fast"])
+            self.assertEqual(list(tfd_cursor._validate_model_or_module(str(model))), ["cache"])
+            self.assertEqual(
+                list(tfd_cursor._validate_model_or_module(str(model), "deep")), ["deep"]
+            )
+            tfd_cursor.invalidate_validation_cache(str(model))
+            self.assertEqual(list(tfd_cursor._validate_model_or_module(str(model))), ["fast"])
+            model.joinpath("README.md").write_text("changed readme")
+            self.assertEqual(list(tfd_cursor._validate_model_or_module(str(model))), ["fast"])
+
+            self.assertEqual(
+                list(tfd_cursor._validate_archived_model_or_module(path_tar, "deep")), ["deep"]
+            )
+            self.assertEqual(
+                list(tfd_cursor._validate_archived_model_or_module(path_tar, "fast")), ["cache"]
+            )
+            self.assertEqual(len(tfd_cursor.validation_cache), 3)
+            tfd_cursor.invalidate_validation_cache()
+            self.assertEqual(len(tfd_cursor.validation_cache), 0)
+
+    def test_validation_cache_lru(self):
+        """
+        Scenario tests that validation cache evicts least recently used entries above its limit.
+        """
+
+        from tensorflow_deploy_utils.cache import ValidationCache
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ValidationCache(tmp_dir, max_entries=2)
+            with mock.patch("tensorflow_deploy_utils.cache.time", side_effect=[100, 200, 300, 400]):
+                cache.put("a", "fast")
+                cache.put("b", "deep")
+                self.assertIsNotNone(cache.get("a", "fast"))
+                cache.put("c", "fast")
+            self.assertIsNotNone(cache.get("a", "fast"))
+            self.assertIsNone(cache.get("b", "fast"))
+            self.assertIsNone(cache.get("c", "deep"))
+
+    def test_validation_cache_entries(self):
         """
-        Scenario tests validate_archived_model_or_module function when something is wrong with TFD Api.
+        Scenario tests that recent cache hits don't rewrite validation cache and malformed entries are cache misses.
+        """
+
+        from tensorflow_deploy_utils.cache import ValidationCache
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ValidationCache(tmp_dir)
+            cache.put("a", "deep")
+            with mock.patch("tensorflow_deploy_utils.cache._write_json") as write_mock:
+                self.assertIsNotNone(cache.get("a", "fast"))
+            write_mock.assert_not_called()
+            cache.path.write_text(json.dumps({"a": {"used": 1}, "b": {"level": "unknown", "used": 1}, "c": []}))
+            for key in ("a", "b", "c"):
+                self.assertIsNone(cache.get(key, "fast"))
+            cache.put("b", "fast")
+            self.assertEqual(len(cache), 1)
+
+    def test_fingerprint(self):
+        """
+        Scenario tests that directory fingerprint depends on contents and names of files, not on their location, and
+        that unchanged files are not read again with digest cache.
+        """
+
+        import shutil
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tfd_cursor = TFD(
+                host=self.host,
+                team=self.team,
+                project=self.project,
+                check_connection=False,
+                digest_cache=True,
+                cache_dir=str(Path(tmp_dir, "cache")),
+            )
+            model = Path(self._create_test_model(Path(tmp_dir, "model")))
+            # files modified just now are not cached, they could be changed again within the same mtime tick
+            for file_path in model.rglob("*"):
+                os.utime(file_path, ns=(0, 1_000_000_000))
+            fingerprint = tfd_cursor.fingerprint(str(model), workers=2)
+            self.assertEqual(len(fingerprint), 64)
+            self.assertEqual(len(tfd_cursor.digest_cache), 4)
+
+            with mock.patch("tensorflow_deploy_utils.hashing.file_digest") as digest_mock:
+                self.assertEqual(tfd_cursor.fingerprint(str(model)), fingerprint)
+            digest_mock.assert_not_called()
+
+            copy = Path(shutil.copytree(model, Path(tmp_dir, "copy")))
+            self.assertEqual(tfd_cursor.fingerprint(str(copy)), fingerprint)
+            copy.joinpath("variables", "variables.index").write_bytes(b"changed index")
+            changed = tfd_cursor.fingerprint(str(copy))
+            self.assertNotEqual(changed, fingerprint)
+            self.assertEqual(tfd_cursor.fingerprint(str(copy)), changed)
+            copy.joinpath("variables", "variables.index").rename(copy.joinpath("variables.index"))
+            self.assertNotIn(tfd_cursor.fingerprint(str(copy)), (fingerprint, changed))
+
+            with self.assertRaises(ValueError):
+                tfd_cursor.fingerprint(str(Path(tmp_dir, "missing")))
+
+    def test_validation_param_err(self):
+        """
+        Scenario checks that cursor can't be created with unknown validation level.
+        """
+
+        with self.assertRaises(ValueError):
+            TFD(
+                host=self.host,
+                team=self.team,
+                project=self.project,
+                check_connection=False,
+                validation="full",
+            )
+
+    @mock.patch("tensorflow.saved_model.load", return_values=object)
+    def test_validate_archived_model_or_module(self, tf_mock):
+        """
+        Scenario tests validate_archived_model_or_module function on fast and deep level.
+        None on return when everything is ok, archive should not be extracted on disk.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model = Path(self._create_test_model(Path(tmp_dir, "model")))
+            model.joinpath("saved_model.pb").write_bytes(self._create_saved_model_proto())
+            path_tar = str(Path(tmp_dir, "model.tar"))
+            self.tfd_cursor.create_archive(str(model), path_tar)
+            with mock.patch.object(self.tfd_cursor, "_extract_archive") as extract_mock:
+                fast = self.tfd_cursor._validate_archived_model_or_module(path_tar, "fast")
+                tf_mock.assert_not_called()
+                deep = self.tfd_cursor._validate_archived_model_or_module(path_tar, "deep")
+            extract_mock.assert_not_called()
+
+        self.assertEqual(list(fast), ["fast"])
+        self.assertEqual(list(deep), ["deep"])
+        tf_mock.assert_called_once()
+        self.assertTrue(tf_mock.call_args[0][0].startswith("ram://"))
+
+    @mock.patch("tensorflow.saved_model.load", return_values=object)
+    def test_validate_archived_model_or_module_err(self, tf_mock):
+        """
+        Scenario tests validate_archived_model_or_module function with archive without README.md file.
         Should return error.
         """
 
         err = None
-        path_tar = "/path/to/file.tar"
-        with mock.patch("os.path", return_values=True):
-            with mock.patch("os.listdir", return_value=["test1.txt"]):
-                try:
-                    self.tfd_cursor._validate_archived_model_or_module(path_tar)
-                except Exception as e:
-                    err = e
-                    pass
-        expected = "Directory without README.md file!"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model = Path(self._create_test_model(Path(tmp_dir, "model")))
+            model.joinpath("saved_model.pb").write_bytes(self._create_saved_model_proto())
+            model.joinpath("README.md").unlink()
+            path_tar = str(Path(tmp_dir, "model.tar"))
+            self.tfd_cursor.create_archive(str(model), path_tar)
+            try:
+                self.tfd_cursor._validate_archived_model_or_module(path_tar)
+            except Exception as e:
+                err = e
+        expected = "Archive without README.md file!"
         self.assertEqual(
             expected,
             str(err),
             msg="Got '{r}', expected '{e}'".format(r=str(err), e=expected),
         )
 
+    def test_validate_archived_model_or_module_tar_err(self):
+        """
+        Scenario tests validate_archived_model_or_module function with file which is not tar archive.
+        Should return error.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path_tar = Path(tmp_dir, "model.tar")
+            path_tar.write_bytes(b"not a tar archive")
+            with self.assertRaises(ValueError) as error:
+                self.tfd_cursor._validate_archived_model_or_module(str(path_tar))
+        self.assertIn("Archive validation failed!", str(error.exception))
+
+    def test_tf_archive_view(self):
+        """
+        Scenario tests that archive view exposes archived files to TensorFlow and is removed on exit.
+        """
+
+        import tensorflow as tf
+
+        from tensorflow_deploy_utils.archive import tf_archive_view
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model = self._create_test_model(Path(tmp_dir, "model"))
+            path_tar = str(Path(tmp_dir, "model.tar"))
+            self.tfd_cursor.create_archive(model, path_tar)
+            with tf_archive_view(path_tar) as view_path:
+                with tf.io.gfile.GFile(view_path + "/variables/variables.index", "rb") as fh:
+                    content = fh.read()
+            self.assertEqual(content, b"test index")
+            self.assertFalse(tf.io.gfile.exists(view_path))
+
+    def test_tf_archive_view_memory_limit(self):
+        """
+        Scenario tests that archives bigger than memory limit are exposed from temporary directory removed on exit.
+        """
+
+        from tensorflow_deploy_utils.archive import tf_archive_view
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model = self._create_test_model(Path(tmp_dir, "model"))
+            for name in ("model.tar", "model.tar.gz"):
+                path_tar = str(Path(tmp_dir, name))
+                self.tfd_cursor.create_archive(model, path_tar)
+                with tf_archive_view(path_tar, max_memory=0) as view_path:
+                    self.assertFalse(view_path.startswith("ram://"))
+                    content = Path(view_path, "variables", "variables.index").read_bytes()
+                self.assertEqual(content, b"test index")
+                self.assertFalse(os.path.exists(view_path))
+
     @mock.patch("tarfile.open", return_values=object)
     def test_extract_archive(self, tar_mock):
         """
@@ -1672,6 +3050,54 @@ class TestTFD(unittest.TestCase):
             pass
         self.assertIsNone(err, msg="Expected None, got '{r}'".format(r=err))
 
+    def test_extract_archive_traversal_err(self):
+        """
+        Scenario tests extract_archive function with archives pointing outside of destination.
+        Should raise ValueError and write nothing outside of destination.
+        """
+
+        import io
+        import shutil
+
+        def add(archive, name, type=tarfile.REGTYPE, linkname=""):
+            info = tarfile.TarInfo(name)
+            info.type = type
+            info.linkname = linkname
+            data = b"" if type != tarfile.REGTYPE else b"data"
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, type, linkname in (
+                ("../evil", tarfile.REGTYPE, ""),
+                ("./variables/../../evil", tarfile.REGTYPE, ""),
+                ("./evil", tarfile.SYMTYPE, "../evil"),
+                ("./evil", tarfile.SYMTYPE, "/etc/passwd"),
+                ("./evil", tarfile.LNKTYPE, "../evil"),
+                ("./evil", tarfile.FIFOTYPE, ""),
+            ):
+                for mode in ("w", "w:gz"):
+                    path_tar = str(Path(tmp_dir, "model.tar"))
+                    with tarfile.open(path_tar, mode) as archive:
+                        add(archive, "./saved_model.pb")
+                        add(archive, name, type, linkname)
+                    dst = Path(tmp_dir, "dst")
+                    dst.mkdir()
+                    with self.assertRaises(ValueError, msg=name):
+                        self.tfd_cursor._extract_archive(path_tar, str(dst))
+                    self.assertFalse(Path(tmp_dir, "evil").exists())
+                    shutil.rmtree(dst)
+
+            path_tar = str(Path(tmp_dir, "model.tar"))
+            with tarfile.open(path_tar, "w") as archive:
+                add(archive, "/saved_model.pb")
+                add(archive, "./variables", tarfile.DIRTYPE)
+                add(archive, "./variables/model.pb", tarfile.SYMTYPE, "../saved_model.pb")
+            dst = Path(tmp_dir, "dst")
+            dst.mkdir()
+            self.tfd_cursor._extract_archive(path_tar, str(dst))
+            self.assertEqual(dst.joinpath("variables", "model.pb").read_bytes(), b"data")
+
     @mock.patch.object(tarfile, "open", autospec=True)
     def test_create_archive(self, tarfile_mock):
         """
@@ -1694,6 +3120,331 @@ class TestTFD(unittest.TestCase):
 
         self.assertEqual(expected, _hash)
 
+    def test_create_archive_hash_on_write(self):
+        """
+        Scenario tests create_archive function with hash calculated while writing archive.
+        Should return the same hash as calculated from archive written on disk.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src = Path(tmp_dir, "model")
+            src.joinpath("variables").mkdir(parents=True)
+            src.joinpath("saved_model.pb").write_bytes(b"test model")
+            src.joinpath("variables", "variables.index").write_bytes(b"test index")
+            dst = str(Path(tmp_dir, "model.tar"))
+
+            _hash = self.tfd_cursor.create_archive(str(src), dst, hash_on_write=True)
+            expected = hashlib.sha256(Path(dst).read_bytes()).hexdigest()
+            with tarfile.open(dst) as archive:
+                names = archive.getnames()
+
+        self.assertEqual(expected, _hash)
+        self.assertIn("./variables/variables.index", names)
+
+    @staticmethod
+    def _create_test_model(path: str) -> str:
+        """
+        Writes small directory with model-like files used in tests which touch real files.
+        """
+
+        model = Path(path)
+        model.joinpath("variables").mkdir(parents=True)
+        model.joinpath("saved_model.pb").write_bytes(b"test model")
+        model.joinpath("variables", "variables.index").write_bytes(b"test index")
+        model.joinpath("variables", "variables.data-00000-of-00001").write_bytes(
+            b"test data" * 1000
+        )
+        model.joinpath("README.md").write_text("test readme")
+        return str(model)
+
+    def _stand_in_cursor(self, port: int, **kwargs) -> TFD:
+        """
+        Creates cursor of test model connected to local stand-in server on given port.
+        """
+
+        return TFD(
+            host="127.0.0.1",
+            port=port,
+            team=self.team,
+            project=self.project,
+            name=self.name,
+            check_connection=False,
+            **kwargs
+        )
+
+    @staticmethod
+    def _parse_multipart(body: bytes) -> list:
+        """
+        Parses multipart body into list of (field name, value) tuples.
+        """
+
+        boundary = body.split(b"\r\n", 1)[0]
+        fields = []
+        for part in body.split(boundary)[1:-1]:
+            headers, value = part.split(b"\r\n\r\n", 1)
+            name = headers.split(b'name="')[1].split(b'"')[0].decode()
+            fields.append((name, value[: -len(b"\r\n")]))
+        return fields
+
+    @requests_mock.mock()
+    def test_upload_model_stream(self, requests_mock):
+        """
+        Scenario tests upload_model function in stream mode with directory as param.
+        Archive should be sent in chunks with hash as the last form field and no temporary archive on disk.
+        """
+
+        url = endpoint["label"].format(
+            host=self.host,
+            port=self.port,
+            team=self.team,
+            project=self.project,
+            name=self.name,
+            label=self.label,
+        )
+        bodies = []
+
+        def callback(request, context):
+            bodies.append(b"".join(request.body))
+            return "ok"
+
+        requests_mock.post(url, text=callback, status_code=200)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src = self._create_test_model(Path(tmp_dir, "model"))
+            with mock.patch.object(self.tfd_cursor, "_validate_model_or_module"):
+                result = self.tfd_cursor.upload_model(src, stream=True)
+            expected_archive = Path(tmp_dir, "expected.tar")
+            expected_hash = self.tfd_cursor.create_archive(src, str(expected_archive))
+            expected_data = expected_archive.read_bytes()
+            self.assertEqual(sorted(Path(tmp_dir).iterdir()), [expected_archive, Path(src)])
+
+        self.assertEqual(result, "Upload success!")
+        fields = self._parse_multipart(bodies[0])
+        self.assertEqual([name for name, _ in fields], ["archive_data", "archive_hash"])
+        self.assertEqual(fields[0][1], expected_data)
+        self.assertEqual(fields[1][1].decode(), expected_hash)
+        self.assertIn(
+            "multipart/form-data; boundary=",
+            requests_mock.last_request.headers["Content-Type"],
+        )
+
+    def test_upload_model_delta(self):
+        """
+        Scenario tests upload_model function with delta against local stand-in implementing delta upload contract.
+        Only files which TensorFlow Deploy doesn't have should be sent and version created from manifest should be
+        the same as reproducible archive of model.
+        """
+
+        from tensorflow_deploy_utils.delta_stub import DeltaStubServer
+
+        with tempfile.TemporaryDirectory() as tmp_dir, DeltaStubServer() as server:
+            tfd_cursor = self._stand_in_cursor(server.port)
+            src = self._create_test_model(Path(tmp_dir, "model"))
+            model = (self.team, self.project, self.name)
+            with mock.patch.object(tfd_cursor, "_validate_model_or_module") as validate_mock:
+                result = tfd_cursor.upload_model(src, label="first", delta=True)
+                validate_mock.assert_called_once_with(src)
+                self.assertEqual(result, "Upload success! (delta: 9031 of 9031 bytes sent)")
+                self.assertEqual(len([r for r in server.requests if r[0] == "PUT"]), 4)
+                self.assertEqual(len(server.store.blobs[model]), 4)
+
+                # retrained model differs only in variables
+                Path(src, "variables", "variables.data-00000-of-00001").write_bytes(b"retrained data" * 1000)
+                del server.requests[:]
+                result = tfd_cursor.upload_model(src, label="second", delta=True)
+                self.assertEqual(result, "Upload success! (delta: 14000 of 14031 bytes sent)")
+                self.assertEqual(
+                    [(method, path.rsplit("/", 1)[-1]) for method, path, _ in server.requests],
+                    [
+                        ("POST", "missing"),
+                        ("PUT", hashlib.sha256(b"retrained data" * 1000).hexdigest()),
+                        ("POST", "manifest"),
+                    ],
+                )
+
+                # blobs removed from server after negotiation are uploaded again
+                with mock.patch.object(server.store, "missing", return_value=[]):
+                    server.store.blobs[model].clear()
+                    result = tfd_cursor.upload_model(src, label="third", delta=True)
+                self.assertEqual(result, "Upload success! (delta: 14031 of 14031 bytes sent)")
+
+            versions = server.store.versions[model]
+            self.assertEqual([label for label, _ in versions], ["first", "second", "third"])
+            dst = Path(tmp_dir, "model.tar")
+            tfd_cursor.create_archive(src, str(dst), reproducible=True)
+            self.assertEqual(versions[1][1], dst.read_bytes())
+            self.assertEqual(versions[2][1], dst.read_bytes())
+            self.assertNotEqual(versions[0][1], dst.read_bytes())
+
+    def test_upload_model_delta_fallback(self):
+        """
+        Scenario tests that upload_model with delta uploads archive, if TensorFlow Deploy doesn't support delta
+        uploads.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir, StandInServer() as server:
+            tfd_cursor = self._stand_in_cursor(server.port, label=self.label)
+            src = self._create_test_model(Path(tmp_dir, "model"))
+            server.fail_statuses = [404]
+            with mock.patch.object(tfd_cursor, "_validate_model_or_module") as validate_mock:
+                with mock.patch.object(tfd_cursor, "loger") as loger_mock:
+                    result = tfd_cursor.upload_model(src, stream=True, delta=True)
+            self.assertEqual(result, "Upload success!")
+            loger_mock.warning.assert_called_once_with(
+                "TensorFlow Deploy doesn't support delta uploads, uploading archive"
+            )
+            validate_mock.assert_called_once_with(src)
+            self.assertEqual(
+                [request["path"] for request in server.requests],
+                [
+                    "/v1/models/{t}/{p}/names/{n}/blobs/missing".format(t=self.team, p=self.project, n=self.name),
+                    "/v1/models/{t}/{p}/names/{n}/labels/{l}".format(
+                        t=self.team, p=self.project, n=self.name, l=self.label
+                    ),
+                ],
+            )
+            self.assertIn(b'name="archive_data"', server.requests[1]["body"])
+
+    def test_upload_model_delta_deadline(self):
+        """
+        Scenario tests that upload_model with delta doesn't fall back to archive upload after deadline is exceeded,
+        but falls back with warning after other errors.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tfd_cursor = TFD(
+                host=self.host,
+                team=self.team,
+                project=self.project,
+                name=self.name,
+                label=self.label,
+                check_connection=False,
+            )
+            src = self._create_test_model(Path(tmp_dir, "model"))
+            with mock.patch.object(tfd_cursor, "_upload_stream") as upload_mock:
+                with mock.patch.object(
+                    tfd_cursor.session, "post", side_effect=DeadlineExceeded("operation deadline exceeded")
+                ):
+                    with self.assertRaises(DeadlineExceeded):
+                        tfd_cursor.upload_model(src, stream=True, delta=True)
+                upload_mock.assert_not_called()
+
+                with mock.patch.object(
+                    tfd_cursor.session, "post", side_effect=requests.exceptions.ConnectionError("refused")
+                ):
+                    with mock.patch.object(tfd_cursor, "loger") as loger_mock:
+                        tfd_cursor.upload_model(src, stream=True, delta=True)
+                upload_mock.assert_called_once()
+            loger_mock.warning.assert_called_once_with("delta upload failed, uploading archive. Error: refused")
+            tfd_cursor.close()
+
+    @requests_mock.mock()
+    def test_upload_model_skip_existing(self, requests_mock):
+        """
+        Scenario tests upload_model function with skip_existing.
+        Archive already stored for model should not be uploaded again, only label should be set to its version.
+        """
+
+        upload_url = endpoint["label"].format(
+            host=self.host,
+            port=self.port,
+            team=self.team,
+            project=self.project,
+            name=self.name,
+            label=self.label,
+        )
+        label_url = endpoint["set_label"].format(
+            host=self.host,
+            port=self.port,
+            team=self.team,
+            project=self.project,
+            name=self.name,
+            version=7,
+            label=self.label,
+        )
+        reload_url = endpoint["reload"].format(
+            host=self.host,
+            port=self.port,
+            team=self.team,
+            project=self.project,
+            reload_type=True,
+        )
+        upload_mock = requests_mock.post(upload_url, text="ok", status_code=200)
+        label_mock = requests_mock.put(label_url, text="ok", status_code=200)
+        reload_mock = requests_mock.post(reload_url, text="ok", status_code=200)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src = self._create_test_model(Path(tmp_dir, "model"))
+            archive_hash = self.tfd_cursor.create_archive(src, str(Path(tmp_dir, "model.tar")))
+            models = [
+                {"name": self.name, "version": 6, "archive_hash": "0" * 64},
+                {"name": self.name, "version": 7, "archive_hash": archive_hash},
+            ]
+            requests_mock.get(endpoint["list_models"].format(host=self.host, port=self.port), text=json.dumps(models))
+            with mock.patch.object(self.tfd_cursor, "_validate_model_or_module"):
+                result = self.tfd_cursor.upload_model(src, stream=True, skip_existing=True)
+                self.assertEqual(
+                    result,
+                    "Upload deduplicated! Identical archive already stored as version 7, label {l} set".format(
+                        l=self.label
+                    ),
+                )
+                self.assertEqual(upload_mock.call_count, 0)
+                self.assertEqual(label_mock.call_count, 1)
+
+                result = self.tfd_cursor.deploy_model(src, skip_existing=True)
+                self.assertTrue(result.startswith("Deploy results:\nupload: Upload deduplicated!"), msg=result)
+                self.assertEqual(upload_mock.call_count, 0)
+                self.assertEqual(reload_mock.call_count, 1)
+
+                Path(src, "README.md").write_text("changed readme")
+                with mock.patch.object(self.tfd_cursor, "loger") as loger_mock:
+                    result = self.tfd_cursor.upload_model(src, skip_existing=True)
+                self.assertEqual(result, "Upload success!")
+                self.assertEqual(upload_mock.call_count, 1)
+                self.assertEqual(label_mock.call_count, 2)
+                loger_mock.warning.assert_called_once()
+                self.assertIn("without reproducible_archives", loger_mock.warning.call_args[0][0])
+
+                self.tfd_cursor.reproducible_archives = True
+                with mock.patch.object(self.tfd_cursor, "loger") as loger_mock:
+                    self.tfd_cursor.upload_model(src, skip_existing=True)
+                loger_mock.warning.assert_not_called()
+
+    @requests_mock.mock()
+    def test_upload_module_stream_hash_pre_pass(self, requests_mock):
+        """
+        Scenario tests upload_module function in stream mode with tar archive as param and hash calculated before upload.
+        Hash should be sent as the first form field and archive should not be removed.
+        """
+
+        url = endpoint["modules"].format(
+            host=self.host,
+            port=self.port,
+            team=self.team,
+            project=self.project,
+            name=self.name,
+        )
+        bodies = []
+
+        def callback(request, context):
+            bodies.append(b"".join(request.body))
+            return "error msg"
+
+        requests_mock.post(url, text=callback, status_code=500)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src = self._create_test_model(Path(tmp_dir, "module"))
+            archive = str(Path(tmp_dir, "module.tar"))
+            expected_hash = self.tfd_cursor.create_archive(src, archive)
+            with mock.patch.object(self.tfd_cursor, "_validate_archived_model_or_module"):
+                result = self.tfd_cursor.upload_module(
+                    archive, stream=True, hash_pre_pass=True
+                )
+            self.assertTrue(Path(archive).exists())
+            expected_data = Path(archive).read_bytes()
+
+        self.assertEqual(result, "Upload failed!\nServer response: error msg")
+        fields = self._parse_multipart(bodies[0])
+        self.assertEqual(fields, [("archive_hash", expected_hash.encode()), ("archive_data", expected_data)])
+
     @requests_mock.mock()
     @mock.patch("tarfile.open", return_values=object)
     @mock.patch("pathlib.Path.open")
@@ -1723,7 +3474,10 @@ class TestTFD(unittest.TestCase):
             status_code=200,
         )
         expected = "Upload success!"
-        with mock.patch("os.listdir", return_value=["README.md", "test_model.tar"]):
+        with mock.patch(
+            "tensorflow_deploy_utils.TFD.validate_saved_model_archive",
+            return_value=["serving_default"],
+        ):
             with mock.patch(
                 "builtins.open", mock.mock_open(read_data=b"test data")
             ) as mock_file:
@@ -1773,7 +3527,10 @@ class TestTFD(unittest.TestCase):
         )
 
         expected = "Upload failed!\nServer response: {r}".format(r=err_msg)
-        with mock.patch("os.listdir", return_value=["README.md", "test_model.tar"]):
+        with mock.patch(
+            "tensorflow_deploy_utils.TFD.validate_saved_model_archive",
+            return_value=["serving_default"],
+        ):
             with mock.patch(
                 "builtins.open", mock.mock_open(read_data=b"test data")
             ) as mock_file:
@@ -1948,7 +3705,10 @@ class TestTFD(unittest.TestCase):
             status_code=200,
         )
         expected = "Upload success!"
-        with mock.patch("os.listdir", return_value=["README.md", "test_module.tar"]):
+        with mock.patch(
+            "tensorflow_deploy_utils.TFD.validate_saved_model_archive",
+            return_value=["serving_default"],
+        ):
             with mock.patch(
                 "builtins.open", mock.mock_open(read_data=b"test data")
             ) as mock_file:
@@ -1998,7 +3758,10 @@ class TestTFD(unittest.TestCase):
         )
 
         expected = "Upload failed!\nServer response: {r}".format(r=err_msg)
-        with mock.patch("os.listdir", return_value=["README.md", "test_module.tar"]):
+        with mock.patch(
+            "tensorflow_deploy_utils.TFD.validate_saved_model_archive",
+            return_value=["serving_default"],
+        ):
             with mock.patch(
                 "builtins.open", mock.mock_open(read_data=b"test data")
             ) as mock_file:
@@ -2178,7 +3941,10 @@ class TestTFD(unittest.TestCase):
             text="",
             status_code=200,
         )
-        with mock.patch("os.listdir", return_value=["README.md", "test_model.tar"]):
+        with mock.patch(
+            "tensorflow_deploy_utils.TFD.validate_saved_model_archive",
+            return_value=["serving_default"],
+        ):
             with mock.patch(
                 "builtins.open", mock.mock_open(read_data=b"test data")
             ) as mock_file:
@@ -2241,7 +4007,10 @@ class TestTFD(unittest.TestCase):
             text="",
             status_code=200,
         )
-        with mock.patch("os.listdir", return_value=["README.md", "test_model.tar"]):
+        with mock.patch(
+            "tensorflow_deploy_utils.TFD.validate_saved_model_archive",
+            return_value=["serving_default"],
+        ):
             with mock.patch(
                 "builtins.open", mock.mock_open(read_data=b"test data")
             ) as mock_file:
@@ -2324,6 +4093,395 @@ class TestTFD(unittest.TestCase):
                 err = e
         self.assertIsNone(err, msg="Expected None, got '{e}'".format(e=err))
 
+    def test_session_pool_params(self):
+        """
+        Scenario checks that cursor creates pooled HTTP session with given pool params.
+        """
+
+        tfd_cursor = TFD(
+            host=self.host,
+            team=self.team,
+            project=self.project,
+            check_connection=False,
+            pool_connections=2,
+            pool_maxsize=4,
+            pool_block=True,
+            keep_alive=False,
+        )
+        adapter = tfd_cursor.session.get_adapter("http://{h}".format(h=self.host))
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(tfd_cursor.session.headers["Connection"], "close")
+        tfd_cursor.close()
+
+    @requests_mock.mock()
+    def test_session_shared_by_methods(self, requests_mock):
+        """
+        Scenario checks that consecutive cursor methods send requests through one shared session.
+        """
+
+        requests_mock.get(
+            endpoint["config"].format(
+                host=self.host, port=self.port, team=self.team, project=self.project
+            ),
+            text="config",
+            status_code=200,
+        )
+        requests_mock.post(
+            endpoint["reload"].format(
+                host=self.host,
+                port=self.port,
+                team=self.team,
+                project=self.project,
+                reload_type=True,
+            ),
+            status_code=200,
+        )
+        with mock.patch.object(
+            self.tfd_cursor.session,
+            "request",
+            wraps=self.tfd_cursor.session.request,
+        ) as request_mock:
+            self.tfd_cursor.get_config()
+            self.tfd_cursor.reload_config()
+        self.assertEqual(request_mock.call_count, 2)
+
+    def test_retry_statuses(self):
+        """
+        Scenario checks that idempotent requests are retried after retryable status codes and retries are counted.
+        """
+
+        with StandInServer(b"config") as server, self._stand_in_cursor(
+            server.port, retry=RetryPolicy(attempts=3, backoff_base=0)
+        ) as tfd_cursor:
+            server.fail_statuses = [503, 502]
+            result = tfd_cursor.get_config()
+            self.assertEqual(result, "config")
+            self.assertEqual(tfd_cursor.last_retries, 2)
+            self.assertEqual(len(server.requests), 3)
+
+            server.fail_statuses = [504]
+            result = tfd_cursor.set_label(self.version, "canary")
+            self.assertEqual(result, "set_label success: ok, reload: reload_config success! (retries: 1)")
+            self.assertEqual(tfd_cursor.last_retries, 1)
+
+            # revert isn't safe to replay
+            server.fail_statuses = [503]
+            result = tfd_cursor.revert_model()
+            self.assertEqual(result, "revert_model error: failure")
+            self.assertEqual(tfd_cursor.last_retries, 0)
+
+            server.fail_statuses = [504, 504]
+            result = tfd_cursor.set_labels_bulk(
+                [(self.name, 2, "stable"), (self.name, self.version, "canary")], workers=1
+            )
+            self.assertIn("version 1 label canary: success: ok", result)
+            self.assertIn("version 2 label stable: error: failure", result)
+            self.assertEqual(tfd_cursor.last_retries, 1)
+
+            server.fail_statuses = [500]
+            result = tfd_cursor.revert_model()
+            self.assertEqual(result, "revert_model error: failure")
+            self.assertEqual(tfd_cursor.last_retries, 0)
+
+    def test_retry_post(self):
+        """
+        Scenario checks that POST requests are retried only if policy allows it, except reload which is safe to retry.
+        """
+
+        with StandInServer() as server, self._stand_in_cursor(
+            server.port, retry=RetryPolicy(backoff_base=0)
+        ) as tfd_cursor:
+            url = "http://127.0.0.1:{p}/v1/models".format(p=server.port)
+            server.fail_statuses = [503]
+            self.assertEqual(tfd_cursor.session.post(url, data=b"body").status_code, 503)
+
+            server.fail_statuses = [503]
+            self.assertEqual(tfd_cursor.reload_config(), "reload_config success! (retries: 1)")
+
+            tfd_cursor.retry.retry_post = True
+            server.fail_statuses = [503]
+            response = tfd_cursor.session.post(url, data=b"body")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.retries, 1)
+
+            server.fail_statuses = [503]
+            chunks = iter([b"streamed ", b"body"])
+            self.assertEqual(tfd_cursor.session.post(url, data=chunks).status_code, 503)
+
+    @mock.patch("tensorflow_deploy_utils.transport.sleep")
+    def test_retry_connection_error(self, sleep_mock):
+        """
+        Scenario checks that connection errors are retried with exponential backoff capped by policy.
+        """
+
+        with StandInServer() as server:
+            port = server.port
+        tfd_cursor = TFD(
+            host="127.0.0.1",
+            port=port,
+            team=self.team,
+            project=self.project,
+            check_connection=False,
+            retry=RetryPolicy(attempts=4, backoff_base=0.5, backoff_cap=1, jitter=False),
+        )
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            tfd_cursor.get_config()
+        self.assertEqual([c.args[0] for c in sleep_mock.call_args_list], [0.5, 1, 1])
+        self.assertEqual(tfd_cursor.last_retries, 3)
+        tfd_cursor.close()
+
+        policy = RetryPolicy(backoff_base=2, backoff_cap=5)
+        for retry in range(5):
+            self.assertTrue(0 <= policy.delay(retry) <= min(5, 2 * 2 ** retry))
+
+    def test_read_timeout(self):
+        """
+        Scenario checks that request to hung TensorFlow Deploy fails after read timeout, also set per call.
+        """
+
+        with StandInServer(b"config") as server, TFD(
+            host="127.0.0.1",
+            port=server.port,
+            team=self.team,
+            project=self.project,
+            check_connection=False,
+            read_timeout=0.2,
+            retry=RetryPolicy(attempts=1),
+        ) as tfd_cursor:
+            server.delay = 0.5
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                tfd_cursor.get_config()
+            with tfd_cursor.limits(read_timeout=2):
+                self.assertEqual(tfd_cursor.get_config(), "config")
+
+    def test_deadline(self):
+        """
+        Scenario checks that deadline is shared by all calls made inside limits and stops retries.
+        """
+
+        with StandInServer(b"config") as server, TFD(
+            host="127.0.0.1",
+            port=server.port,
+            team=self.team,
+            project=self.project,
+            check_connection=False,
+            deadline=5,
+            retry=RetryPolicy(backoff_base=0),
+        ) as tfd_cursor:
+            server.delay = 0.3
+            with tfd_cursor.limits(deadline=0.5):
+                self.assertEqual(tfd_cursor.get_config(), "config")
+                with self.assertRaises(requests.exceptions.Timeout):
+                    tfd_cursor.get_config()
+
+            requests_count = len(server.requests)
+            with tfd_cursor.limits(deadline=0):
+                with self.assertRaises(DeadlineExceeded):
+                    tfd_cursor.get_config()
+            self.assertEqual(len(server.requests), requests_count)
+
+            server.delay = 0
+            server.fail_statuses = [503]
+            self.assertEqual(tfd_cursor.get_config(), "config")
+            self.assertEqual(tfd_cursor.last_retries, 1)
+
+    def test_scripts_wait_timeout(self):
+        """
+        Scenario checks that --wait_timeout of deploy_model and reload_config scripts limits only waiting for model and
+        doesn't become deadline of cursor, which would limit also upload.
+        """
+
+        import tensorflow_deploy_utils.scripts.deploy_model as deploy_model_script
+        import tensorflow_deploy_utils.scripts.reload_config as reload_config_script
+
+        common = ["--team", self.team, "--project", self.project, "--wait_timeout", "42"]
+        scripts = (
+            (deploy_model_script, "deploy_model", ["--path", "model", "--name", self.name, "--wait"]),
+            (reload_config_script, "reload_config", ["--wait"]),
+        )
+        for script, method, args in scripts:
+            with mock.patch.object(sys, "argv", [method] + common + args), mock.patch.object(
+                script, "TFD"
+            ) as tfd_mock, mock.patch("builtins.print"):
+                script.main()
+            kwargs = dict(tfd_mock.call_args.kwargs, check_connection=False)
+            self.assertNotIn("deadline", kwargs)
+            self.assertIsNone(TFD(**kwargs).deadline)
+            self.assertEqual(getattr(tfd_mock.return_value, method).call_args.kwargs["wait_timeout"], 42)
+
+    def test_deploy_model_deadline_propagation(self):
+        """
+        Scenario checks that deploy_model passes remaining time of its deadline to upload and reload.
+        """
+
+        tfd_cursor = TFD(
+            host=self.host,
+            team=self.team,
+            project=self.project,
+            check_connection=False,
+            deadline=100,
+        )
+        budgets = []
+
+        def upload(*args, **kwargs):
+            budgets.append(remaining_time())
+            return "Upload success!"
+
+        def reload(*args, **kwargs):
+            budgets.append(remaining_time())
+            return "reload_config success!"
+
+        with mock.patch.object(tfd_cursor, "upload_model", side_effect=upload), mock.patch.object(
+            tfd_cursor, "_request_reload", side_effect=reload
+        ):
+            tfd_cursor.deploy_model("/path/to/model")
+            with tfd_cursor.limits(deadline=5):
+                tfd_cursor.deploy_model("/path/to/model")
+        self.assertTrue(all(99 < budget <= 100 for budget in budgets[:2]), msg=budgets)
+        self.assertTrue(all(4 < budget <= 5 for budget in budgets[2:]), msg=budgets)
+        self.assertIsNone(remaining_time())
+        tfd_cursor.close()
+
+    def test_circuit_breaker(self):
+        """
+        Scenario checks that circuit breaker shared by cursors of one host opens after consecutive failures, fails
+        fast while open and closes after successful ping probe.
+        """
+
+        with StandInServer(b"config") as server:
+            cursors = [
+                TFD(
+                    host="127.0.0.1",
+                    port=server.port,
+                    team=self.team,
+                    project=self.project,
+                    check_connection=False,
+                    retry=RetryPolicy(attempts=1),
+                    circuit_breaker=True,
+                    breaker_failures=2,
+                    breaker_reset_timeout=0.3,
+                )
+                for _ in range(2)
+            ]
+            server.fail_statuses = [503, 502]
+            self.assertEqual(cursors[0].get_config(), "get_config error: failure")
+            self.assertEqual(cursors[1].get_config(), "get_config error: failure")
+
+            requests_count = len(server.requests)
+            for tfd_cursor in cursors:
+                with self.assertRaises(CircuitOpenError):
+                    tfd_cursor.get_config()
+            with self.assertRaises(ConnectionError):
+                cursors[0]._check_connection()
+            self.assertEqual(len(server.requests), requests_count)
+
+            time.sleep(0.35)
+            server.fail_statuses = [503]
+            with self.assertRaises(CircuitOpenError):
+                cursors[1].get_config()
+            self.assertEqual(len(server.requests), requests_count + 1)
+
+            time.sleep(0.35)
+            self.assertEqual(cursors[1].get_config(), "config")
+            self.assertEqual(cursors[0].get_config(), "config")
+            self.assertEqual(len(server.requests), requests_count + 4)
+            self.assertIs(cursors[0].breaker, cursors[1].breaker)
+            self.assertEqual(cursors[0].breaker.state, "closed")
+            for tfd_cursor in cursors:
+                tfd_cursor.close()
+
+            with self.assertRaises(ValueError):
+                TFD(
+                    host="127.0.0.1",
+                    port=server.port,
+                    team=self.team,
+                    project=self.project,
+                    check_connection=False,
+                    circuit_breaker=True,
+                    breaker_failures=3,
+                    breaker_reset_timeout=0.3,
+                )
+
+    def test_circuit_breaker_disabled(self):
+        """
+        Scenario checks that cursors have no circuit breaker by default, so failing host gives error messages.
+        """
+
+        with StandInServer(b"config") as server:
+            tfd_cursor = TFD(
+                host="127.0.0.1",
+                port=server.port,
+                team=self.team,
+                project=self.project,
+                check_connection=False,
+                retry=RetryPolicy(attempts=1),
+            )
+            self.assertIsNone(tfd_cursor.breaker)
+            server.fail_statuses = [502] * 10
+            for _ in range(10):
+                self.assertEqual(tfd_cursor.get_config(), "get_config error: failure")
+            tfd_cursor.close()
+
+    def test_context_manager_closes_session(self):
+        """
+        Scenario checks that cursor used as context manager closes its session on exit.
+        """
+
+        with mock.patch("requests.Session.close") as close_mock:
+            with TFD(
+                host=self.host,
+                team=self.team,
+                project=self.project,
+                check_connection=False,
+            ):
+                close_mock.assert_not_called()
+        close_mock.assert_called_once_with()
+
+    def test_import_without_heavy_modules(self):
+        """
+        Scenario checks that importing tensorflow_deploy_utils (and its scripts) does not load TensorFlow,
+        tensorflow_text, pandas, aiohttp or zstandard. It is run in a fresh interpreter, because the test suite itself
+        imports them.
+        """
+
+        code = (
+            "import sys\n"
+            "import tensorflow_deploy_utils\n"
+            "import tensorflow_deploy_utils.scripts.get_config\n"
+            "print(','.join(m for m in ('tensorflow', 'tensorflow_text', 'pandas', 'aiohttp', 'zstandard') if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        loaded = result.stdout.strip()
+        self.assertEqual(
+            loaded,
+            "",
+            msg="Expected no heavy modules, got '{l}'".format(l=loaded),
+        )
+
+
+    def test_fast_validation_without_tensorflow(self):
+        """
+        Scenario checks that fast validation parses SavedModel without loading TensorFlow. It is run in a fresh
+        interpreter, because the test suite itself imports TensorFlow.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model = Path(self._create_test_model(Path(tmp_dir, "model")))
+            model.joinpath("saved_model.pb").write_bytes(self._create_saved_model_proto())
+            code = (
+                "import sys\n"
+                "from tensorflow_deploy_utils.validation import validate_saved_model_dir\n"
+                f"print(validate_saved_model_dir({str(model)!r}), 'tensorflow' in sys.modules)"
+            )
+            result = subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True, check=True
+            )
+        self.assertEqual(result.stdout.strip(), "['serving_default'] False")
+
 
 if __name__ == "__main__":
     unittest.main()